@@ -0,0 +1,382 @@
+import heapq
+
+import numpy
+from numpy import ndarray
+
+from graph.directed_graph import GraphError
+from graph.vertex import Vertex
+from graph.weighted_directed_graph import WeightedDirectedGraph
+from algorithms.traversal import check_numbered_vertices
+
+
+# number of vertices a witness search may settle before a shortcut is added without proof that it is needed
+WITNESS_SEARCH_SETTLE_LIMIT = 100
+
+# the contraction stops when the next vertex has more edges than this, the remaining vertices form the core
+CORE_DEGREE_LIMIT = 40
+
+
+class ContractionHierarchy:
+
+    """
+    A contraction hierarchy of a weighted directed graph.
+    The vertices are contracted one by one (least important first), adding shortcut edges that keep the
+    lowest costs between the remaining vertices. The contraction stops when the remaining vertices are too
+    densely connected, they form the core of the hierarchy and are ranked above all the contracted vertices.
+    The hierarchy is represented by:
+        - rank: rank[v] is the position of v in the contraction order
+        - the upward graph: the edges (u, w) with rank[u] < rank[w] and the core edges,
+          used by the forward search
+        - the downward graph: the edges (u, w) with rank[u] > rank[w] and the core edges,
+          stored reversed (w -> u), used by the backward search
+    Both graphs are stored in compressed sparse row form: the edges of vertex v are
+    indices[indptr[v]:indptr[v + 1]], with their costs and middle vertices (-1 for an original edge).
+    The vertices of the graph must be numbered from 0 to n - 1.
+    """
+
+    def __init__(self, rank: ndarray, upward: tuple[ndarray, ndarray, ndarray, ndarray],
+                 downward: tuple[ndarray, ndarray, ndarray, ndarray]):
+        """
+        Initializes the hierarchy.
+
+        :param rank: ndarray, the contraction order rank of each vertex
+        :param upward: tuple[ndarray, ndarray, ndarray, ndarray], indptr, indices, costs and middle vertices
+                       of the upward graph
+        :param downward: tuple[ndarray, ndarray, ndarray, ndarray], the same arrays for the downward graph
+        """
+
+        self.__rank = rank
+        self.__upward = upward
+        self.__downward = downward
+
+        # the searches run on plain lists, they are much faster than NumPy scalars
+        self.__upward_edges = ContractionHierarchy.__to_adjacency(upward)
+        self.__downward_edges = ContractionHierarchy.__to_adjacency(downward)
+
+    @property
+    def number_of_vertices(self) -> int:
+        return len(self.__rank)
+
+    @property
+    def number_of_edges(self) -> int:
+        """
+        Returns the number of edges of the hierarchy (original edges and shortcuts).
+
+        :return: int, the number of edges
+        """
+
+        return len(self.__upward[1]) + len(self.__downward[1])
+
+    # ----------------------- #
+
+    @staticmethod
+    def build(graph: WeightedDirectedGraph):
+        """
+        Builds the contraction hierarchy of a graph.
+        The next vertex to contract is the one with the smallest edge difference
+        (shortcuts added - edges removed) plus number of contracted neighbors, the priorities are updated lazily.
+        The vertices left when the next one has more than CORE_DEGREE_LIMIT edges form the core.
+
+        :param graph: WeightedDirectedGraph | FrozenGraph, the graph to build the hierarchy of
+
+        :return: ContractionHierarchy, the hierarchy of the graph
+
+        :raises GraphError: if the vertices are not numbered from 0 to n - 1 or if an edge has a negative cost
+        """
+
+        check_numbered_vertices(graph)
+
+        number_of_vertices = graph.number_of_vertices
+
+        # the remaining graph, out_edges[u][w] = (cost, middle vertex)
+        out_edges = [{} for _ in range(number_of_vertices)]
+        in_edges = [{} for _ in range(number_of_vertices)]
+        for vertex in graph.vertices:
+            for neighbor, cost in graph.get_outbound_costs(vertex):
+                if cost < 0:
+                    raise GraphError("Negative cost edge!")
+
+                if vertex != neighbor:
+                    out_edges[vertex.value][neighbor.value] = (cost, -1)
+                    in_edges[neighbor.value][vertex.value] = (cost, -1)
+
+        # every edge of the remaining graph ends up in the hierarchy when one of its ends is contracted
+        hierarchy_edges = []
+        contracted_neighbors = [0] * number_of_vertices
+        contracted = [False] * number_of_vertices
+        rank = numpy.empty(number_of_vertices, dtype=numpy.int32)
+
+        def shortcuts(vertex: int) -> list[tuple[int, int, int]]:
+            # the shortcuts needed when vertex is contracted, as (start, end, cost) triples
+            needed = []
+            for predecessor, (in_cost, _) in in_edges[vertex].items():
+                targets = {successor: in_cost + out_cost for successor, (out_cost, _) in out_edges[vertex].items()
+                           if successor != predecessor}
+                if not targets:
+                    continue
+
+                witnessed = ContractionHierarchy.__witness_search(out_edges, predecessor, vertex, targets)
+                for successor, cost in targets.items():
+                    if witnessed.get(successor, cost + 1) > cost:
+                        needed.append((predecessor, successor, cost))
+
+            return needed
+
+        def priority(vertex: int) -> int:
+            return len(shortcuts(vertex)) - len(in_edges[vertex]) - len(out_edges[vertex]) + \
+                contracted_neighbors[vertex]
+
+        queue = [(priority(vertex), vertex) for vertex in range(number_of_vertices)]
+        heapq.heapify(queue)
+
+        current_rank = 0
+        while queue:
+            _, vertex = heapq.heappop(queue)
+            if contracted[vertex]:
+                continue
+
+            if len(in_edges[vertex]) + len(out_edges[vertex]) > CORE_DEGREE_LIMIT:
+                break
+
+            # lazy update: contract the vertex only if it is still the least important one
+            vertex_shortcuts = shortcuts(vertex)
+            new_priority = len(vertex_shortcuts) - len(in_edges[vertex]) - len(out_edges[vertex]) + \
+                contracted_neighbors[vertex]
+            if queue and new_priority > queue[0][0]:
+                heapq.heappush(queue, (new_priority, vertex))
+                continue
+
+            for start, end, cost in vertex_shortcuts:
+                if end not in out_edges[start] or cost < out_edges[start][end][0]:
+                    out_edges[start][end] = (cost, vertex)
+                    in_edges[end][start] = (cost, vertex)
+
+            for predecessor, (cost, middle) in in_edges[vertex].items():
+                hierarchy_edges.append((predecessor, vertex, cost, middle))
+                del out_edges[predecessor][vertex]
+                contracted_neighbors[predecessor] += 1
+
+            for successor, (cost, middle) in out_edges[vertex].items():
+                hierarchy_edges.append((vertex, successor, cost, middle))
+                del in_edges[successor][vertex]
+                contracted_neighbors[successor] += 1
+
+            out_edges[vertex], in_edges[vertex] = {}, {}
+            contracted[vertex] = True
+            rank[vertex] = current_rank
+            current_rank += 1
+
+        # the core vertices are ranked after the contracted ones, their edges are searched in both directions
+        core = [vertex for vertex in range(number_of_vertices) if not contracted[vertex]]
+        for vertex in core:
+            rank[vertex] = current_rank
+            current_rank += 1
+
+        upward = [(start, end, cost, middle) for start, end, cost, middle in hierarchy_edges if rank[start] < rank[end]]
+        downward = [(end, start, cost, middle) for start, end, cost, middle in hierarchy_edges if rank[start] > rank[end]]
+        for vertex in core:
+            for successor, (cost, middle) in out_edges[vertex].items():
+                upward.append((vertex, successor, cost, middle))
+                downward.append((successor, vertex, cost, middle))
+
+        return ContractionHierarchy(rank, ContractionHierarchy.__to_csr(upward, number_of_vertices),
+                                    ContractionHierarchy.__to_csr(downward, number_of_vertices))
+
+    @staticmethod
+    def __witness_search(out_edges: list[dict], start: int, ignored: int, targets: dict[int, int]) -> dict[int, int]:
+        # limited Dijkstra from start that avoids the ignored vertex, returns the costs found for the targets
+        max_cost = max(targets.values())
+        costs = {start: 0}
+        found = {}
+        settled = 0
+
+        queue = [(0, start)]
+        while queue and settled < WITNESS_SEARCH_SETTLE_LIMIT and len(found) < len(targets):
+            current_cost, current = heapq.heappop(queue)
+            if current_cost > costs[current]:
+                continue
+            if current_cost > max_cost:
+                break
+
+            settled += 1
+            if current in targets:
+                found[current] = current_cost
+
+            for neighbor, (cost, _) in out_edges[current].items():
+                new_cost = current_cost + cost
+                if neighbor != ignored and new_cost < costs.get(neighbor, new_cost + 1):
+                    costs[neighbor] = new_cost
+                    heapq.heappush(queue, (new_cost, neighbor))
+
+        return found
+
+    @staticmethod
+    def __to_csr(edges: list[tuple[int, int, int, int]], number_of_vertices: int) -> tuple[ndarray, ndarray, ndarray, ndarray]:
+        edges.sort(key=lambda edge: edge[0])
+
+        starts = numpy.array([edge[0] for edge in edges], dtype=numpy.int32)
+        indptr = numpy.zeros(number_of_vertices + 1, dtype=numpy.int32)
+        numpy.cumsum(numpy.bincount(starts, minlength=number_of_vertices), out=indptr[1:])
+
+        indices = numpy.array([edge[1] for edge in edges], dtype=numpy.int32)
+        costs = numpy.array([edge[2] for edge in edges], dtype=numpy.float64)
+        middles = numpy.array([edge[3] for edge in edges], dtype=numpy.int32)
+
+        return indptr, indices, costs, middles
+
+    @staticmethod
+    def __to_adjacency(csr: tuple[ndarray, ndarray, ndarray, ndarray]) -> list[list[tuple[int, float, int]]]:
+        indptr, indices, costs, middles = (array.tolist() for array in csr)
+        return [list(zip(indices[indptr[vertex]:indptr[vertex + 1]], costs[indptr[vertex]:indptr[vertex + 1]],
+                         middles[indptr[vertex]:indptr[vertex + 1]]))
+                for vertex in range(len(indptr) - 1)]
+
+    # ----------------------- #
+
+    def query(self, start: int, end: int) -> tuple[float, list[int]]:
+        """
+        Computes the lowest cost path between two vertex values.
+        Utilizes a bidirectional Dijkstra's algorithm that only follows edges towards higher ranked vertices
+        (and the core edges): forward over the upward graph from start, backward over the downward graph from end.
+
+        :param start: int, the value of the start vertex
+        :param end: int, the value of the end vertex
+
+        :return: float, the cost of the lowest cost path (inf if no path exists)
+                 list[int], the values of the vertices of the path, [] if no path exists
+        """
+
+        # index 0 is the forward search, index 1 is the backward search
+        edges = (self.__upward_edges, self.__downward_edges)
+        costs = ({start: 0}, {end: 0})
+        parents = ({start: (None, -1)}, {end: (None, -1)})
+        queues = ([(0, start)], [(0, end)])
+
+        best_cost, meeting_vertex = numpy.inf, None
+        if start == end:
+            best_cost, meeting_vertex = 0, start
+
+        while True:
+            # a search never needs to go past best_cost, the searches can not stop as soon as they meet
+            active = [side for side in (0, 1) if queues[side] and queues[side][0][0] < best_cost]
+            if not active:
+                break
+
+            side = min(active, key=lambda active_side: queues[active_side][0][0])
+            current_cost, current = heapq.heappop(queues[side])
+            if current_cost > costs[side][current]:
+                continue
+
+            for neighbor, cost, middle in edges[side][current]:
+                new_cost = current_cost + cost
+                if new_cost < costs[side].get(neighbor, numpy.inf):
+                    costs[side][neighbor] = new_cost
+                    parents[side][neighbor] = (current, middle)
+                    heapq.heappush(queues[side], (new_cost, neighbor))
+
+                    # check if the two searches meet in the neighbor
+                    if neighbor in costs[1 - side] and new_cost + costs[1 - side][neighbor] < best_cost:
+                        best_cost, meeting_vertex = new_cost + costs[1 - side][neighbor], neighbor
+
+        if meeting_vertex is None:
+            return numpy.inf, []
+
+        walk = [start]
+        forward_edges = []
+        current = meeting_vertex
+        while parents[0][current][0] is not None:
+            forward_edges.append((parents[0][current][0], current, parents[0][current][1]))
+            current = parents[0][current][0]
+        for edge in reversed(forward_edges):
+            self.__unpack(edge, walk)
+
+        current = meeting_vertex
+        while parents[1][current][0] is not None:
+            self.__unpack((current, parents[1][current][0], parents[1][current][1]), walk)
+            current = parents[1][current][0]
+
+        return best_cost, walk
+
+    def __unpack(self, edge: tuple[int, int, int], walk: list[int]):
+        # appends the vertices of an edge (after its start) to the walk, replacing shortcuts by the edges they skip
+        stack = [edge]
+        while stack:
+            start, end, middle = stack.pop()
+            if middle == -1:
+                walk.append(end)
+                continue
+
+            # the middle vertex is ranked lower than both ends: start -> middle is a downward edge,
+            # middle -> end is an upward edge
+            first_middle = next(edge_middle for neighbor, _, edge_middle in self.__downward_edges[middle]
+                                if neighbor == start)
+            second_middle = next(edge_middle for neighbor, _, edge_middle in self.__upward_edges[middle]
+                                 if neighbor == end)
+
+            stack.append((middle, end, second_middle))
+            stack.append((start, middle, first_middle))
+
+    # ----------------------- #
+
+    def save(self, file_path: str):
+        """
+        Saves the hierarchy to a file.
+
+        :param file_path: str, the path to the file
+        """
+
+        names = ("indptr", "indices", "costs", "middles")
+        arrays = {f"upward_{name}": array for name, array in zip(names, self.__upward)}
+        arrays.update({f"downward_{name}": array for name, array in zip(names, self.__downward)})
+
+        with open(file_path, "wb") as file:
+            numpy.savez(file, rank=self.__rank, **arrays)
+
+    @staticmethod
+    def load(file_path: str):
+        """
+        Loads a hierarchy from a file.
+
+        :param file_path: str, the path to the file
+
+        :return: ContractionHierarchy, the loaded hierarchy
+        """
+
+        names = ("indptr", "indices", "costs", "middles")
+        with numpy.load(file_path) as data:
+            return ContractionHierarchy(data["rank"], tuple(data[f"upward_{name}"] for name in names),
+                                        tuple(data[f"downward_{name}"] for name in names))
+
+    # ----------------------- #
+
+    def __repr__(self) -> str:
+        return f"ContractionHierarchy({self.number_of_vertices}, {self.number_of_edges})"
+
+
+def lowest_cost_path_ch_weighted_directed(graph: WeightedDirectedGraph, hierarchy: ContractionHierarchy,
+                                          start: Vertex, end: Vertex) -> tuple[int, list[Vertex]]:
+    """
+    Computes the lowest cost path between start and end in graph, using its contraction hierarchy.
+
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph to find the lowest cost path in
+    :param hierarchy: ContractionHierarchy, the contraction hierarchy of the graph
+    :param start: Vertex, the start point
+    :param end: Vertex, the end point
+
+    :return: int, the cost of the lowest cost path (inf if no path exists)
+             list[Vertex], the lowest cost path between the start and end vertices
+             [], empty list if no path exists
+
+    :raises GraphError: if the start or end vertices are not in the graph
+                        if the hierarchy does not match the graph
+    """
+
+    if not graph.is_vertex(start) or not graph.is_vertex(end):
+        raise GraphError("Vertex not in graph!")
+
+    if hierarchy.number_of_vertices != graph.number_of_vertices:
+        raise GraphError("Contraction hierarchy does not match the graph!")
+
+    cost, walk = hierarchy.query(int(start), int(end))
+
+    return cost, [Vertex(value) for value in walk]
@@ -1,11 +1,29 @@
 import heapq
+import itertools
 import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import numpy
 from numpy import ndarray
 
 from graph.directed_graph import GraphError, DirectedGraph
+from graph.frozen_graph import FrozenGraph
 from graph.vertex import Vertex
 from graph.weighted_directed_graph import WeightedDirectedGraph
+from algorithms.traversal import csr_neighbors, depth_first_search
+
+# number of elements of the broadcast buffer used by the min-plus product (8 MB of float64)
+MIN_PLUS_BLOCK_ELEMENTS = 1 << 20
+
+# largest edge cost for which Dijkstra's algorithm uses a bucket queue (Dial's algorithm) instead of a heap
+DIAL_MAX_EDGE_COST = 1000
+
+# number of sources handed to a worker process at once by Johnson's algorithm
+JOHNSON_SOURCES_PER_TASK = 64
+
+# reweighted adjacency lists of the graph processed by the current Johnson worker process
+_johnson_adjacency = None
 
 
 def generate_rand_weighted_directed_graph(number_of_vertices: int, number_of_edges: int, graph: WeightedDirectedGraph):
@@ -47,8 +65,9 @@ def generate_rand_weighted_directed_graph(number_of_vertices: int, number_of_edg
 def accessible_vertices_weighted_directed(graph: DirectedGraph, vertex: Vertex) -> set[Vertex]:
     """
     Finds all the vertices that are accessible from the given vertex in the given graph.
+    Utilizes an iterative DFS (see depth_first_search).
 
-    :param graph: DirectedGraph, the graph to find the accessible vertices in
+    :param graph: DirectedGraph | FrozenGraph, the graph to find the accessible vertices in
     :param vertex: Vertex, the vertex to find the accessible vertices from
 
     :return: set[Vertex], the set of accessible vertices
@@ -56,27 +75,20 @@ def accessible_vertices_weighted_directed(graph: DirectedGraph, vertex: Vertex)
     :raises GraphError: if the given vertex is not in the graph
     """
 
-    def dfs(graph: DirectedGraph, vertex: Vertex, visited: set[Vertex]):
-        if vertex not in visited:
-            visited.add(vertex)
-
-            for neighbor in graph.get_outbound_vertices(vertex):
-                dfs(graph, neighbor, visited)
-
     if not graph.is_vertex(vertex):
         raise GraphError("Vertex not in graph!")
 
-    visited = set()
-    dfs(graph, vertex, visited)
-
-    return visited
+    return depth_first_search(graph.get_outbound_vertices, [vertex])
 
 
 def shortest_path_weighted_directed(graph: DirectedGraph, start: Vertex, end: Vertex) -> list[Vertex]:
     """
     Computes the shortest (min length) walk between start and end in graph.
+    Utilizes a bidirectional BFS: a forward search from start over the outbound vertices and a backward search
+    from end over the inbound vertices, the smaller frontier is expanded one level at a time
+    until the two searches meet.
 
-    :param graph: DirectedGraph, the graph to find the shortest path in
+    :param graph: DirectedGraph | FrozenGraph, the graph to find the shortest path in
     :param start: Vertex, the start point
     :param end: Vertex, the end point
 
@@ -86,121 +98,248 @@ def shortest_path_weighted_directed(graph: DirectedGraph, start: Vertex, end: Ve
     :raises GraphError: if the start or end vertices are not in the graph
     """
 
-    def bfs(graph: DirectedGraph, start: Vertex):
-        dist = {start: 0}
-        queue = [start]
+    if not graph.is_vertex(start) or not graph.is_vertex(end):
+        raise GraphError("Vertex not in graph!")
 
-        while queue:
-            current = queue.pop(0)
-            for neighbor in graph.get_outbound_vertices(current):
-                if neighbor not in dist:
-                    dist[neighbor] = dist[current] + 1
-                    queue.append(neighbor)
+    if start == end:
+        return [start]
 
-        return dist
+    if isinstance(graph, FrozenGraph):
+        walk = _shortest_path_bidirectional((csr_neighbors(graph), csr_neighbors(graph, backward=True)),
+                                            graph.position(start), graph.position(end))
+        return [graph.vertex(position) for position in walk]
 
-    if not graph.is_vertex(start) or not graph.is_vertex(end):
-        raise GraphError("Vertex not in graph!")
+    return _shortest_path_bidirectional((graph.get_outbound_vertices, graph.get_inbound_vertices), start, end)
 
-    dist = bfs(graph, start)
-    if end not in dist:
-        return []
 
-    walk = [end]
-    current_length, current_vertex = dist[end], end
-    while current_length:
-        current_length -= 1
-        for vertex in graph.get_inbound_vertices(current_vertex):
-            if vertex in dist and dist[vertex] == current_length:
-                current_vertex = vertex
-                walk.append(current_vertex)
+def _shortest_path_bidirectional(neighbors: tuple, start: Vertex, end: Vertex) -> list[Vertex]:
+    # index 0 is the forward search, index 1 is the backward search
+    parents = ({start: None}, {end: None})
+    queues = (deque([start]), deque([end]))
+
+    meeting_vertex = None
+    while queues[0] and queues[1] and meeting_vertex is None:
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        queue = queues[side]
+
+        # the first meeting found while expanding a whole level is on a shortest path
+        for _ in range(len(queue)):
+            current = queue.popleft()
+            for neighbor in neighbors[side](current):
+                if neighbor not in parents[side]:
+                    parents[side][neighbor] = current
+                    queue.append(neighbor)
+
+                if neighbor in parents[1 - side]:
+                    meeting_vertex = neighbor
+                    break
+
+            if meeting_vertex is not None:
                 break
 
+    if meeting_vertex is None:
+        return []
+
+    walk = []
+    current = meeting_vertex
+    while current is not None:
+        walk.append(current)
+        current = parents[0][current]
     walk.reverse()
+
+    current = parents[1][meeting_vertex]
+    while current is not None:
+        walk.append(current)
+        current = parents[1][current]
+
     return walk
 
 
 def strongly_connected_tarjan_weighted_directed(graph: WeightedDirectedGraph) -> list[WeightedDirectedGraph]:
     """
     Finds the strongly connected components of the given graph using Tarjan's algorithm.
+    The DFS is iterative (see depth_first_search), so the depth of the graph is not bounded by the recursion limit.
 
-    :param graph: DirectedGraph, the graph to find the strongly connected components of
+    :param graph: DirectedGraph | FrozenGraph, the graph to find the strongly connected components of
 
     :return: list[WeightedDirectedGraph], the list of strongly connected components
     """
 
-    def implementation(vertex: Vertex, discovery_time, low: list, discovered: list, stack_member: list,
-                       stack: list, graph: WeightedDirectedGraph, connected_components: list):
-
-        discovered[vertex.value] = discovery_time
-        low[vertex.value] = discovery_time
-        discovery_time += 1
+    def discover(vertex: Vertex, parent: Vertex):
+        discovered[vertex.value] = low[vertex.value] = next(discovery_times)
 
         stack_member[vertex.value] = True
         stack.append(vertex.value)
 
-        for neighbor in graph.get_outbound_vertices(vertex):
-            if discovered[neighbor.value] == -1:
-                implementation(neighbor, discovery_time, low, discovered, stack_member, stack,
-                               graph, connected_components)
-                low[vertex.value] = min(low[vertex.value], low[neighbor.value])
-            elif stack_member[neighbor.value]:
-                low[vertex.value] = min(low[vertex.value], discovered[neighbor.value])
+    def visited_neighbor(vertex: Vertex, neighbor: Vertex):
+        if stack_member[neighbor.value]:
+            low[vertex.value] = min(low[vertex.value], discovered[neighbor.value])
 
-        extracted_value = -1
+    def finish(vertex: Vertex, parent: Vertex):
         if low[vertex.value] == discovered[vertex.value]:
-            new_component = WeightedDirectedGraph()
-
-            while extracted_value != vertex.value:
-                extracted_value = stack.pop()
-                extracted_vertex = Vertex(extracted_value)
-                new_component.add_vertex(extracted_vertex)
-                stack_member[extracted_value] = False
-
-                for neighbor in graph.get_outbound_vertices(extracted_vertex):
-                    if neighbor in new_component.vertices:
-                        try:
-                            new_component.add_edge(extracted_vertex, neighbor,
-                                                   graph.get_edge_cost(extracted_vertex, neighbor))
-                        except GraphError:
-                            pass
-
-                for neighbor in graph.get_inbound_vertices(extracted_vertex):
-                    if neighbor in new_component.vertices:
-                        try:
-                            new_component.add_edge(neighbor, extracted_vertex,
-                                                   graph.get_edge_cost(neighbor, extracted_vertex))
-                        except GraphError:
-                            pass
-
-            connected_components.append(new_component)
-
-    discovery_time = 0
+            connected_components.append(pop_component(vertex))
+
+        if parent is not None:
+            low[parent.value] = min(low[parent.value], low[vertex.value])
+
+    def pop_component(vertex: Vertex) -> WeightedDirectedGraph:
+        new_component = WeightedDirectedGraph()
+
+        extracted_value = -1
+        while extracted_value != vertex.value:
+            extracted_value = stack.pop()
+            extracted_vertex = Vertex(extracted_value)
+            new_component.add_vertex(extracted_vertex)
+            stack_member[extracted_value] = False
+
+            for neighbor in graph.get_outbound_vertices(extracted_vertex):
+                if neighbor in new_component.vertices:
+                    try:
+                        new_component.add_edge(extracted_vertex, neighbor,
+                                               graph.get_edge_cost(extracted_vertex, neighbor))
+                    except GraphError:
+                        pass
+
+            for neighbor in graph.get_inbound_vertices(extracted_vertex):
+                if neighbor in new_component.vertices:
+                    try:
+                        new_component.add_edge(neighbor, extracted_vertex,
+                                               graph.get_edge_cost(neighbor, extracted_vertex))
+                    except GraphError:
+                        pass
+
+        return new_component
+
+    discovery_times = itertools.count()
     discovered = [-1] * graph.number_of_vertices
     low = [-1] * graph.number_of_vertices
     stack_member = [False] * graph.number_of_vertices
     stack = []
 
     connected_components = []
-    for vertex in graph.vertices:
-        if discovered[vertex.value] == -1:
-            implementation(vertex, discovery_time, low, discovered, stack_member, stack,
-                           graph, connected_components)
+    depth_first_search(graph.get_outbound_vertices, graph.vertices, pre_order=discover, post_order=finish,
+                       visited_neighbor=visited_neighbor)
 
     return connected_components
 
 
-def lowest_cost_path_matrix_weighted_directed(graph: WeightedDirectedGraph, start: Vertex, end: Vertex) -> tuple[list[Vertex], list[ndarray]]:
+def weighted_edge_arrays(graph: WeightedDirectedGraph) -> tuple[ndarray, ndarray, ndarray]:
+    """
+    Returns the edges of graph as three parallel arrays: start vertex values, end vertex values and costs.
+    A FrozenGraph snapshot is converted without iterating over its edges.
+
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph
+
+    :return: ndarray, the start vertex of each edge
+             ndarray, the end vertex of each edge
+             ndarray, the float64 cost of each edge
+    """
+
+    if isinstance(graph, FrozenGraph):
+        starts = numpy.repeat(graph.values, numpy.diff(graph.out_indptr))
+        return starts, graph.values[graph.out_indices], graph.out_weights.astype(numpy.float64)
+
+    starts, ends, costs = [], [], []
+    for vertex in graph.vertices:
+        for neighbor, cost in graph.get_outbound_costs(vertex):
+            starts.append(vertex.value)
+            ends.append(neighbor.value)
+            costs.append(cost)
+
+    return numpy.array(starts, dtype=numpy.int64), numpy.array(ends, dtype=numpy.int64), \
+        numpy.array(costs, dtype=numpy.float64)
+
+
+def cost_matrix_weighted_directed(graph: WeightedDirectedGraph) -> ndarray:
+    """
+    Computes the adjacency cost matrix of graph: matrix[i][j] is the cost of the edge i -> j,
+    0 on the diagonal and inf where there is no edge.
+
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph to compute the cost matrix of
+
+    :return: ndarray, the cost matrix
+
+    :raises GraphError: if a negative cycle (negative cost loop) is detected
+    """
+
+    starts, ends, costs = weighted_edge_arrays(graph)
+
+    # check for negative cycles
+    if numpy.any((starts == ends) & (costs < 0)):
+        raise GraphError("Negative cycle detected!")
+
+    cost_matrix = numpy.full((graph.number_of_vertices, graph.number_of_vertices), numpy.inf)
+    cost_matrix[starts, ends] = costs
+    numpy.fill_diagonal(cost_matrix, 0)
+
+    return cost_matrix
+
+
+def min_plus_product(matrix_1: ndarray, matrix_2: ndarray) -> ndarray:
+    """
+    Computes the min-plus ("tropical") product of two square cost matrices:
+    result[i][j] = min over k of matrix_1[i][k] + matrix_2[k][j].
+    The rows, the inner dimension (k) and the columns are processed in blocks so that the broadcast buffer
+    holds about MIN_PLUS_BLOCK_ELEMENTS elements for any size, the minimums over the blocks of k are combined
+    in place in the result.
+
+    :param matrix_1: ndarray, the left operand
+    :param matrix_2: ndarray, the right operand
+
+    :return: ndarray, the min-plus product of the two matrices
+    """
+
+    size = matrix_1.shape[0]
+    result = numpy.empty((size, size))
+    if not size:
+        return result
+
+    block_columns = min(size, MIN_PLUS_BLOCK_ELEMENTS)
+    block_inner = min(size, max(1, MIN_PLUS_BLOCK_ELEMENTS // block_columns))
+    block_rows = min(size, max(1, MIN_PLUS_BLOCK_ELEMENTS // (block_inner * block_columns)))
+
+    buffer = numpy.empty((block_rows, block_inner, block_columns))
+    partial = numpy.empty((block_rows, block_columns))
+
+    for row in range(0, size, block_rows):
+        rows = min(block_rows, size - row)
+
+        for column in range(0, size, block_columns):
+            columns = min(block_columns, size - column)
+            target = result[row:row + rows, column:column + columns]
+
+            for inner in range(0, size, block_inner):
+                inners = min(block_inner, size - inner)
+                block = buffer[:rows, :inners, :columns]
+                numpy.add(matrix_1[row:row + rows, inner:inner + inners, None],
+                          matrix_2[None, inner:inner + inners, column:column + columns], out=block)
+
+                if inner == 0:
+                    numpy.min(block, axis=1, out=target)
+                else:
+                    numpy.min(block, axis=1, out=partial[:rows, :columns])
+                    numpy.minimum(target, partial[:rows, :columns], out=target)
+
+    return result
+
+
+def lowest_cost_path_matrix_weighted_directed(graph: WeightedDirectedGraph, start: Vertex, end: Vertex,
+                                              intermediate_matrices=None) -> tuple[list[Vertex], list[ndarray]]:
     """
     Computes the lowest cost path between start and end in graph.
-    Utilizes the matrix multiplication algorithm.
+    Utilizes the matrix multiplication algorithm with repeated squaring,
+    the intermediate matrices are the costs of the walks of at most 1, 2, 4, ... edges.
+    By default only the latest intermediate matrix is kept in memory.
 
-    :param graph: WeightedDirectedGraph, the graph to find the lowest cost path in
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph to find the lowest cost path in
     :param start: Vertex, the start point
     :param end: Vertex, the end point
+    :param intermediate_matrices: list-like, where every intermediate matrix is appended
+                                  (ex: a SpilledMatrixList), None to keep only the latest one
 
     :return: list[Vertex], the lowest cost path between the start and end vertices
              [], empty list if no path exists
+             list[ndarray], the intermediate matrices (only the last one if intermediate_matrices is None)
 
     :raises GraphError: if the start or end vertices are not in the graph
                         if a negative cycle is detected
@@ -209,42 +348,41 @@ def lowest_cost_path_matrix_weighted_directed(graph: WeightedDirectedGraph, star
     if not graph.is_vertex(start) or not graph.is_vertex(end):
         raise GraphError("Vertex not in graph!")
 
-    # list used to store the intermediate matrices
-    intermediate_matrices = []
-
-    # compute the adjacency matrix
-    adj_matrix = numpy.full((graph.number_of_vertices, graph.number_of_vertices), numpy.inf)
-    for vertex in graph.vertices:
-        for neighbor in graph.get_outbound_vertices(vertex):
-            # check for negative cycles
-            if vertex == neighbor and graph.get_edge_cost(vertex, neighbor) < 0:
-                raise GraphError("Negative cycle detected!")
-
-            adj_matrix[vertex.value][neighbor.value] = graph.get_edge_cost(vertex, neighbor)
-
-        adj_matrix[vertex.value][vertex.value] = 0
-
-    intermediate_matrices.append(adj_matrix.copy())
+    start, end = Vertex(start), Vertex(end)
 
-    # compute the intermediate matrices
-    for power in range(1, graph.number_of_vertices):
-        result = numpy.full((graph.number_of_vertices, graph.number_of_vertices), numpy.inf)
-
-        # compute the result matrix / "multiply" the previous intermediate matrix with the adjacency matrix
-        for i in range(graph.number_of_vertices):
-            for j in range(graph.number_of_vertices):
-                for k in range(graph.number_of_vertices):
-                    result[i][j] = min(result[i][j], intermediate_matrices[power - 1][i][k] + adj_matrix[k][j])
-
-        intermediate_matrices.append(result)
+    # list used to store the intermediate matrices
+    if intermediate_matrices is None:
+        intermediate_matrices = []
+        keep_only_latest = True
+    else:
+        keep_only_latest = False
+
+    latest_matrix = cost_matrix_weighted_directed(graph)
+    intermediate_matrices.append(latest_matrix)
+
+    # compute the intermediate matrices / "square" the previous intermediate matrix
+    # until it covers walks of n edges (every simple cycle) or stops changing
+    power = 1
+    while power < graph.number_of_vertices:
+        result = min_plus_product(latest_matrix, latest_matrix)
+        power *= 2
 
         # check for negative cycles
         if numpy.any(numpy.diagonal(result) < 0):
             raise GraphError("Negative cycle detected!")
 
+        if numpy.array_equal(result, latest_matrix):
+            break
+
+        latest_matrix = result
+        if keep_only_latest:
+            intermediate_matrices[-1] = latest_matrix
+        else:
+            intermediate_matrices.append(latest_matrix)
+
     walk = []
     # check if there is a path between the start and end vertices
-    if intermediate_matrices[-1][start.value][end.value] == numpy.inf:
+    if latest_matrix[start.value][end.value] == numpy.inf:
         return walk, intermediate_matrices
 
     # build the path
@@ -254,12 +392,12 @@ def lowest_cost_path_matrix_weighted_directed(graph: WeightedDirectedGraph, star
     while current_vertex != end:
         visited.add(current_vertex)
         for neighbor in graph.get_outbound_vertices(current_vertex):
-            # check for negative cycles
-            if neighbor in visited and neighbor != current_vertex:
-                raise GraphError("Negative cycle detected!")
+            if neighbor != current_vertex and latest_matrix[current_vertex.value][end.value] ==\
+               latest_matrix[neighbor.value][end.value] + graph.get_edge_cost(current_vertex, neighbor):
 
-            if intermediate_matrices[-1][current_vertex.value][end.value] ==\
-               intermediate_matrices[-1][neighbor.value][end.value] + graph.get_edge_cost(current_vertex, neighbor):
+                # check for negative cycles
+                if neighbor in visited:
+                    raise GraphError("Negative cycle detected!")
 
                 walk.append(neighbor)
                 current_vertex = neighbor
@@ -268,10 +406,154 @@ def lowest_cost_path_matrix_weighted_directed(graph: WeightedDirectedGraph, star
     return walk, intermediate_matrices
 
 
+def johnson_potentials_weighted_directed(graph: WeightedDirectedGraph) -> ndarray:
+    """
+    Computes the reweighting potentials used by Johnson's algorithm.
+    Utilizes the Bellman-Ford algorithm from a virtual vertex that has a 0 cost edge to every vertex,
+    each pass relaxes all the edges at once.
+
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph to compute the potentials of
+
+    :return: ndarray, potentials[v] is the lowest cost of a walk ending in v,
+             cost(u, v) + potentials[u] - potentials[v] is never negative
+
+    :raises GraphError: if a negative cycle is detected
+    """
+
+    sources, targets, costs = weighted_edge_arrays(graph)
+
+    # the walks have at most n - 1 edges, so the last of the n + 1 passes only confirms that nothing changes
+    # (and an empty graph still gets its confirming pass)
+    potentials = numpy.zeros(graph.number_of_vertices)
+    for _ in range(graph.number_of_vertices + 1):
+        relaxed = potentials.copy()
+        numpy.minimum.at(relaxed, targets, potentials[sources] + costs)
+
+        if numpy.array_equal(relaxed, potentials):
+            return potentials
+
+        potentials = relaxed
+
+    # the costs still decrease after n passes
+    raise GraphError("Negative cycle detected!")
+
+
+def _johnson_init_worker(adjacency: list[list[tuple[int, float]]]):
+    global _johnson_adjacency
+    _johnson_adjacency = adjacency
+
+
+def _johnson_dijkstra(sources: list[int]) -> list[tuple[int, ndarray]]:
+    # runs Dijkstra from every given source over the reweighted (non negative) adjacency lists
+    rows = []
+    for source in sources:
+        distances = numpy.full(len(_johnson_adjacency), numpy.inf)
+        distances[source] = 0
+
+        queue = [(0.0, source)]
+        while queue:
+            current_cost, current = heapq.heappop(queue)
+
+            # ignore outdated entries (we already found a better path to the vertex)
+            if current_cost > distances[current]:
+                continue
+
+            for neighbor, cost in _johnson_adjacency[current]:
+                new_cost = current_cost + cost
+                if new_cost < distances[neighbor]:
+                    distances[neighbor] = new_cost
+                    heapq.heappush(queue, (new_cost, neighbor))
+
+        rows.append((source, distances))
+
+    return rows
+
+
+def lowest_cost_rows_johnson_weighted_directed(graph: WeightedDirectedGraph, max_workers: int = None):
+    """
+    Computes the lowest cost from every vertex to every other vertex in graph.
+    Utilizes Johnson's algorithm: the edges are reweighted with Bellman-Ford potentials
+    and Dijkstra's algorithm is run from each source in a pool of worker processes.
+    The rows are yielded as soon as they are computed, in no particular order.
+
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph to find the lowest costs in
+    :param max_workers: int, the number of worker processes (None for the number of processors,
+                        1 to compute everything in the current process)
+
+    :return: generator, (source, row) pairs, row[v] is the lowest cost from source to v (inf if no path exists)
+
+    :raises GraphError: if a negative cycle is detected
+    """
+
+    potentials = johnson_potentials_weighted_directed(graph)
+
+    starts, ends, costs = weighted_edge_arrays(graph)
+    reweighted_costs = numpy.maximum(costs + potentials[starts] - potentials[ends], 0)
+
+    adjacency = [[] for _ in range(graph.number_of_vertices)]
+    for vertex_1, vertex_2, reweighted_cost in zip(starts.tolist(), ends.tolist(), reweighted_costs.tolist()):
+        adjacency[vertex_1].append((vertex_2, reweighted_cost))
+
+    sources = list(range(graph.number_of_vertices))
+    tasks = [sources[index:index + JOHNSON_SOURCES_PER_TASK]
+             for index in range(0, len(sources), JOHNSON_SOURCES_PER_TASK)]
+
+    def restore(rows: list[tuple[int, ndarray]]):
+        # undo the reweighting: cost(s, v) = reweighted_cost(s, v) - potentials[s] + potentials[v]
+        for source, distances in rows:
+            yield Vertex(source), distances - potentials[source] + potentials
+
+    if max_workers == 1:
+        _johnson_init_worker(adjacency)
+        for task in tasks:
+            yield from restore(_johnson_dijkstra(task))
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_johnson_init_worker,
+                             initargs=(adjacency,)) as executor:
+        futures = [executor.submit(_johnson_dijkstra, task) for task in tasks]
+        for future in as_completed(futures):
+            yield from restore(future.result())
+
+
+def lowest_cost_matrix_johnson_weighted_directed(graph: WeightedDirectedGraph, file_path: str = None,
+                                                 max_workers: int = None) -> ndarray:
+    """
+    Computes the lowest cost between every pair of vertices in graph using Johnson's algorithm
+    (see lowest_cost_rows_johnson_weighted_directed).
+    The rows are written into the result as they are computed, if a file path is given
+    the result is a memory-mapped file instead of an in-memory matrix.
+
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph to find the lowest costs in
+    :param file_path: str, the path of the memory-mapped result (None to keep the result in memory)
+    :param max_workers: int, the number of worker processes
+
+    :return: ndarray, the cost matrix, cost_matrix[i][j] is the lowest cost from i to j (inf if no path exists)
+
+    :raises GraphError: if a negative cycle is detected
+    """
+
+    shape = (graph.number_of_vertices, graph.number_of_vertices)
+    if file_path is None:
+        cost_matrix = numpy.empty(shape)
+    else:
+        cost_matrix = numpy.memmap(file_path, dtype=numpy.float64, mode="w+", shape=shape)
+
+    for source, row in lowest_cost_rows_johnson_weighted_directed(graph, max_workers):
+        cost_matrix[source.value] = row
+
+    if file_path is not None:
+        cost_matrix.flush()
+
+    return cost_matrix
+
+
 def get_path_from_matrix(graph: WeightedDirectedGraph, matrix: ndarray, start: Vertex, end: Vertex) -> list[Vertex]:
     if not graph.is_vertex(start) or not graph.is_vertex(end):
         raise GraphError("Vertex not in graph!")
 
+    start, end = Vertex(start), Vertex(end)
+
     walk = []
     if matrix[start.value][end.value] == numpy.inf:
         return walk
@@ -282,13 +564,13 @@ def get_path_from_matrix(graph: WeightedDirectedGraph, matrix: ndarray, start: V
     while current_vertex != end:
         visited.add(current_vertex)
         for neighbor in graph.get_outbound_vertices(current_vertex):
-            # check for negative cycles
-            if neighbor in visited and neighbor != current_vertex:
-                raise GraphError("Negative cycle detected!")
-
-            if matrix[current_vertex.value][end.value] ==\
+            if neighbor != current_vertex and matrix[current_vertex.value][end.value] ==\
                matrix[neighbor.value][end.value] + graph.get_edge_cost(current_vertex, neighbor):
 
+                # check for negative cycles
+                if neighbor in visited:
+                    raise GraphError("Negative cycle detected!")
+
                 walk.append(neighbor)
                 current_vertex = neighbor
                 break
@@ -296,58 +578,416 @@ def get_path_from_matrix(graph: WeightedDirectedGraph, matrix: ndarray, start: V
     return walk
 
 
-def number_of_distinct_minimum_cost_walks_weighted_directed(graph: WeightedDirectedGraph, start: Vertex, end: Vertex) -> int:
+def lowest_cost_matrices_floyd_warshall_weighted_directed(graph: WeightedDirectedGraph) -> tuple[ndarray, ndarray]:
     """
-    Computes the number of distinct minimum cost walks between start and end in graph.
-    Utilizes Dijkstra's algorithm.
+    Computes the lowest cost between every pair of vertices in graph.
+    Utilizes the Floyd-Warshall algorithm, each intermediate vertex k relaxes the whole matrix at once.
 
-    :param graph: WeightedDirectedGraph, the graph to find the number of distinct minimum cost walks in
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph to find the lowest costs in
+
+    :return: ndarray, the cost matrix, cost_matrix[i][j] is the lowest cost from i to j (inf if no path exists)
+             ndarray, the int32 next hop matrix, next_hop[i][j] is the vertex after i on the lowest cost
+             path from i to j (-1 if no path exists)
+
+    :raises GraphError: if a negative cycle is detected
+    """
+
+    cost_matrix = cost_matrix_weighted_directed(graph)
+    number_of_vertices = graph.number_of_vertices
+
+    # the next hop towards j is j itself wherever there is a direct edge (or i == j)
+    next_hop = numpy.where(cost_matrix < numpy.inf, numpy.arange(number_of_vertices), -1).astype(numpy.int32)
+
+    candidate = numpy.empty_like(cost_matrix)
+    improved = numpy.empty(cost_matrix.shape, dtype=bool)
+    for k in range(number_of_vertices):
+        # cost of going from i to j through k
+        numpy.add(cost_matrix[:, k, None], cost_matrix[None, k, :], out=candidate)
+        numpy.less(candidate, cost_matrix, out=improved)
+
+        numpy.copyto(cost_matrix, candidate, where=improved)
+        numpy.copyto(next_hop, next_hop[:, k, None].copy(), where=improved)
+
+        # check for negative cycles
+        if cost_matrix[k][k] < 0:
+            raise GraphError("Negative cycle detected!")
+
+    if numpy.any(numpy.diagonal(cost_matrix) < 0):
+        raise GraphError("Negative cycle detected!")
+
+    return cost_matrix, next_hop
+
+
+def get_path_from_next_hop_matrix(graph: WeightedDirectedGraph, next_hop: ndarray, start: Vertex, end: Vertex) -> list[Vertex]:
+    """
+    Rebuilds the lowest cost path between start and end from a next hop matrix.
+
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph the next hop matrix was computed for
+    :param next_hop: ndarray, the next hop matrix (see lowest_cost_matrices_floyd_warshall_weighted_directed)
     :param start: Vertex, the start point
     :param end: Vertex, the end point
 
-    :return: int, the number of distinct minimum cost walks between the start and end vertices
+    :return: list[Vertex], the lowest cost path between the start and end vertices
+             [], empty list if no path exists
+
+    :raises GraphError: if the start or end vertices are not in the graph
     """
 
     if not graph.is_vertex(start) or not graph.is_vertex(end):
         raise GraphError("Vertex not in graph!")
 
-    # initialize the distances and counts dictionaries
-    distances = {vertex: numpy.inf for vertex in graph.vertices}
-    counts = {vertex: 0 for vertex in graph.vertices}
+    start, end = Vertex(start), Vertex(end)
 
-    # initialize the priority queue with (cost, vertex) pairs
-    queue = [(0, start)]
-    distances[start] = 0
+    if next_hop[start.value][end.value] == -1:
+        return []
+
+    walk = [start]
+    current_value = start.value
+    while current_value != end.value:
+        current_value = int(next_hop[current_value][end.value])
+        walk.append(Vertex(current_value))
+
+    return walk
+
+
+def edge_cost_range(graph: WeightedDirectedGraph) -> tuple[int, int, bool]:
+    """
+    Returns the range of the edge costs of graph, which selects the algorithm of lowest_costs_weighted_directed.
+    A FrozenGraph snapshot is read from its cost array without iterating over its edges.
+    Compute it once and pass it to lowest_costs_weighted_directed when searching the same graph repeatedly.
+
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph
+
+    :return: int, the lowest edge cost (0 if there are no edges)
+             int, the highest edge cost (0 if there are no edges)
+             bool, True if all the costs are integers, False otherwise
+    """
+
+    if isinstance(graph, FrozenGraph):
+        weights = graph.out_weights
+        if not len(weights):
+            return 0, 0, True
+
+        return weights.min().item(), weights.max().item(), weights.dtype.kind in "iu"
+
+    min_cost, max_cost, integer_costs = 0, 0, True
+    for vertex in graph.vertices:
+        for _, cost in graph.get_outbound_costs(vertex):
+            min_cost = min(min_cost, cost)
+            max_cost = max(max_cost, cost)
+            integer_costs = integer_costs and isinstance(cost, int)
+
+    return min_cost, max_cost, integer_costs
+
+
+def lowest_costs_weighted_directed(graph: WeightedDirectedGraph, start: Vertex, counts: dict[Vertex, int] = None,
+                                   backward: bool = False, cost_range: tuple[int, int, bool] = None) -> dict[Vertex, int]:
+    """
+    Computes the lowest cost from start to every vertex accessible from it
+    (or to start from every vertex it is accessible from, if backward is True).
+    Utilizes Dijkstra's algorithm, if all the costs are integers between 0 and DIAL_MAX_EDGE_COST
+    the priority queue is a circular array of buckets indexed by cost (Dial's algorithm), otherwise a binary heap.
+    If an edge has a negative cost, utilizes the Bellman-Ford algorithm (with a queue of the vertices to relax) instead.
+
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph to find the lowest costs in
+    :param start: Vertex, the start point
+    :param counts: dict[Vertex, int], if given it is filled with the number of distinct minimum cost walks
+                   from start to each accessible vertex (inf for infinitely many, through a zero cost cycle
+                   in a graph with negative costs)
+    :param backward: bool, True to follow the edges in reverse (search over the inbound edges)
+    :param cost_range: tuple[int, int, bool], the range of the edge costs of the graph (see edge_cost_range),
+                       computed if not given
+
+    :return: dict[Vertex, int], the lowest cost of each accessible vertex,
+             the vertices are in non decreasing cost order (the order they were settled)
+
+    :raises GraphError: if the start vertex is not in the graph
+                        if a negative cycle is accessible
+    """
+
+    if not graph.is_vertex(start):
+        raise GraphError("Vertex not in graph!")
+
+    if cost_range is None:
+        cost_range = edge_cost_range(graph)
+
+    if counts is None:
+        counts = {}
+
+    if isinstance(graph, FrozenGraph):
+        position_counts = {}
+        costs = _lowest_costs(csr_neighbors(graph, backward, costs=True), graph.position(start),
+                              graph.number_of_vertices, cost_range, position_counts)
+
+        counts.update((graph.vertex(position), count) for position, count in position_counts.items())
+        return {graph.vertex(position): cost for position, cost in costs.items()}
+
+    neighbors = graph.get_inbound_costs if backward else graph.get_outbound_costs
+    return _lowest_costs(neighbors, start, graph.number_of_vertices, cost_range, counts)
+
+
+def _lowest_costs(neighbors, start: Vertex, number_of_vertices: int, cost_range: tuple[int, int, bool],
+                  counts: dict[Vertex, int]) -> dict[Vertex, int]:
+    min_cost, max_cost, integer_costs = cost_range
     counts[start] = 1
 
+    if min_cost < 0:
+        return _lowest_costs_bellman_ford(neighbors, start, number_of_vertices, counts)
+
+    if integer_costs and max_cost <= DIAL_MAX_EDGE_COST:
+        return _lowest_costs_dial(neighbors, start, max_cost, counts)
+
+    return _lowest_costs_heap(neighbors, start, counts)
+
+
+def _lowest_costs_dial(neighbors, start: Vertex, max_cost: int, counts: dict[Vertex, int]) -> dict[Vertex, int]:
+    # the tentative costs of the unsettled vertices are always between current_cost and current_cost + max_cost,
+    # so max_cost + 1 buckets used circularly are enough
+    buckets = [[] for _ in range(max_cost + 1)]
+    tentative = {start: 0}
+    settled = {}
+
+    buckets[0].append(start)
+    pending = 1
+    current_cost = 0
+
+    while pending:
+        bucket = buckets[current_cost % len(buckets)]
+
+        # zero cost edges can add vertices to the bucket that is being emptied
+        while bucket:
+            current_vertex = bucket.pop()
+            pending -= 1
+
+            # ignore outdated entries (we already found a better path to the vertex)
+            if current_vertex in settled or tentative[current_vertex] != current_cost:
+                continue
+
+            settled[current_vertex] = current_cost
+            for neighbor, cost in neighbors(current_vertex):
+                if neighbor in settled:
+                    continue
+
+                new_cost = current_cost + cost
+
+                # if we found a better path to the neighbor, update the tentative costs and counts
+                if neighbor not in tentative or new_cost < tentative[neighbor]:
+                    tentative[neighbor] = new_cost
+                    counts[neighbor] = counts[current_vertex]
+                    buckets[new_cost % len(buckets)].append(neighbor)
+                    pending += 1
+
+                # if we found another path with the same cost, update the counts
+                elif new_cost == tentative[neighbor]:
+                    counts[neighbor] += counts[current_vertex]
+
+        current_cost += 1
+
+    return settled
+
+
+def _lowest_costs_heap(neighbors, start: Vertex, counts: dict[Vertex, int]) -> dict[Vertex, int]:
+    tentative = {start: 0}
+    settled = {}
+
+    # initialize the priority queue with (cost, vertex) pairs
+    queue = [(0, start)]
     while queue:
         current_cost, current_vertex = heapq.heappop(queue)
 
         # ignore outdated entries (we already found a better path to the vertex)
-        if current_cost > distances[current_vertex]:
+        if current_vertex in settled:
             continue
 
-        for neighbor in graph.get_outbound_vertices(current_vertex):
-            new_cost = current_cost + graph.get_edge_cost(current_vertex, neighbor)
+        settled[current_vertex] = current_cost
+        for neighbor, cost in neighbors(current_vertex):
+            if neighbor in settled:
+                continue
+
+            new_cost = current_cost + cost
 
-            # if we found a better path to the neighbor, update the distances and counts dictionaries
-            if new_cost < distances[neighbor]:
-                distances[neighbor] = new_cost
+            # if we found a better path to the neighbor, update the tentative costs and counts
+            if neighbor not in tentative or new_cost < tentative[neighbor]:
+                tentative[neighbor] = new_cost
                 counts[neighbor] = counts[current_vertex]
                 heapq.heappush(queue, (new_cost, neighbor))
 
-            # if we found another path with the same cost, update the counts dictionary
-            elif new_cost == distances[neighbor]:
+            # if we found another path with the same cost, update the counts
+            elif new_cost == tentative[neighbor]:
                 counts[neighbor] += counts[current_vertex]
 
-    return counts[end]
+    return settled
+
+
+def _lowest_costs_bellman_ford(neighbors, start: Vertex, number_of_vertices: int,
+                               counts: dict[Vertex, int]) -> dict[Vertex, int]:
+    # a vertex is queued again each time its cost decreases, which happens less than number_of_vertices times
+    # unless it is reachable from a negative cycle
+    costs = {start: 0}
+    times_queued = {start: 1}
+    queue = deque([start])
+    queued = {start}
+
+    while queue:
+        current_vertex = queue.popleft()
+        queued.discard(current_vertex)
+
+        for neighbor, cost in neighbors(current_vertex):
+            new_cost = costs[current_vertex] + cost
+            if neighbor in costs and new_cost >= costs[neighbor]:
+                continue
+
+            costs[neighbor] = new_cost
+            if neighbor not in queued:
+                times_queued[neighbor] = times_queued.get(neighbor, 0) + 1
+                if times_queued[neighbor] > number_of_vertices:
+                    raise GraphError("Negative cycle detected!")
+
+                queue.append(neighbor)
+                queued.add(neighbor)
+
+    # the minimum cost walks only use the tight edges (cost[vertex] + cost == cost[neighbor]),
+    # their counts are summed in a topological order of these edges
+    tight = {vertex: [neighbor for neighbor, cost in neighbors(vertex) if costs[vertex] + cost == costs[neighbor]]
+             for vertex in costs}
+    in_degrees = dict.fromkeys(costs, 0)
+    for vertex in tight:
+        for neighbor in tight[vertex]:
+            in_degrees[neighbor] += 1
+
+    ready = [start] if not in_degrees[start] else []
+    while ready:
+        current_vertex = ready.pop()
+        for neighbor in tight[current_vertex]:
+            counts[neighbor] = counts.get(neighbor, 0) + counts[current_vertex]
+            in_degrees[neighbor] -= 1
+            if not in_degrees[neighbor]:
+                ready.append(neighbor)
+
+    # the vertices that are never ready are on a zero cost cycle of tight edges or after one,
+    # they have infinitely many minimum cost walks
+    for vertex, in_degree in in_degrees.items():
+        if in_degree:
+            counts[vertex] = numpy.inf
+
+    return dict(sorted(costs.items(), key=lambda item: item[1]))
+
+
+def lowest_cost_path_bidirectional_weighted_directed(graph: WeightedDirectedGraph, start: Vertex, end: Vertex) -> tuple[int, list[Vertex]]:
+    """
+    Computes the lowest cost path between start and end in graph.
+    Utilizes a bidirectional Dijkstra's algorithm: a forward search from start over the outbound edges and
+    a backward search from end over the inbound edges, stopping when the two searches meet.
+
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph to find the lowest cost path in
+    :param start: Vertex, the start point
+    :param end: Vertex, the end point
+
+    :return: int, the cost of the lowest cost path (inf if no path exists)
+             list[Vertex], the lowest cost path between the start and end vertices
+             [], empty list if no path exists
+
+    :raises GraphError: if the start or end vertices are not in the graph
+                        if an edge with a negative cost is reached
+    """
+
+    if not graph.is_vertex(start) or not graph.is_vertex(end):
+        raise GraphError("Vertex not in graph!")
+
+    if start == end:
+        return 0, [start]
+
+    if isinstance(graph, FrozenGraph):
+        neighbors = (csr_neighbors(graph, costs=True), csr_neighbors(graph, backward=True, costs=True))
+        best_cost, walk = _lowest_cost_path_bidirectional(neighbors, graph.position(start), graph.position(end))
+        return best_cost, [graph.vertex(position) for position in walk]
+
+    return _lowest_cost_path_bidirectional((graph.get_outbound_costs, graph.get_inbound_costs), start, end)
+
+
+def _lowest_cost_path_bidirectional(neighbors: tuple, start: Vertex, end: Vertex) -> tuple[int, list[Vertex]]:
+    # index 0 is the forward search, index 1 is the backward search
+    tentative = ({start: 0}, {end: 0})
+    parents = ({start: None}, {end: None})
+    settled = (set(), set())
+    queues = ([(0, start)], [(0, end)])
+
+    best_cost, meeting_vertex = numpy.inf, None
+
+    while queues[0] and queues[1]:
+        # every path that is not yet known costs at least the sum of the two smallest tentative costs
+        if queues[0][0][0] + queues[1][0][0] >= best_cost:
+            break
+
+        # advance the search with the smaller frontier
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        current_cost, current_vertex = heapq.heappop(queues[side])
+
+        # ignore outdated entries (we already found a better path to the vertex)
+        if current_vertex in settled[side]:
+            continue
+        settled[side].add(current_vertex)
+
+        for neighbor, cost in neighbors[side](current_vertex):
+            if cost < 0:
+                raise GraphError("Negative cost edge!")
+
+            new_cost = current_cost + cost
+            if neighbor not in tentative[side] or new_cost < tentative[side][neighbor]:
+                tentative[side][neighbor] = new_cost
+                parents[side][neighbor] = current_vertex
+                heapq.heappush(queues[side], (new_cost, neighbor))
+
+            # check if the two searches meet in the neighbor
+            if neighbor in tentative[1 - side] and tentative[side][neighbor] + tentative[1 - side][neighbor] < best_cost:
+                best_cost = tentative[side][neighbor] + tentative[1 - side][neighbor]
+                meeting_vertex = neighbor
+
+    if meeting_vertex is None:
+        return numpy.inf, []
+
+    walk = []
+    current_vertex = meeting_vertex
+    while current_vertex is not None:
+        walk.append(current_vertex)
+        current_vertex = parents[0][current_vertex]
+    walk.reverse()
+
+    current_vertex = parents[1][meeting_vertex]
+    while current_vertex is not None:
+        walk.append(current_vertex)
+        current_vertex = parents[1][current_vertex]
+
+    return best_cost, walk
+
+
+def number_of_distinct_minimum_cost_walks_weighted_directed(graph: WeightedDirectedGraph, start: Vertex, end: Vertex) -> int:
+    """
+    Computes the number of distinct minimum cost walks between start and end in graph.
+    Utilizes Dijkstra's algorithm (see lowest_costs_weighted_directed).
+
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph to find the number of distinct minimum cost walks in
+    :param start: Vertex, the start point
+    :param end: Vertex, the end point
+
+    :return: int, the number of distinct minimum cost walks between the start and end vertices
+             (inf if there are infinitely many, see lowest_costs_weighted_directed)
+    """
+
+    if not graph.is_vertex(start) or not graph.is_vertex(end):
+        raise GraphError("Vertex not in graph!")
+
+    counts = {}
+    lowest_costs_weighted_directed(graph, start, counts)
+
+    return counts.get(end, 0)
 
 
 def number_of_distinct_walks_weighted_directed(graph: WeightedDirectedGraph, start: Vertex, end: Vertex) -> int:
     """
     Computes the number of distinct walks between start and end in graph.
 
-    :param graph: WeightedDirectedGraph, the graph to find the number of distinct walks in
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph to find the number of distinct walks in
     :param start: Vertex, the start point
     :param end: Vertex, the end point
 
@@ -355,20 +995,10 @@ def number_of_distinct_walks_weighted_directed(graph: WeightedDirectedGraph, sta
     """
 
     def topological_sort(graph: WeightedDirectedGraph):
-
-        def dfs(vertex: Vertex, visited: set[Vertex], ordering: list[Vertex]):
-            visited.add(vertex)
-            for neighbor in graph.get_outbound_vertices(vertex):
-                if neighbor not in visited:
-                    dfs(neighbor, visited, ordering)
-            ordering.append(vertex)
-
-        visited = set()
+        # the reverse of the DFS post-order
         ordering = []
-
-        for vertex in graph.vertices:
-            if vertex not in visited:
-                dfs(vertex, visited, ordering)
+        depth_first_search(graph.get_outbound_vertices, graph.vertices,
+                           post_order=lambda vertex, parent: ordering.append(vertex))
 
         ordering.reverse()
         return ordering
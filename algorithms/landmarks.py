@@ -0,0 +1,284 @@
+import heapq
+import os
+
+import numpy
+from numpy import ndarray
+
+from graph.directed_graph import GraphError
+from graph.frozen_graph import FrozenGraph
+from graph.vertex import Vertex
+from graph.weighted_directed_graph import WeightedDirectedGraph
+from algorithms.directed_weighted_extra import edge_cost_range, lowest_costs_weighted_directed
+from algorithms.traversal import check_numbered_vertices, csr_neighbors
+
+
+# default number of landmarks of a landmark index
+DEFAULT_NUMBER_OF_LANDMARKS = 8
+
+# suffix of the landmark index file saved next to a graph file
+LANDMARKS_FILE_SUFFIX = ".landmarks.npz"
+
+
+class LandmarkIndex:
+
+    """
+    The precomputed tables of the ALT (A*, landmarks, triangle inequality) algorithm.
+    It is represented by three arrays:
+        - landmarks: the values of the k landmark vertices
+        - from_landmarks: k x n matrix, from_landmarks[i][v] is the lowest cost from landmark i to v
+        - to_landmarks: k x n matrix, to_landmarks[i][v] is the lowest cost from v to landmark i
+    Unreachable vertices have an infinite cost.
+    The vertices of the graph must be numbered from 0 to n - 1.
+    """
+
+    def __init__(self, landmarks: ndarray, from_landmarks: ndarray, to_landmarks: ndarray, number_of_edges: int):
+        """
+        Initializes the index.
+
+        :param landmarks: ndarray, the values of the landmark vertices
+        :param from_landmarks: ndarray, the lowest costs from each landmark to each vertex
+        :param to_landmarks: ndarray, the lowest costs from each vertex to each landmark
+        :param number_of_edges: int, the number of edges of the indexed graph
+        """
+
+        self.__landmarks = landmarks
+        self.__from_landmarks = from_landmarks
+        self.__to_landmarks = to_landmarks
+        self.__number_of_edges = number_of_edges
+
+    @property
+    def landmarks(self) -> list[Vertex]:
+        return [Vertex(int(value)) for value in self.__landmarks]
+
+    @property
+    def number_of_vertices(self) -> int:
+        return self.__from_landmarks.shape[1]
+
+    @property
+    def number_of_edges(self) -> int:
+        return self.__number_of_edges
+
+    # ----------------------- #
+
+    @staticmethod
+    def build(graph: WeightedDirectedGraph, number_of_landmarks: int = DEFAULT_NUMBER_OF_LANDMARKS):
+        """
+        Builds the index of a graph, the landmarks are chosen farthest-first:
+        each new landmark is the vertex that is the farthest from the closest already chosen landmark.
+
+        :param graph: WeightedDirectedGraph | FrozenGraph, the graph to index
+        :param number_of_landmarks: int, the number of landmarks (at most the number of vertices)
+
+        :return: LandmarkIndex, the index of the graph
+
+        :raises GraphError: if the graph is empty, if its vertices are not numbered from 0 to n - 1
+                            or if an edge has a negative cost
+        """
+
+        if not graph.number_of_vertices:
+            raise GraphError("Graph is empty!")
+
+        check_numbered_vertices(graph)
+
+        # the lower bounds of the triangle inequality do not hold with negative costs
+        cost_range = edge_cost_range(graph)
+        if cost_range[0] < 0:
+            raise GraphError("Negative cost edge!")
+
+        number_of_landmarks = min(number_of_landmarks, graph.number_of_vertices)
+
+        landmarks = []
+        from_landmarks = numpy.empty((number_of_landmarks, graph.number_of_vertices))
+        to_landmarks = numpy.empty((number_of_landmarks, graph.number_of_vertices))
+
+        # the first landmark is the farthest vertex from an arbitrary one
+        first_costs = LandmarkIndex.__costs_row(graph, next(iter(graph.vertices)), False, cost_range)
+        closest_landmark_cost = numpy.where(numpy.isinf(first_costs), -1, first_costs)
+
+        for index in range(number_of_landmarks):
+            landmark = int(numpy.argmax(closest_landmark_cost))
+            landmarks.append(landmark)
+
+            from_landmarks[index] = LandmarkIndex.__costs_row(graph, Vertex(landmark), False, cost_range)
+            to_landmarks[index] = LandmarkIndex.__costs_row(graph, Vertex(landmark), True, cost_range)
+
+            # vertices that the landmarks do not reach are the farthest ones
+            costs = numpy.where(numpy.isinf(from_landmarks[index]), numpy.finfo(numpy.float64).max,
+                                from_landmarks[index])
+            closest_landmark_cost = costs if not index else numpy.minimum(closest_landmark_cost, costs)
+            closest_landmark_cost[landmarks] = -1
+
+        return LandmarkIndex(numpy.array(landmarks, dtype=numpy.int32), from_landmarks, to_landmarks,
+                             graph.number_of_edges)
+
+    @staticmethod
+    def __costs_row(graph: WeightedDirectedGraph, vertex: Vertex, backward: bool, cost_range: tuple) -> ndarray:
+        row = numpy.full(graph.number_of_vertices, numpy.inf)
+        for other_vertex, cost in lowest_costs_weighted_directed(graph, vertex, backward=backward,
+                                                                 cost_range=cost_range).items():
+            row[other_vertex.value] = cost
+
+        return row
+
+    # ----------------------- #
+
+    def lower_bounds(self, end: Vertex) -> ndarray:
+        """
+        Computes a lower bound of the lowest cost from every vertex to end, using the triangle inequality:
+        cost(v, end) >= cost(landmark, end) - cost(landmark, v) and cost(v, end) >= cost(v, landmark) - cost(end, landmark)
+
+        :param end: Vertex, the end point
+
+        :return: ndarray, bounds[v] is a lower bound of the lowest cost from v to end (inf if end is not accessible)
+        """
+
+        with numpy.errstate(invalid="ignore"):
+            bounds_from = self.__from_landmarks[:, int(end), None] - self.__from_landmarks
+            bounds_to = self.__to_landmarks - self.__to_landmarks[:, int(end), None]
+
+        # inf - inf means that the landmark tells nothing about the vertex
+        bounds = numpy.fmax(numpy.nanmax(numpy.fmax(bounds_from, bounds_to), axis=0, initial=0), 0)
+
+        return numpy.nan_to_num(bounds, nan=0, posinf=numpy.inf)
+
+    # ----------------------- #
+
+    def save(self, file_path: str):
+        """
+        Saves the index to a file.
+
+        :param file_path: str, the path to the file
+        """
+
+        with open(file_path, "wb") as file:
+            numpy.savez(file, landmarks=self.__landmarks, from_landmarks=self.__from_landmarks,
+                        to_landmarks=self.__to_landmarks, number_of_edges=self.__number_of_edges)
+
+    @staticmethod
+    def load(file_path: str):
+        """
+        Loads an index from a file.
+
+        :param file_path: str, the path to the file
+
+        :return: LandmarkIndex, the loaded index
+        """
+
+        with numpy.load(file_path) as data:
+            return LandmarkIndex(data["landmarks"], data["from_landmarks"], data["to_landmarks"],
+                                 int(data["number_of_edges"]))
+
+    @staticmethod
+    def load_or_build(graph: WeightedDirectedGraph, graph_file_path: str,
+                      number_of_landmarks: int = DEFAULT_NUMBER_OF_LANDMARKS):
+        """
+        Loads the index saved next to a graph file, building and saving it if it does not exist,
+        if it is older than the graph file or if it does not match the graph.
+
+        :param graph: WeightedDirectedGraph | FrozenGraph, the graph read from the file
+        :param graph_file_path: str, the path to the graph file
+        :param number_of_landmarks: int, the number of landmarks used if the index is built
+
+        :return: LandmarkIndex, the index of the graph
+        """
+
+        file_path = graph_file_path + LANDMARKS_FILE_SUFFIX
+
+        if os.path.exists(file_path) and os.path.getmtime(file_path) >= os.path.getmtime(graph_file_path):
+            index = LandmarkIndex.load(file_path)
+            if index.number_of_vertices == graph.number_of_vertices and index.number_of_edges == graph.number_of_edges:
+                return index
+
+        index = LandmarkIndex.build(graph, number_of_landmarks)
+        index.save(file_path)
+
+        return index
+
+    # ----------------------- #
+
+    def __repr__(self) -> str:
+        return f"LandmarkIndex({len(self.__landmarks)}, {self.number_of_vertices})"
+
+
+def lowest_cost_path_alt_weighted_directed(graph: WeightedDirectedGraph, index: LandmarkIndex,
+                                           start: Vertex, end: Vertex) -> tuple[int, list[Vertex]]:
+    """
+    Computes the lowest cost path between start and end in graph.
+    Utilizes the A* algorithm with the landmark lower bounds as heuristic (ALT).
+
+    :param graph: WeightedDirectedGraph | FrozenGraph, the graph to find the lowest cost path in
+    :param index: LandmarkIndex, the landmark index of the graph
+    :param start: Vertex, the start point
+    :param end: Vertex, the end point
+
+    :return: int, the cost of the lowest cost path (inf if no path exists)
+             list[Vertex], the lowest cost path between the start and end vertices
+             [], empty list if no path exists
+
+    :raises GraphError: if the start or end vertices are not in the graph
+                        if the index does not match the graph
+    """
+
+    if not graph.is_vertex(start) or not graph.is_vertex(end):
+        raise GraphError("Vertex not in graph!")
+
+    if index.number_of_vertices != graph.number_of_vertices:
+        raise GraphError("Landmark index does not match the graph!")
+
+    start, end = Vertex(start), Vertex(end)
+
+    # the bounds are passed as plain floats, much faster than NumPy scalars in the search loop
+    bounds = index.lower_bounds(end)
+
+    if isinstance(graph, FrozenGraph):
+        # the search runs on the positions of the snapshot, the bounds are indexed by vertex value
+        cost, walk = _lowest_cost_path_alt(csr_neighbors(graph, costs=True), bounds[graph.values].tolist(),
+                                           graph.position(start), graph.position(end))
+        return cost, [graph.vertex(position) for position in walk]
+
+    return _lowest_cost_path_alt(graph.get_outbound_costs, bounds.tolist(), start, end)
+
+
+def _lowest_cost_path_alt(neighbors, bounds: list[float], start: Vertex, end: Vertex) -> tuple[int, list[Vertex]]:
+    if bounds[start] == numpy.inf:
+        return numpy.inf, []
+
+    tentative = {start: 0}
+    parents = {start: None}
+    settled = set()
+
+    # initialize the priority queue with (cost + bound, vertex) pairs
+    queue = [(bounds[start], start)]
+    while queue:
+        _, current_vertex = heapq.heappop(queue)
+
+        # ignore outdated entries (we already found a better path to the vertex)
+        if current_vertex in settled:
+            continue
+        settled.add(current_vertex)
+
+        if current_vertex == end:
+            break
+
+        current_cost = tentative[current_vertex]
+        for neighbor, cost in neighbors(current_vertex):
+            new_cost = current_cost + cost
+            if neighbor not in tentative or new_cost < tentative[neighbor]:
+                tentative[neighbor] = new_cost
+                parents[neighbor] = current_vertex
+
+                # vertices that can not reach end are never pushed
+                if bounds[neighbor] != numpy.inf:
+                    heapq.heappush(queue, (new_cost + bounds[neighbor], neighbor))
+
+    if end not in settled:
+        return numpy.inf, []
+
+    walk = []
+    current_vertex = end
+    while current_vertex is not None:
+        walk.append(current_vertex)
+        current_vertex = parents[current_vertex]
+    walk.reverse()
+
+    return tentative[end], walk
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+import numpy
+from numpy import ndarray
+
+
+class SpilledMatrixList:
+
+    """
+    A list of matrices that keeps at most max_in_memory of them in RAM.
+    When the cap is exceeded the least recently used matrix is dropped from RAM,
+    after being written to a numpy.memmap file in a temporary directory the first time.
+    The matrices that are not in RAM are loaded back from their file when they are accessed.
+    """
+
+    def __init__(self, max_in_memory: int = 2, directory: str = None):
+        """
+        Initializes the list.
+
+        :param max_in_memory: int, the maximum number of matrices kept in RAM
+        :param directory: str, the directory of the memmap files (None for a new temporary directory)
+
+        :raises ValueError: if max_in_memory is smaller than 1
+        """
+
+        if max_in_memory < 1:
+            raise ValueError("At least one matrix must be kept in memory!")
+
+        self.__max_in_memory = max_in_memory
+        self.__directory = tempfile.mkdtemp(prefix="matrices_", dir=directory)
+        self.__shapes = []
+        self.__on_disk = set()
+        self.__in_memory = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__shapes)
+
+    def __getitem__(self, index: int) -> ndarray:
+        if index < 0:
+            index += len(self.__shapes)
+
+        if not 0 <= index < len(self.__shapes):
+            raise IndexError("Matrix index out of range!")
+
+        if index in self.__in_memory:
+            self.__in_memory.move_to_end(index)
+            return self.__in_memory[index]
+
+        matrix = numpy.array(numpy.memmap(self.__file_path(index), dtype=numpy.float64, mode="r",
+                                          shape=self.__shapes[index]))
+        self.__keep_in_memory(index, matrix)
+
+        return matrix
+
+    def __iter__(self):
+        for index in range(len(self.__shapes)):
+            yield self[index]
+
+    # ----------------------- #
+
+    def append(self, matrix: ndarray):
+        """
+        Appends a matrix to the list.
+
+        :param matrix: ndarray, the matrix to append
+        """
+
+        self.__shapes.append(matrix.shape)
+        self.__keep_in_memory(len(self.__shapes) - 1, matrix)
+
+    def close(self):
+        """
+        Drops the matrices and removes their memmap files.
+        """
+
+        self.__in_memory.clear()
+        self.__on_disk.clear()
+        self.__shapes.clear()
+        shutil.rmtree(self.__directory, ignore_errors=True)
+
+    # ----------------------- #
+
+    def __file_path(self, index: int) -> str:
+        return os.path.join(self.__directory, f"matrix_{index}.bin")
+
+    def __keep_in_memory(self, index: int, matrix: ndarray):
+        self.__in_memory[index] = matrix
+        self.__in_memory.move_to_end(index)
+
+        while len(self.__in_memory) > self.__max_in_memory:
+            evicted_index, evicted_matrix = self.__in_memory.popitem(last=False)
+
+            if evicted_index not in self.__on_disk:
+                spilled = numpy.memmap(self.__file_path(evicted_index), dtype=numpy.float64, mode="w+",
+                                       shape=evicted_matrix.shape)
+                spilled[:] = evicted_matrix
+                spilled.flush()
+                self.__on_disk.add(evicted_index)
+
+    # ----------------------- #
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        # __init__ may have raised before the directory was created
+        directory = getattr(self, "_SpilledMatrixList__directory", None)
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,247 @@
+import numpy
+from numpy import ndarray
+
+from graph.directed_graph import GraphError
+from graph.frozen_graph import FrozenGraph
+from graph.undirected_graph import UndirectedGraph
+from graph.vertex import Vertex
+
+
+# number of searches advanced together by the multi-source BFS (one bit of a uint64 each)
+SOURCES_PER_BATCH = 64
+
+
+def edge_arrays(graph) -> tuple[ndarray, ndarray]:
+    """
+    Returns the edges of a graph as two parallel arrays of vertex values,
+    the edges of an undirected graph are returned in both directions.
+    A FrozenGraph snapshot is converted without iterating over its edges.
+
+    :param graph: DirectedGraph | UndirectedGraph | FrozenGraph, the graph
+
+    :return: ndarray, the start vertex of each edge
+             ndarray, the end vertex of each edge
+    """
+
+    if isinstance(graph, FrozenGraph):
+        return numpy.repeat(graph.values, numpy.diff(graph.out_indptr)), graph.values[graph.out_indices]
+
+    if isinstance(graph, UndirectedGraph):
+        neighbors = graph.get_neighbors
+    else:
+        neighbors = graph.get_outbound_vertices
+
+    starts, ends = [], []
+    for vertex in graph.vertices:
+        for neighbor in neighbors(vertex):
+            starts.append(vertex.value)
+            ends.append(neighbor.value)
+
+    return numpy.array(starts, dtype=numpy.int64), numpy.array(ends, dtype=numpy.int64)
+
+
+def check_numbered_vertices(graph):
+    """
+    Checks that the vertices of a graph are numbered from 0 to n - 1, as the algorithms that index arrays
+    by vertex value expect.
+
+    :param graph: DirectedGraph | UndirectedGraph | FrozenGraph, the graph
+
+    :raises GraphError: if the vertices are not numbered from 0 to n - 1
+    """
+
+    if isinstance(graph, FrozenGraph):
+        values = graph.values
+    else:
+        values = numpy.fromiter(graph.vertices, dtype=numpy.int64, count=graph.number_of_vertices)
+
+    # the values are distinct, so they are 0, ..., n - 1 if they range from 0 to n - 1
+    if len(values) and (values.min() != 0 or values.max() != len(values) - 1):
+        raise GraphError("The vertices are not numbered from 0 to n - 1!")
+
+
+def csr_neighbors(graph: FrozenGraph, backward: bool = False, costs: bool = False):
+    """
+    Returns a function that lists the neighbors of a position of a snapshot, read directly from its CSR arrays.
+    A search run on the positions skips the vertex lookups and the vertex objects of the graph methods,
+    its result is mapped back with graph.vertex(position).
+
+    :param graph: FrozenGraph, the snapshot
+    :param backward: bool, True for the predecessors instead of the successors
+    :param costs: bool, True for (position, cost) pairs instead of positions (the snapshot must be weighted)
+
+    :return: callable, returns the neighbors of a position
+    """
+
+    if backward:
+        indptr, indices, weights = graph.in_indptr, graph.in_indices, graph.in_weights
+    else:
+        indptr, indices, weights = graph.out_indptr, graph.out_indices, graph.out_weights
+
+    if costs:
+        def neighbors(position: int):
+            start, end = indptr[position], indptr[position + 1]
+            return zip(indices[start:end].tolist(), weights[start:end].tolist())
+    else:
+        def neighbors(position: int):
+            return indices[indptr[position]:indptr[position + 1]].tolist()
+
+    return neighbors
+
+
+def depth_first_search(neighbors, sources, visited: set = None, pre_order=None, post_order=None,
+                       visited_neighbor=None) -> set:
+    """
+    Searches depth-first from each source that is not visited yet, in order, with an explicit stack
+    instead of recursion: the stack holds the vertices of the current walk together with the iterators over their
+    neighbors, so a search resumes each vertex where it left off and its depth is not bounded by the C stack.
+
+    :param neighbors: callable, returns an iterable of the neighbors of a vertex (ex: graph.get_outbound_vertices)
+    :param sources: iterable, the start points (ex: graph.vertices to search the whole graph)
+    :param visited: set, the vertices that are not searched again, updated in place (a new set if None)
+    :param pre_order: callable, called as pre_order(vertex, parent) when a vertex is reached
+                      (parent is None for a source)
+    :param post_order: callable, called as post_order(vertex, parent) when all the neighbors of a vertex are done
+    :param visited_neighbor: callable, called as visited_neighbor(vertex, neighbor) for each neighbor of a vertex
+                             that was already visited when it is looked at
+
+    :return: set, the visited vertices
+    """
+
+    if visited is None:
+        visited = set()
+
+    for source in sources:
+        if source in visited:
+            continue
+
+        visited.add(source)
+        if pre_order is not None:
+            pre_order(source, None)
+
+        stack = [(source, iter(neighbors(source)))]
+        while stack:
+            vertex, iterator = stack[-1]
+
+            # the for loop goes on from the last neighbor that was looked at, it is left to go one level deeper
+            for neighbor in iterator:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    if pre_order is not None:
+                        pre_order(neighbor, vertex)
+
+                    stack.append((neighbor, iter(neighbors(neighbor))))
+                    break
+
+                if visited_neighbor is not None:
+                    visited_neighbor(vertex, neighbor)
+
+            else:
+                stack.pop()
+                if post_order is not None:
+                    post_order(vertex, stack[-1][0] if stack else None)
+
+    return visited
+
+
+def breadth_first_search(neighbors, sources, visited: set = None, pre_order=None) -> list:
+    """
+    Searches breadth-first from each source that is not visited yet, in order, with a queue.
+
+    :param neighbors: callable, returns an iterable of the neighbors of a vertex (ex: graph.get_neighbors)
+    :param sources: iterable, the start points
+    :param visited: set, the vertices that are not searched again, updated in place (a new set if None)
+    :param pre_order: callable, called as pre_order(vertex, parent) when a vertex is reached
+                      (parent is None for a source)
+
+    :return: list, the vertices reached by the search, in the order they were reached
+    """
+
+    if visited is None:
+        visited = set()
+
+    order = []
+    for source in sources:
+        if source in visited:
+            continue
+
+        visited.add(source)
+        if pre_order is not None:
+            pre_order(source, None)
+
+        # the vertices of order from index on are the queue
+        index = len(order)
+        order.append(source)
+
+        while index < len(order):
+            vertex = order[index]
+            index += 1
+
+            for neighbor in neighbors(vertex):
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    if pre_order is not None:
+                        pre_order(neighbor, vertex)
+
+                    order.append(neighbor)
+
+    return order
+
+
+def hop_distances_multi_source_bfs(graph, sources: list[Vertex]) -> ndarray:
+    """
+    Computes the number of edges of the shortest walk from each source to every vertex.
+    Utilizes a bit-parallel multi-source BFS: up to 64 searches run together, the frontier and the visited
+    vertices of each search are one bit of a uint64 mask per vertex, so one pass over the edges advances them all.
+    The vertices of the graph must be numbered from 0 to n - 1.
+
+    :param graph: DirectedGraph | UndirectedGraph | FrozenGraph, the graph to search
+    :param sources: list[Vertex], the start points
+
+    :return: ndarray, int32 sources x vertices matrix, distances[i][v] is the distance from sources[i] to v
+             (-1 if v is not accessible)
+
+    :raises GraphError: if a source is not in the graph
+                        if the vertices are not numbered from 0 to n - 1
+    """
+
+    check_numbered_vertices(graph)
+
+    for source in sources:
+        if not graph.is_vertex(source):
+            raise GraphError("Vertex not in graph!")
+
+    sources = [Vertex(source) for source in sources]
+    starts, ends = edge_arrays(graph)
+    distances = numpy.full((len(sources), graph.number_of_vertices), -1, dtype=numpy.int32)
+
+    for batch_start in range(0, len(sources), SOURCES_PER_BATCH):
+        batch = sources[batch_start:batch_start + SOURCES_PER_BATCH]
+        batch_distances = distances[batch_start:batch_start + len(batch)]
+        bits = numpy.left_shift(numpy.uint64(1), numpy.arange(len(batch), dtype=numpy.uint64))
+
+        seen = numpy.zeros(graph.number_of_vertices, dtype=numpy.uint64)
+        frontier = numpy.zeros(graph.number_of_vertices, dtype=numpy.uint64)
+        for index, source in enumerate(batch):
+            seen[source.value] |= bits[index]
+            frontier[source.value] |= bits[index]
+            batch_distances[index][source.value] = 0
+
+        level = 0
+        while frontier.any():
+            level += 1
+
+            # every search whose frontier contains the start of an edge reaches its end
+            active = frontier[starts] != 0
+            next_frontier = numpy.zeros_like(frontier)
+            numpy.bitwise_or.at(next_frontier, ends[active], frontier[starts[active]])
+            next_frontier &= ~seen
+
+            reached = numpy.nonzero(next_frontier)[0]
+            searches, vertices = numpy.nonzero((next_frontier[reached, None] & bits[None, :]).T)
+            batch_distances[searches, reached[vertices]] = level
+
+            seen |= next_frontier
+            frontier = next_frontier
+
+    return distances
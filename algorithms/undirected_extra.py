@@ -1,8 +1,8 @@
 import random
-import sys
 
 from graph.undirected_graph import UndirectedGraph
 from graph.vertex import Vertex
+from algorithms.traversal import depth_first_search, breadth_first_search
 
 
 def generate_rand_undirected_graph(number_of_vertices: int, number_of_edges: int, graph: UndirectedGraph):
@@ -44,6 +44,8 @@ def generate_rand_undirected_graph(number_of_vertices: int, number_of_edges: int
 def connected_components_kosaraju_undirected(graph: UndirectedGraph) -> list[UndirectedGraph]:
     """
     Returns the connected components of the given graph using Kosaraju's algorithm.
+    The searches are iterative (see depth_first_search and breadth_first_search),
+    so the depth of the graph is not bounded by the recursion limit.
 
     :param graph: UndirectedGraph, the graph to find the connected components of
 
@@ -51,28 +53,13 @@ def connected_components_kosaraju_undirected(graph: UndirectedGraph) -> list[Und
              each connected component is a graph
     """
 
-    default_limit = sys.getrecursionlimit()
-    sys.setrecursionlimit(100000000)
-
-    def dfs(graph: UndirectedGraph, vertex: Vertex, visited: set[Vertex], processed: list[Vertex]):
-        for neighbor in graph.get_neighbors(vertex):
-            if neighbor not in visited:
-                visited.add(neighbor)
-                dfs(graph, neighbor, visited, processed)
-        processed.append(vertex)
-
     # using dfs generate the processed stack
     # processed is used to keep track of the order in which the vertices are processed
     processed = []
-    visited = set()
-    for vertex in graph.vertices:
-        if vertex not in visited:
-            visited.add(vertex)
-            dfs(graph, vertex, visited, processed)
+    depth_first_search(graph.get_neighbors, graph.vertices,
+                       post_order=lambda vertex, parent: processed.append(vertex))
 
     visited = set()
-    queue = []
-
     connected_components = []
 
     # using the processed set/stack, generate the connected components
@@ -84,35 +71,17 @@ def connected_components_kosaraju_undirected(graph: UndirectedGraph) -> list[Und
         if processed_vertex not in visited:
             connected_component = UndirectedGraph()
 
-            queue.append(processed_vertex)
-            visited.add(processed_vertex)
-
             # search for all the vertices that are connected to the current vertex
-            while queue:
-                current_vertex = queue.pop(0)
+            for vertex in breadth_first_search(graph.get_neighbors, [processed_vertex], visited):
+                connected_component.add_vertex(vertex)
 
-                if not connected_component.is_vertex(current_vertex):
-                    connected_component.add_vertex(current_vertex)
-
-                # add all the neighbors of the current vertex to the queue
-                # and search for all the vertices that are connected to the neighbors
-                for neighbor in graph.get_neighbors(current_vertex):
-                    if neighbor not in visited:
-                        visited.add(neighbor)
-                        queue.append(neighbor)
-
-                        # used to create the connected component
-                        if not connected_component.is_vertex(neighbor):
-                            connected_component.add_vertex(neighbor)
-
-                    # used to create the connected component
-                    if not connected_component.is_edge(current_vertex, neighbor):
-                        connected_component.add_edge(current_vertex, neighbor)
+            # used to create the connected component
+            for vertex in connected_component.vertices:
+                for neighbor in graph.get_neighbors(vertex):
+                    if not connected_component.is_edge(vertex, neighbor):
+                        connected_component.add_edge(vertex, neighbor)
 
             # add the connected component to the list of connected components
             connected_components.append(connected_component)
 
-    sys.setrecursionlimit(default_limit)
-
     return connected_components
-
@@ -0,0 +1,49 @@
+import os
+import sys
+import tempfile
+import time
+
+from graph.edge_files import COMPRESSION_EXTENSIONS
+from graph.undirected_graph import UndirectedGraph
+from graph.weighted_directed_graph import WeightedDirectedGraph
+
+"""
+    Benchmarks loading the bundled graph files plain and gzip, bzip2 and xz compressed.
+    Usage: python -m benchmarks.compressed_io [number of loads]
+"""
+
+# the bundled graph files and the classes they are read with
+GRAPH_FILES = [
+    ("data/data_weighted_directed/graph1k.txt", WeightedDirectedGraph),
+    ("data/data_weighted_directed/graph10k.txt", WeightedDirectedGraph),
+    ("data/data_undirected/graph1k.txt", UndirectedGraph),
+    ("data/data_undirected/graph10k.txt", UndirectedGraph),
+]
+
+if __name__ == "__main__":
+    number_of_loads = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    with tempfile.TemporaryDirectory() as directory:
+        for file_path, graph_class in GRAPH_FILES:
+            graph = graph_class()
+            graph.read_from_file_big(file_path, use_cache=False)
+            size = os.path.getsize(file_path)
+            print(f"\n{file_path} ({size / 2 ** 20:.2f} MiB, {graph.number_of_edges} edges)")
+
+            with open(file_path, "rb") as file:
+                data = file.read()
+
+            for extension, compression in [("", None)] + list(COMPRESSION_EXTENSIONS.items()):
+                compressed_path = os.path.join(directory, os.path.basename(file_path) + extension)
+                with (compression.open if compression else open)(compressed_path, "wb") as file:
+                    file.write(data)
+
+                times = []
+                for _ in range(number_of_loads):
+                    start_time = time.perf_counter()
+                    graph_class().read_from_file_big(compressed_path, use_cache=False)
+                    times.append(time.perf_counter() - start_time)
+
+                best_time = min(times)
+                print(f"{extension or 'plain':>6}: {os.path.getsize(compressed_path) / size:6.1%} of the size, "
+                      f"{best_time * 1000:7.1f} ms, {size / 2 ** 20 / best_time:6.1f} MiB/s")
@@ -0,0 +1,45 @@
+import random
+import sys
+import time
+
+from graph.vertex import Vertex
+from graph.weighted_directed_graph import WeightedDirectedGraph
+from algorithms.directed_weighted_extra import edge_cost_range, lowest_costs_weighted_directed
+from algorithms.contraction_hierarchies import ContractionHierarchy, lowest_cost_path_ch_weighted_directed
+
+"""
+    Benchmarks the contraction hierarchy queries against plain Dijkstra's algorithm.
+    Usage: python -m benchmarks.contraction_hierarchies [graph file] [number of queries]
+"""
+
+if __name__ == "__main__":
+    file_path = sys.argv[1] if len(sys.argv) > 1 else "data/data_weighted_directed/graph10k.txt"
+    number_of_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    graph = WeightedDirectedGraph()
+    graph.read_from_file_big(file_path)
+
+    start_time = time.perf_counter()
+    hierarchy = ContractionHierarchy.build(graph)
+    print(f"Build: {time.perf_counter() - start_time:.2f} s, "
+          f"{hierarchy.number_of_edges} edges (the graph has {graph.number_of_edges})")
+
+    random.seed(0)
+    queries = [(Vertex(random.randrange(graph.number_of_vertices)), Vertex(random.randrange(graph.number_of_vertices)))
+               for _ in range(number_of_queries)]
+
+    start_time = time.perf_counter()
+    hierarchy_costs = [lowest_cost_path_ch_weighted_directed(graph, hierarchy, start, end)[0] for start, end in queries]
+    hierarchy_time = time.perf_counter() - start_time
+
+    cost_range = edge_cost_range(graph)
+    start_time = time.perf_counter()
+    dijkstra_costs = [lowest_costs_weighted_directed(graph, start, cost_range=cost_range).get(end, float("inf"))
+                      for start, end in queries]
+    dijkstra_time = time.perf_counter() - start_time
+
+    if hierarchy_costs != dijkstra_costs:
+        print("The costs do not match!")
+
+    print(f"Contraction hierarchy: {hierarchy_time / number_of_queries * 1000:.3f} ms per query")
+    print(f"Dijkstra: {dijkstra_time / number_of_queries * 1000:.3f} ms per query")
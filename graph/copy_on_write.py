@@ -0,0 +1,136 @@
+from collections.abc import Mapping, MutableMapping
+
+
+def writable(mapping: Mapping, key):
+    """
+    Returns the value of a key of a dict or of a CopyOnWriteDict to modify it in place
+    (see CopyOnWriteDict.writable), the value of a dict is returned as it is.
+
+    :param mapping: dict | CopyOnWriteDict, the mapping
+    :param key: the key
+
+    :return: the value of the key
+
+    :raises KeyError: if the key is not in the mapping
+    """
+
+    if type(mapping) is dict:
+        return mapping[key]
+
+    return mapping.writable(key)
+
+
+class CopyOnWriteDict(MutableMapping):
+
+    """
+    A dictionary that shares a base mapping and records its own changes in delta structures,
+    the base mapping is never modified. It is created in O(1) and uses memory proportional to the changes.
+        - _changed: maps each key of the base whose value was set to its new value
+        - _added: maps each key that is not backed by the base (new or removed and added again) to its value
+        - _removed: the keys of the base that were removed
+    The values of a nested dictionary are mappings themselves: reading one returns the value of the base as it is
+    (so read-only algorithms do not create anything), a value that is modified in place must be obtained with
+    writable(key), which wraps the value of the base in a copy-on-write dictionary the first time.
+    The base must not be modified while the dictionary is in use.
+    The keys keep the order of a dict: the keys of the base, then the added keys.
+    """
+
+    __slots__ = ("_base", "_nested", "_changed", "_added", "_removed")
+
+    def __init__(self, base: Mapping, nested: bool = False):
+        """
+        Initializes the dictionary.
+
+        :param base: Mapping, the shared mapping
+        :param nested: bool, True to also record the changes of the values of the base (see the class docstring)
+        """
+
+        self._base = base
+        self._nested = nested
+        self._changed = {}
+        self._added = {}
+        self._removed = set()
+
+    @property
+    def number_of_changes(self) -> int:
+        """
+        Returns the number of keys whose value differs from the base (set, added or removed),
+        a wrapped nested value only counts if it was changed.
+
+        :return: int, the number of changed keys
+        """
+
+        number_of_changed = len(self._changed)
+        if self._nested:
+            number_of_changed = sum(1 for value in self._changed.values()
+                                    if type(value) is not CopyOnWriteDict or value.number_of_changes)
+
+        return number_of_changed + len(self._added) + len(self._removed)
+
+    def writable(self, key):
+        """
+        Returns the value of a key to modify it in place: the value of a nested dictionary that comes from the base
+        is wrapped in a copy-on-write dictionary (once), which records the changes.
+
+        :param key: the key
+
+        :return: the value of the key
+
+        :raises KeyError: if the key is not in the dictionary
+        """
+
+        value = self[key]
+        if self._nested and key not in self._changed and key not in self._added:
+            value = self._changed[key] = CopyOnWriteDict(value)
+
+        return value
+
+    # ----------------------- #
+
+    def __getitem__(self, key):
+        if key in self._changed:
+            return self._changed[key]
+
+        if key in self._added:
+            return self._added[key]
+
+        if key in self._removed:
+            raise KeyError(key)
+
+        return self._base[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._added or (key not in self._removed and key in self._base)
+
+    def __setitem__(self, key, value):
+        if key in self._removed or key not in self._base:
+            self._added[key] = value
+        else:
+            self._changed[key] = value
+
+    def __delitem__(self, key):
+        if key in self._added:
+            del self._added[key]
+            return
+
+        if key in self._removed or key not in self._base:
+            raise KeyError(key)
+
+        self._changed.pop(key, None)
+        self._removed.add(key)
+
+    def __len__(self) -> int:
+        return len(self._base) - len(self._removed) + len(self._added)
+
+    def __iter__(self):
+        if self._removed:
+            for key in self._base:
+                if key not in self._removed:
+                    yield key
+        else:
+            yield from self._base
+
+        yield from self._added
+
+    def __repr__(self) -> str:
+        return f"CopyOnWriteDict({dict(self)})"
@@ -1,17 +1,32 @@
+import copy
+from functools import partial
+
+import numpy
+from numpy import ndarray
+
+from graph.copy_on_write import CopyOnWriteDict, writable
+from graph.edge_files import open_graph_file, read_big_edge_array, write_edge_lines, unique_edges, add_to_adjacency
+from graph.frozen_graph import FrozenGraph
+from graph.graph_cache import read_through_cache
+from graph.graph_error import GraphError
+from graph.graph_journal import ADD_VERTEX, REMOVE_VERTEX, ADD_EDGE, REMOVE_EDGE
+from graph.transaction import Transaction
 from graph.vertex import Vertex
 
 
-class GraphError(Exception):
-    pass
-
-
 class DirectedGraph:
 
     """
     A directed graph is a graph where each edge has a direction.
     It is represented by two dictionaries:
-        - _predecessors: maps each vertex to a list of its predecessors
-        - _successors: maps each vertex to a list of its successors
+        - _predecessors: maps each vertex to an insertion ordered set of its predecessors (a dict with None values)
+        - _successors: maps each vertex to an insertion ordered set of its successors (a dict with None values)
+    The number of edges is kept in _number_of_edges.
+    The undo log of the transaction in progress is kept in _undo_log (None if there is none, see Transaction).
+    The journal the changes are recorded in is kept in _journal (None if there is none, see GraphJournal).
+    The methods also accept plain vertex values, the vertices are stored as Vertex objects:
+    _vertex_pool maps each vertex to its stored Vertex object, so that every vertex is a single object
+    in the dictionaries of the graph (and it is released with the graph).
     """
 
     def __init__(self):
@@ -21,6 +36,10 @@ class DirectedGraph:
 
         self._predecessors = {}
         self._successors = {}
+        self._vertex_pool = {}
+        self._number_of_edges = 0
+        self._undo_log = None
+        self._journal = None
 
     @property
     def number_of_vertices(self) -> int:
@@ -50,7 +69,7 @@ class DirectedGraph:
         :return: int, the number of edges
         """
 
-        return sum([len(self._predecessors[vertex]) for vertex in self._predecessors])
+        return self._number_of_edges
 
     @property
     def edges(self):
@@ -210,8 +229,15 @@ class DirectedGraph:
         if vertex in self._predecessors:
             raise GraphError("Vertex already exists!")
 
-        self._predecessors[vertex] = []
-        self._successors[vertex] = []
+        vertex = Vertex(vertex)
+        if self._undo_log is not None:
+            self._undo_log.append((self.remove_vertex, (vertex,)))
+        if self._journal is not None:
+            self._journal.record(ADD_VERTEX, vertex)
+
+        self._predecessors[vertex] = {}
+        self._successors[vertex] = {}
+        self._vertex_pool[vertex] = vertex
 
     def remove_vertex(self, vertex: Vertex):
         """
@@ -225,14 +251,24 @@ class DirectedGraph:
         if vertex not in self._predecessors:
             raise GraphError("Invalid vertex!")
 
+        if self._undo_log is not None:
+            self._log_remove_vertex(vertex)
+        if self._journal is not None:
+            self._journal.record(REMOVE_VERTEX, vertex)
+
+        # a loop is both a predecessor and a successor of the vertex
+        self._number_of_edges -= len(self._predecessors[vertex]) + len(self._successors[vertex]) - \
+            (vertex in self._successors[vertex])
+
         for predecessor in self._predecessors[vertex]:
-            self._successors[predecessor].remove(vertex)
+            del writable(self._successors, predecessor)[vertex]
 
         for successor in self._successors[vertex]:
-            self._predecessors[successor].remove(vertex)
+            del writable(self._predecessors, successor)[vertex]
 
         del self._predecessors[vertex]
         del self._successors[vertex]
+        del self._vertex_pool[vertex]
 
     def add_edge(self, vertex_1: Vertex, vertex_2: Vertex, cost: int = None):
         """
@@ -251,8 +287,15 @@ class DirectedGraph:
         if vertex_2 in self._successors[vertex_1]:
             raise GraphError("Edge already exists!")
 
-        self._predecessors[vertex_2].append(vertex_1)
-        self._successors[vertex_1].append(vertex_2)
+        vertex_1, vertex_2 = self._vertex_pool[vertex_1], self._vertex_pool[vertex_2]
+        if self._undo_log is not None:
+            self._undo_log.append((self.remove_edge, (vertex_1, vertex_2)))
+        if self._journal is not None:
+            self._journal.record(ADD_EDGE, vertex_1, vertex_2, cost)
+
+        writable(self._predecessors, vertex_2)[vertex_1] = None
+        writable(self._successors, vertex_1)[vertex_2] = None
+        self._number_of_edges += 1
 
     def remove_edge(self, vertex_1: Vertex, vertex_2: Vertex):
         """
@@ -270,67 +313,237 @@ class DirectedGraph:
         if vertex_2 not in self._successors[vertex_1]:
             raise GraphError("Edge does not exist!")
 
-        self._predecessors[vertex_2].remove(vertex_1)
-        self._successors[vertex_1].remove(vertex_2)
+        if self._undo_log is not None:
+            self._undo_log.append((self.add_edge, (vertex_1, vertex_2, self._edge_cost(vertex_1, vertex_2))))
+        if self._journal is not None:
+            self._journal.record(REMOVE_EDGE, vertex_1, vertex_2)
+
+        del writable(self._predecessors, vertex_2)[vertex_1]
+        del writable(self._successors, vertex_1)[vertex_2]
+        self._number_of_edges -= 1
+
+    def transaction(self) -> Transaction:
+        """
+        Starts a transaction: the changes made until it ends can be rolled back (see Transaction).
+        Ex: with graph.transaction() as transaction: ...
+
+        :return: Transaction, the transaction
+
+        :raises GraphError: if a transaction is already in progress
+        """
+
+        return Transaction(self)
+
+    def _log_remove_vertex(self, vertex: Vertex):
+        # records the inverse of removing a vertex: adding it back with its edges and their costs
+        edges = [(predecessor, vertex, self._edge_cost(predecessor, vertex)) for predecessor in self._predecessors[vertex]]
+        edges += [(vertex, successor, self._edge_cost(vertex, successor)) for successor in self._successors[vertex]
+                  if successor != vertex]
+
+        self._undo_log.append((self._restore_vertex, (vertex, edges)))
+
+    def _restore_vertex(self, vertex: Vertex, edges: list[tuple]):
+        # adds a removed vertex back, with its (start vertex, end vertex, cost) edges
+        self.add_vertex(vertex)
+        for vertex_1, vertex_2, cost in edges:
+            self.add_edge(vertex_1, vertex_2, cost)
+
+    def _edge_cost(self, vertex_1: Vertex, vertex_2: Vertex):
+        # the cost of an edge of the graph, None in an unweighted graph
+        return None
+
+    # ----------------------- #
+
+    def add_edges_from(self, edges: ndarray):
+        """
+        Adds many edges at once, without validating them one by one.
+        The missing vertices are added, the repeated edges and the edges already in the graph are skipped.
+        During a transaction or with a journal the edges are added one by one, so that they are recorded.
+
+        :param edges: ndarray, integer array with one row per edge: start and end vertex values
+                      (any other columns are ignored)
+        """
+
+        self._add_edge_rows(edges)
+
+    def _add_vertices_from(self, vertices: list[Vertex]):
+        # adds the vertices that are not in the graph yet, without validating them one by one
+        if self._undo_log is not None or self._journal is not None:
+            for vertex in vertices:
+                if vertex not in self._predecessors:
+                    self.add_vertex(vertex)
+            return
+
+        for vertex in vertices:
+            if vertex not in self._predecessors:
+                self._predecessors[vertex] = {}
+                self._successors[vertex] = {}
+                self._vertex_pool[vertex] = vertex
+
+    def _add_edge_rows(self, edges: ndarray) -> tuple[ndarray, list[Vertex], list[Vertex]]:
+        # adds the edges of the rows, returns the distinct rows and their start and end vertices
+        edges = unique_edges(numpy.asarray(edges))
+        values, positions = numpy.unique(edges[:, :2], return_inverse=True)
+        positions = positions.reshape(-1, 2)
+
+        # the vertices already in the graph are reused
+        values = values.tolist()
+        vertices = numpy.empty(len(values), dtype=object)
+        vertices[:] = list(map(self._vertex_pool.get, values, map(Vertex, values)))
+        self._add_vertices_from(vertices.tolist())
+
+        if self._undo_log is not None or self._journal is not None:
+            return self._add_edge_rows_one_by_one(edges, vertices[positions[:, 0]].tolist(),
+                                                  vertices[positions[:, 1]].tolist())
+
+        self._number_of_edges += add_to_adjacency(self._successors, vertices, positions[:, 0], positions[:, 1])
+        add_to_adjacency(self._predecessors, vertices, positions[:, 1], positions[:, 0])
+
+        return edges, vertices[positions[:, 0]].tolist(), vertices[positions[:, 1]].tolist()
+
+    def _add_edge_rows_one_by_one(self, edges: ndarray, starts: list[Vertex],
+                                  ends: list[Vertex]) -> tuple[ndarray, list[Vertex], list[Vertex]]:
+        # adds the edges of the distinct rows that are not in the graph with add_edge (with the costs of the rows)
+        costs = edges[:, 2].tolist() if edges.shape[1] > 2 else [0] * len(edges)
+        for start, end, cost in zip(starts, ends, costs):
+            if not self.is_edge(start, end):
+                self.add_edge(start, end, cost)
+
+        return edges, starts, ends
+
+    def freeze(self) -> FrozenGraph:
+        """
+        Returns an immutable compressed sparse row snapshot of the graph,
+        later changes of the graph do not affect the snapshot.
+
+        :return: FrozenGraph, the snapshot
+        """
+
+        vertices = list(self._predecessors)
+        return FrozenGraph.from_adjacency(vertices, [self._successors[vertex] for vertex in vertices],
+                                          [self._predecessors[vertex] for vertex in vertices])
+
+    def overlay(self) -> "DirectedGraph":
+        """
+        Returns a copy of the graph in O(1): the copy shares the dictionaries of the graph and records
+        its own changes in delta structures (see CopyOnWriteDict), the graph is not affected by them.
+        The graph must not be modified while the copy is in use, dropping the copy discards its changes.
+
+        :return: DirectedGraph, the copy (of the same class as the graph)
+        """
+
+        overlay = copy.copy(self)
+        overlay._undo_log = None
+        overlay._journal = None
+        overlay._predecessors = CopyOnWriteDict(self._predecessors, nested=True)
+        overlay._successors = CopyOnWriteDict(self._successors, nested=True)
+        overlay._vertex_pool = CopyOnWriteDict(self._vertex_pool)
+
+        return overlay
+
+    def _load_frozen(self, frozen: FrozenGraph):
+        # adds the vertices and the edges of a snapshot, in the same order
+        vertices = list(frozen.vertices)
+        for vertex in vertices:
+            if vertex in self._predecessors:
+                raise GraphError("Vertex already exists!")
+
+        if self._journal is not None:
+            self._load_frozen_one_by_one(frozen, vertices)
+            return
+
+        # the vertices are new, removing them also removes their edges
+        if self._undo_log is not None:
+            self._undo_log.extend((self.remove_vertex, (vertex,)) for vertex in vertices)
+
+        self._successors.update(zip(vertices, map(dict.fromkeys, frozen.successor_lists())))
+        self._predecessors.update(zip(vertices, map(dict.fromkeys, frozen.predecessor_lists())))
+        self._vertex_pool.update(zip(vertices, vertices))
+        self._number_of_edges += frozen.number_of_edges
+
+    def _load_frozen_one_by_one(self, frozen: FrozenGraph, vertices: list[Vertex]):
+        # adds the vertices and the edges (with their costs) of a snapshot with add_vertex and add_edge
+        for vertex in vertices:
+            self.add_vertex(vertex)
+
+        costs = frozen.out_weights.tolist() if frozen.is_weighted else [0] * frozen.out_indptr[-1]
+        edges = ((vertex, neighbor) for vertex, neighbors in zip(vertices, frozen.successor_lists())
+                 for neighbor in neighbors)
+        for (vertex_1, vertex_2), cost in zip(edges, costs):
+            if not self.is_edge(vertex_1, vertex_2):
+                self.add_edge(vertex_1, vertex_2, cost)
 
     # ----------------------- #
 
-    def read_from_file_big(self, file_path: str):
+    def read_from_file_big(self, file_path: str, use_cache: bool = True, number_of_workers: int = 1):
         """
         Reads a graph from a file in big format.
         First line contains the number of vertices and the number of edges.
         The vertices are numbered from 0 to n - 1.
         The next lines contain the edges. Ex: 1 2 means that there is an edge from 1 to 2.
+        The edge lines are parsed at once and added with add_edges_from: a repeated edge line is skipped
+        (the first one is kept, with its cost) instead of raising like add_edge.
+        The file can be gzip, bzip2 or xz compressed (see open_graph_file).
+        An empty graph is read through the cache of the file (see read_through_cache).
 
         :param file_path: str, the path to the file
+        :param use_cache: bool, False to always parse the file
+        :param number_of_workers: int, the number of processes that parse the edge lines (see read_big_edge_array)
+
+        :raises GraphError: if an edge line can not be parsed or has a vertex that is not between 0 and n - 1
         """
 
-        with open(file_path, "r") as file:
-            for index, line in enumerate(file):
-                if index == 0:
-                    number_of_vertices = int(line.split()[0])
-                    for vertex in range(number_of_vertices):
-                        self.add_vertex(Vertex(vertex))
-                    continue
+        read = partial(self._read_big, number_of_workers=number_of_workers)
+        if use_cache and not self._predecessors:
+            read_through_cache(file_path, f"{type(self).__name__}.big", read, self._load_frozen, self.freeze)
+        else:
+            read(file_path)
 
-                line = line.strip().split()
-                vertex_1, vertex_2 = Vertex(int(line[0])), Vertex(int(line[1]))
+    def _read_big(self, file_path: str, number_of_workers: int = 1):
+        number_of_vertices, edges = read_big_edge_array(file_path, number_of_workers)
+        for vertex in range(number_of_vertices):
+            if vertex in self._predecessors:
+                raise GraphError("Vertex already exists!")
 
-                self.add_edge(vertex_1, vertex_2)
+        if len(edges) and (edges[:, :2].min() < 0 or edges[:, :2].max() >= number_of_vertices):
+            raise GraphError("Invalid vertex!")
+
+        self._add_vertices_from(list(map(Vertex, range(number_of_vertices))))
+        self.add_edges_from(edges)
 
-    def read_from_file_big_with_costs(self, file_path: str):
+    def read_from_file_big_with_costs(self, file_path: str, use_cache: bool = True, number_of_workers: int = 1):
         """
         Reads a graph from a file in big format that also contains the costs of the edges.
         The costs will be ignored.
 
         :param file_path: str, the path to the file
+        :param use_cache: bool, False to always parse the file
+        :param number_of_workers: int, the number of processes that parse the edge lines
         """
 
-        with open(file_path, "r") as file:
-            for index, line in enumerate(file):
-                if index == 0:
-                    number_of_vertices = int(line.split()[0])
-                    for vertex in range(number_of_vertices):
-                        self.add_vertex(Vertex(vertex))
-                    continue
-
-                line = line.strip().split()
-                vertex_1, vertex_2, cost = Vertex(int(line[0])), Vertex(int(line[1])), int(line[2])
-
-                if not self.is_edge(vertex_1, vertex_2):
-                    self.add_edge(vertex_1, vertex_2, cost)
+        self.read_from_file_big(file_path, use_cache, number_of_workers)
 
-    def read_from_file(self, file_path: str):
+    def read_from_file(self, file_path: str, use_cache: bool = True):
         """
         Reads a graph from a file.
         The file contains the edges of the graph and the isolated vertices.
         An edge is represented by two vertices. Ex: 1 2 means that there is an edge from 1 to 2.
         An isolated vertex is represented by its number and -1. Ex: 1 -1 means that there is an isolated vertex with the number 1.
+        The file can be gzip, bzip2 or xz compressed (see open_graph_file).
+        An empty graph is read through the cache of the file (see read_through_cache).
 
         :param file_path: str, the path to the file
+        :param use_cache: bool, False to always parse the file
         """
 
-        with open(file_path, "r") as file:
+        if use_cache and not self._predecessors:
+            read_through_cache(file_path, f"{type(self).__name__}.small", self._read_small, self._load_frozen,
+                               self.freeze)
+        else:
+            self._read_small(file_path)
+
+    def _read_small(self, file_path: str):
+        with open_graph_file(file_path, "r") as file:
             for line in file:
                 line = line.strip().split()
 
@@ -348,23 +561,67 @@ class DirectedGraph:
 
     def write_to_file(self, file_path: str):
         """
-        Writes the graph to a file.
+        Writes the graph to a file, in the format read by read_from_file (see write_edge_lines).
+
+        :param file_path: str, the path to the file (ending in .gz, .bz2 or .xz to compress it)
+        """
+
+        write_edge_lines(file_path, self.__file_lines())
+
+    def write_to_file_big(self, file_path: str):
+        """
+        Writes the graph to a file in big format, the format read by read_from_file_big (see write_edge_lines).
+        First line contains the number of vertices and the number of edges, the next lines contain the edges.
+
+        :param file_path: str, the path to the file (ending in .gz, .bz2 or .xz to compress it)
+
+        :raises GraphError: if the vertices are not numbered from 0 to n - 1
+        """
+
+        if self._predecessors and (min(self._predecessors) != 0 or max(self._predecessors) != len(self._predecessors) - 1):
+            raise GraphError("The vertices are not numbered from 0 to n - 1!")
+
+        lines = (self._edge_line(vertex, successor) for vertex, successors in self._successors.items()
+                 for successor in successors)
+        write_edge_lines(file_path, lines, f"{self.number_of_vertices} {self.number_of_edges}")
+
+    def _edge_line(self, vertex_1: Vertex, vertex_2: Vertex) -> str:
+        # the line of an edge in a file
+        return f"{vertex_1} {vertex_2}"
+
+    def __file_lines(self):
+        for vertex, predecessors in self._predecessors.items():
+            if not predecessors and not self._successors[vertex]:
+                yield f"{vertex} -1"
+
+            for predecessor in predecessors:
+                yield self._edge_line(predecessor, vertex)
+
+    def save_binary(self, file_path: str):
+        """
+        Writes the graph to a binary file, the compressed sparse row arrays of its snapshot
+        (see FrozenGraph.save_binary).
 
         :param file_path: str, the path to the file
         """
 
-        with open(file_path, "w") as file:
-            for vertex, predecessors in self._predecessors.items():
-                if not predecessors and not self._successors[vertex]:
-                    file.write(f"{vertex} -1")
-                    if vertex != list(self._predecessors.keys())[-1]:
-                        file.write("\n")
-                    continue
+        self.freeze().save_binary(file_path)
+
+    def load_binary(self, file_path: str):
+        """
+        Reads a graph from a binary file written by save_binary, the vertices and the edges keep their order.
+        To only query the graph, FrozenGraph.load_binary opens the file without building the dictionaries.
+
+        :param file_path: str, the path to the file
+
+        :raises GraphError: if the file is not a binary file of a directed graph or if a vertex already exists
+        """
+
+        frozen = FrozenGraph.load_binary(file_path)
+        if not frozen.is_directed:
+            raise GraphError("Not a directed graph file!")
 
-                for predecessor in predecessors:
-                    file.write(f"{predecessor} {vertex}")
-                    if predecessor != predecessors[-1] or vertex != list(self._predecessors.keys())[-1]:
-                        file.write("\n")
+        self._load_frozen(frozen)
 
     # ----------------------- #
 
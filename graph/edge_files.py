@@ -0,0 +1,379 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy
+from numpy import ndarray
+
+from graph.graph_error import GraphError
+
+
+# number of bytes of an edge file parsed at a time by the streaming readers
+EDGE_CHUNK_SIZE = 1 << 24
+
+# number of lines joined into one write by write_edge_lines
+LINES_PER_WRITE = 1 << 16
+
+# size of the buffers of the compressed graph files
+COMPRESSED_BUFFER_SIZE = 1 << 20
+
+# first bytes of the compressed files read by open_graph_file, and the modules that decompress them
+COMPRESSION_MAGIC_BYTES = {
+    b"\x1f\x8b": gzip,
+    b"BZh": bz2,
+    b"\xfd7zXZ\x00": lzma,
+}
+
+# extensions of the compressed files written by open_graph_file, and the modules that compress them
+COMPRESSION_EXTENSIONS = {
+    ".gz": gzip,
+    ".bz2": bz2,
+    ".xz": lzma,
+}
+
+# smallest number of bytes parsed by a worker of read_big_edge_array
+MIN_BYTES_PER_WORKER = 1 << 20
+
+
+def open_graph_file(file_path: str, mode: str = "r"):
+    """
+    Opens a graph file, a compressed file (gzip, bzip2 or xz) is decompressed or compressed while it is read or
+    written, through a COMPRESSED_BUFFER_SIZE buffer. A file is read compressed if it starts with the magic bytes
+    of a compression format and written compressed if its extension is .gz, .bz2 or .xz.
+
+    :param file_path: str, the path to the file
+    :param mode: str, "r", "rb", "w" or "wb"
+
+    :return: file object, the open file
+    """
+
+    if mode.startswith("r"):
+        compression = file_compression(file_path)
+    else:
+        compression = COMPRESSION_EXTENSIONS.get(os.path.splitext(file_path)[1].lower())
+
+    if compression is None:
+        return open(file_path, mode)
+
+    binary_mode = mode[0] + "b"
+    if mode.startswith("r"):
+        file = io.BufferedReader(compression.open(file_path, binary_mode), COMPRESSED_BUFFER_SIZE)
+    else:
+        file = io.BufferedWriter(compression.open(file_path, binary_mode), COMPRESSED_BUFFER_SIZE)
+
+    return file if mode == binary_mode else io.TextIOWrapper(file)
+
+
+def file_compression(file_path: str):
+    """
+    Detects the compression of a file from its first bytes.
+
+    :param file_path: str, the path to the file
+
+    :return: module, the module that decompresses the file (gzip, bz2 or lzma), None if it is not compressed
+    """
+
+    with open(file_path, "rb") as file:
+        start = file.read(max(map(len, COMPRESSION_MAGIC_BYTES)))
+
+    return next((module for magic_bytes, module in COMPRESSION_MAGIC_BYTES.items() if start.startswith(magic_bytes)),
+                None)
+
+
+def read_big_edge_array(file_path: str, number_of_workers: int = 1) -> tuple[int, ndarray]:
+    """
+    Reads a file in big format at once.
+    First line contains the number of vertices and the number of edges.
+    The next lines contain the edges, one per line, all with the same number of columns (2, or 3 with the costs).
+    With more than one worker, the edge lines of an uncompressed file are split into byte ranges that start and end
+    at line boundaries (of at least MIN_BYTES_PER_WORKER bytes), parsed in parallel by worker processes,
+    which return their arrays through shared memory.
+
+    :param file_path: str, the path to the file
+    :param number_of_workers: int, the number of processes that parse the edge lines
+
+    :return: int, the number of vertices
+             ndarray, int64 array with one row per edge line: start, end (and cost) values
+
+    :raises GraphError: if the edge lines can not be parsed
+    """
+
+    if number_of_workers > 1 and file_compression(file_path) is None:
+        with open(file_path, "rb") as file:
+            number_of_vertices = int(file.readline().split()[0])
+            ranges = _line_aligned_ranges(file, os.path.getsize(file_path), number_of_workers)
+
+        if len(ranges) > 1:
+            return number_of_vertices, _parse_ranges_in_parallel(file_path, ranges)
+
+    with open_graph_file(file_path, "rb") as file:
+        number_of_vertices = int(file.readline().split()[0])
+        data = file.read()
+
+    return number_of_vertices, parse_edge_lines(data)
+
+
+def _line_aligned_ranges(file, size: int, number_of_ranges: int) -> list[tuple[int, int]]:
+    # splits the rest of the file (from its position) into ranges that start at the beginning of a line
+    start = file.tell()
+    number_of_ranges = max(1, min(number_of_ranges, (size - start) // MIN_BYTES_PER_WORKER))
+
+    boundaries = [start]
+    for index in range(1, number_of_ranges):
+        file.seek(start + (size - start) * index // number_of_ranges)
+        file.readline()
+        if file.tell() > boundaries[-1]:
+            boundaries.append(file.tell())
+    boundaries.append(size)
+
+    return [(range_start, range_end) for range_start, range_end in zip(boundaries, boundaries[1:])
+            if range_start < range_end]
+
+
+def _parse_ranges_in_parallel(file_path: str, ranges: list[tuple[int, int]]) -> ndarray:
+    # the workers return the names and the shapes of the shared memory blocks of their arrays,
+    # which are copied into the result and released here.
+    # The workers share the resource tracker of this process, which then knows the blocks are released
+    resource_tracker.ensure_running()
+    with ProcessPoolExecutor(len(ranges)) as executor:
+        futures = [executor.submit(_parse_range_to_shared_memory, file_path, start, end) for start, end in ranges]
+
+    blocks = [(shared_memory.SharedMemory(future.result()[0]), future.result()[1])
+              for future in futures if future.exception() is None]
+    try:
+        for future in futures:
+            if future.exception() is not None:
+                raise future.exception()
+
+        shapes = [shape for _, shape in blocks if shape[0]]
+        if len({shape[1] for shape in shapes}) > 1:
+            raise GraphError("Invalid edge lines!")
+
+        edges = numpy.empty((sum(shape[0] for shape in shapes), shapes[0][1] if shapes else 2), dtype=numpy.int64)
+        position = 0
+        for memory, shape in blocks:
+            if shape[0]:
+                edges[position:position + shape[0]] = numpy.ndarray(shape, dtype=numpy.int64, buffer=memory.buf)
+                position += shape[0]
+
+        return edges
+
+    finally:
+        for memory, _ in blocks:
+            memory.close()
+            memory.unlink()
+
+
+def _parse_range_to_shared_memory(file_path: str, start: int, end: int) -> tuple[str, tuple[int, int]]:
+    # runs in a worker process: parses a byte range of the file into a new shared memory block
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    edges = parse_edge_lines(data)
+    memory = shared_memory.SharedMemory(create=True, size=max(edges.nbytes, 1))
+    numpy.ndarray(edges.shape, dtype=numpy.int64, buffer=memory.buf)[:] = edges
+    memory.close()
+
+    return memory.name, edges.shape
+
+
+def parse_edge_lines(data: bytes) -> ndarray:
+    """
+    Parses edge lines (whitespace separated integers, the same number of columns on every line),
+    with the C parser of numpy.loadtxt. Blank lines are skipped.
+
+    :param data: bytes, the edge lines
+
+    :return: ndarray, int64 array with one row per line
+
+    :raises GraphError: if the lines can not be parsed or do not all have the same number of columns
+    """
+
+    if not data.strip():
+        return numpy.empty((0, 2), dtype=numpy.int64)
+
+    try:
+        return numpy.loadtxt(io.BytesIO(data), dtype=numpy.int64, ndmin=2)
+    except ValueError:
+        raise GraphError("Invalid edge lines!")
+
+
+def read_edge_file_header(file_path: str) -> tuple[int, int]:
+    """
+    Reads the first line of a file in big format.
+
+    :param file_path: str, the path to the file
+
+    :return: int, the number of vertices
+             int, the number of edges
+    """
+
+    with open_graph_file(file_path, "rb") as file:
+        number_of_vertices, number_of_edges = file.readline().split()[:2]
+
+    return int(number_of_vertices), int(number_of_edges)
+
+
+def iter_edge_chunks(file_path: str, big: bool = True, chunk_size: int = EDGE_CHUNK_SIZE):
+    """
+    Returns a generator of the edge lines of a file, parsed a chunk of about chunk_size bytes at a time,
+    so a file of any size is read in bounded memory.
+    In big format the first line (the number of vertices and of edges) is skipped.
+    In the other format the isolated vertices are rows with an end of -1 (Ex: 1 -1),
+    the rows of a chunk that mixes them with weighted edges get a cost of 0.
+
+    :param file_path: str, the path to the file
+    :param big: bool, True for a file in big format
+    :param chunk_size: int, the number of bytes read at a time
+
+    :return: generator, int64 arrays with one row per line: start, end (and cost) values
+
+    :raises GraphError: if the lines can not be parsed
+    """
+
+    with open_graph_file(file_path, "rb") as file:
+        if big:
+            file.readline()
+
+        rest = b""
+        while block := file.read(chunk_size):
+            # a chunk ends at the last complete line of the block
+            block = rest + block
+            end = block.rfind(b"\n") + 1
+            data, rest = block[:end], block[end:]
+
+            if data.strip():
+                yield _parse_chunk(data)
+
+        if rest.strip():
+            yield _parse_chunk(rest)
+
+
+def iter_edges(file_path: str, big: bool = True, chunk_size: int = EDGE_CHUNK_SIZE):
+    """
+    Returns a generator of the edge lines of a file, one tuple per line (see iter_edge_chunks).
+
+    :param file_path: str, the path to the file
+    :param big: bool, True for a file in big format
+    :param chunk_size: int, the number of bytes read at a time
+
+    :return: generator, (start, end) or (start, end, cost) tuples of values
+
+    :raises GraphError: if the lines can not be parsed
+    """
+
+    for chunk in iter_edge_chunks(file_path, big, chunk_size):
+        yield from map(tuple, chunk.tolist())
+
+
+def _parse_chunk(data: bytes) -> ndarray:
+    # the lines of a chunk have the same number of columns, except isolated vertices next to weighted edges
+    # (or blank lines), then the number of rows is not the number of lines
+    number_of_lines = data.count(b"\n") + (not data.endswith(b"\n"))
+    try:
+        edges = parse_edge_lines(data)
+        if len(edges) == number_of_lines:
+            return edges
+    except GraphError:
+        pass
+
+    try:
+        rows = [list(map(int, line.split())) for line in data.splitlines() if line.strip()]
+        number_of_columns = max(map(len, rows))
+        return numpy.array([row + [0] * (number_of_columns - len(row)) for row in rows], dtype=numpy.int64)
+    except ValueError:
+        raise GraphError("Invalid edge lines!")
+
+
+def write_edge_lines(file_path: str, lines, header: str = None):
+    """
+    Writes lines to a file, separated by newlines (without one after the last line).
+    The lines are joined and written LINES_PER_WRITE at a time. A file path ending in .gz, .bz2 or .xz is written
+    compressed, streaming as well (see open_graph_file).
+
+    :param file_path: str, the path to the file
+    :param lines: iterable, the lines (str, without newlines)
+    :param header: str, a first line (None for no header)
+    """
+
+    lines = iter(lines)
+    with open_graph_file(file_path, "w") as file:
+        separator = ""
+        if header is not None:
+            file.write(header)
+            separator = "\n"
+
+        while batch := list(islice(lines, LINES_PER_WRITE)):
+            file.write(separator + "\n".join(batch))
+            separator = "\n"
+
+
+def unique_edges(edges: ndarray, directed: bool = True) -> ndarray:
+    """
+    Removes the repeated edges of an edge array, keeping the first occurrence of each edge in its place.
+
+    :param edges: ndarray, integer array with one row per edge: start, end (and any other columns)
+    :param directed: bool, False to consider (u, v) and (v, u) the same edge
+
+    :return: ndarray, the rows of the distinct edges, in their original order
+    """
+
+    if not len(edges):
+        return edges
+
+    starts, ends = edges[:, 0], edges[:, 1]
+    if not directed:
+        starts, ends = numpy.minimum(starts, ends), numpy.maximum(starts, ends)
+
+    # one integer key per edge, numpy.unique is much faster on a flat array than on rows
+    low = min(starts.min(), ends.min())
+    span = max(starts.max(), ends.max()) - low + 1
+    _, first_indices = numpy.unique((starts - low) * span + (ends - low), return_index=True)
+
+    return edges[numpy.sort(first_indices)]
+
+
+def add_to_adjacency(adjacency: dict, vertices: ndarray, keys: ndarray, items: ndarray) -> int:
+    """
+    Adds vertices[items[i]] to the ordered set adjacency[vertices[keys[i]]] for every i,
+    in the order of the items, with one dict update per key instead of one per item.
+
+    :param adjacency: dict, maps each vertex to an ordered set (a dict with None values, or a CopyOnWriteDict)
+    :param vertices: ndarray, object array of vertices
+    :param keys: ndarray, the positions in vertices of the vertices whose sets are extended
+    :param items: ndarray, the positions in vertices of the vertices added to the sets
+
+    :return: int, the number of vertices that were not already in their set
+    """
+
+    if not len(keys):
+        return 0
+
+    order = numpy.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    sorted_items = vertices[items[order]].tolist()
+
+    boundaries = (numpy.flatnonzero(numpy.diff(sorted_keys)) + 1).tolist()
+
+    # the sets of a copy-on-write graph are modified through writable (see CopyOnWriteDict)
+    get_set = adjacency.__getitem__ if type(adjacency) is dict else adjacency.writable
+    targets = list(map(get_set, vertices[sorted_keys[[0] + boundaries]].tolist()))
+    size = sum(map(len, targets))
+
+    # the loop runs in C: one dict.fromkeys of a slice of the items and one dict.update per key
+    # (the sets of a copy-on-write graph are not dicts, they are updated through their own update)
+    groups = map(dict.fromkeys, map(sorted_items.__getitem__, map(slice, [0] + boundaries, boundaries + [None])))
+    if all(type(target) is dict for target in targets):
+        deque(map(dict.update, targets, groups), maxlen=0)
+    else:
+        for target, group in zip(targets, groups):
+            target.update(group)
+
+    return sum(map(len, targets)) - size
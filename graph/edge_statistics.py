@@ -0,0 +1,293 @@
+import numpy
+from numpy import ndarray
+
+from graph.edge_files import EDGE_CHUNK_SIZE, read_edge_file_header, iter_edge_chunks
+from graph.graph_error import GraphError
+from graph.vertex import Vertex
+
+
+# number of stored edge keys after which they are deduplicated
+KEYS_COMPACTION_SIZE = 1 << 22
+
+
+class EdgeFileStatistics:
+
+    """
+    Statistics of the edge lines of a file, computed in one pass over its chunks (see iter_edge_chunks)
+    without building the graph:
+        - the in and out degrees of the vertices (the degrees for an undirected file) and their histogram
+        - the number of isolated vertices, of self-loops and of repeated edges
+        - the minimum, maximum and mean cost of the edge lines (None for an unweighted file)
+    The vertices are the vertices of the big format header (0 to n - 1) and the vertices of the lines.
+    By default the memory only depends on the number of vertices: the degrees count the edge lines
+    and the repeated edges are not counted. With distinct, the degrees and the self-loops count every edge once,
+    like the graphs read from the file, which keeps one 8 byte key per distinct edge.
+    The vertex values are expected to fit in 32 bits.
+    """
+
+    def __init__(self, directed: bool = True, distinct: bool = False):
+        """
+        Initializes the statistics of an empty file.
+
+        :param directed: bool, False to consider (u, v) and (v, u) the same edge, each adds to the degree of both
+        :param distinct: bool, True to count the edges instead of the edge lines (and the repeated edges)
+        """
+
+        self.__directed = directed
+        self.__distinct = distinct
+
+        self.__present = numpy.zeros(0, dtype=bool)
+        self.__line_out_degrees = numpy.zeros(0, dtype=numpy.int64)
+        self.__line_in_degrees = numpy.zeros(0, dtype=numpy.int64)
+        self.__number_of_edge_lines = 0
+        self.__number_of_loop_lines = 0
+
+        self.__keys = []
+        self.__number_of_keys = 0
+        self.__distinct_degrees = None
+
+        self.__number_of_costs = 0
+        self.__costs_sum = 0
+        self.__min_cost = None
+        self.__max_cost = None
+
+    @staticmethod
+    def from_file(file_path: str, big: bool = True, directed: bool = True, distinct: bool = False,
+                  chunk_size: int = EDGE_CHUNK_SIZE):
+        """
+        Computes the statistics of a file, reading it a chunk at a time.
+
+        :param file_path: str, the path to the file
+        :param big: bool, True for a file in big format
+        :param directed: bool, False for an undirected file
+        :param distinct: bool, True to count the edges instead of the edge lines (and the repeated edges)
+        :param chunk_size: int, the number of bytes read at a time
+
+        :return: EdgeFileStatistics, the statistics of the file
+
+        :raises GraphError: if the lines can not be parsed
+        """
+
+        statistics = EdgeFileStatistics(directed, distinct)
+        if big:
+            statistics.add_vertices(read_edge_file_header(file_path)[0])
+
+        for chunk in iter_edge_chunks(file_path, big, chunk_size):
+            statistics.update(chunk)
+
+        return statistics
+
+    # ----------------------- #
+
+    def add_vertices(self, number_of_vertices: int):
+        """
+        Adds the vertices 0 to number_of_vertices - 1 (the vertices of a big format header).
+
+        :param number_of_vertices: int, the number of vertices
+        """
+
+        self.__grow(number_of_vertices)
+        self.__present[:number_of_vertices] = True
+
+    def update(self, chunk: ndarray):
+        """
+        Adds the lines of a chunk.
+
+        :param chunk: ndarray, integer array with one row per line: start, end (and cost) values,
+                      an end of -1 is an isolated vertex
+        """
+
+        if not len(chunk):
+            return
+
+        isolated = chunk[:, 1] == -1
+        self.__grow(int(chunk[:, :2].max()) + 1)
+        self.__present[chunk[:, 0]] = True
+
+        edges = chunk[~isolated]
+        if not len(edges):
+            return
+
+        starts, ends = edges[:, 0], edges[:, 1]
+        self.__present[ends] = True
+        loops = starts == ends
+
+        self.__number_of_edge_lines += len(edges)
+        self.__number_of_loop_lines += int(numpy.count_nonzero(loops))
+
+        if not self.__distinct:
+            self.__add_degrees(self.__line_out_degrees, self.__line_in_degrees, starts, ends, loops)
+        else:
+            if not self.__directed:
+                starts, ends = numpy.minimum(starts, ends), numpy.maximum(starts, ends)
+            self.__keys.append((starts << 32) | ends)
+            self.__number_of_keys += len(starts)
+            self.__distinct_degrees = None
+
+            if self.__number_of_keys > KEYS_COMPACTION_SIZE:
+                self.__compact_keys()
+
+        if edges.shape[1] > 2:
+            costs = edges[:, 2]
+            self.__number_of_costs += len(costs)
+            self.__costs_sum += int(costs.sum())
+            low, high = int(costs.min()), int(costs.max())
+            self.__min_cost = low if self.__min_cost is None else min(self.__min_cost, low)
+            self.__max_cost = high if self.__max_cost is None else max(self.__max_cost, high)
+
+    # ----------------------- #
+
+    @property
+    def number_of_vertices(self) -> int:
+        return int(numpy.count_nonzero(self.__present))
+
+    @property
+    def number_of_edge_lines(self) -> int:
+        return self.__number_of_edge_lines
+
+    @property
+    def number_of_edges(self) -> int:
+        """
+        Returns the number of distinct edges (the number of edge lines without distinct).
+
+        :return: int, the number of edges
+        """
+
+        if not self.__distinct:
+            return self.__number_of_edge_lines
+
+        return len(self.__compact_keys())
+
+    @property
+    def number_of_duplicates(self) -> int:
+        """
+        Returns the number of repeated edge lines.
+
+        :return: int, the number of edge lines that repeat an earlier edge
+
+        :raises GraphError: if the statistics do not keep the distinct edges
+        """
+
+        if not self.__distinct:
+            raise GraphError("The repeated edges are only counted with distinct!")
+
+        return self.__number_of_edge_lines - self.number_of_edges
+
+    @property
+    def number_of_self_loops(self) -> int:
+        if not self.__distinct:
+            return self.__number_of_loop_lines
+
+        keys = self.__compact_keys()
+        return int(numpy.count_nonzero((keys >> 32) == (keys & 0xFFFFFFFF)))
+
+    @property
+    def number_of_isolated_vertices(self) -> int:
+        out_degrees, in_degrees = self.__degrees()
+        return int(numpy.count_nonzero(self.__present & (out_degrees == 0) & (in_degrees == 0)))
+
+    @property
+    def out_degrees(self) -> ndarray:
+        """
+        Returns the out degrees of the vertices (the degrees for an undirected file).
+
+        :return: ndarray, out_degrees[v] is the out degree of vertex v (0 for a value that is not a vertex)
+        """
+
+        return self.__degrees()[0]
+
+    @property
+    def in_degrees(self) -> ndarray:
+        """
+        Returns the in degrees of the vertices (the degrees for an undirected file).
+
+        :return: ndarray, in_degrees[v] is the in degree of vertex v (0 for a value that is not a vertex)
+        """
+
+        return self.__degrees()[1]
+
+    def is_vertex(self, vertex: Vertex) -> bool:
+        return 0 <= vertex < len(self.__present) and bool(self.__present[vertex])
+
+    def degree_histogram(self, inbound: bool = False) -> ndarray:
+        """
+        Returns the histogram of the degrees of the vertices.
+
+        :param inbound: bool, True for the in degrees, False for the out degrees
+
+        :return: ndarray, histogram[d] is the number of vertices with degree d
+        """
+
+        degrees = self.__degrees()[1 if inbound else 0]
+        return numpy.bincount(degrees[self.__present], minlength=1)
+
+    # ----------------------- #
+
+    @property
+    def min_cost(self) -> int:
+        return self.__min_cost
+
+    @property
+    def max_cost(self) -> int:
+        return self.__max_cost
+
+    @property
+    def mean_cost(self) -> float:
+        if not self.__number_of_costs:
+            return None
+
+        return self.__costs_sum / self.__number_of_costs
+
+    # ----------------------- #
+
+    def __grow(self, size: int):
+        if size <= len(self.__present):
+            return
+
+        # the arrays at least double, so growing is amortized constant time per vertex
+        size = max(size, 2 * len(self.__present))
+        self.__distinct_degrees = None
+        self.__present = numpy.concatenate([self.__present, numpy.zeros(size - len(self.__present), dtype=bool)])
+        self.__line_out_degrees = numpy.concatenate([self.__line_out_degrees,
+                                                     numpy.zeros(size - len(self.__line_out_degrees), dtype=numpy.int64)])
+        self.__line_in_degrees = numpy.concatenate([self.__line_in_degrees,
+                                                    numpy.zeros(size - len(self.__line_in_degrees), dtype=numpy.int64)])
+
+    def __add_degrees(self, out_degrees: ndarray, in_degrees: ndarray, starts: ndarray, ends: ndarray, loops: ndarray):
+        size = len(out_degrees)
+        if self.__directed:
+            out_degrees += numpy.bincount(starts, minlength=size)
+            in_degrees += numpy.bincount(ends, minlength=size)
+            return
+
+        # an undirected edge adds to the degree of both vertices, a loop only once
+        degrees = numpy.bincount(starts, minlength=size) + numpy.bincount(ends[~loops], minlength=size)
+        out_degrees += degrees
+        in_degrees += degrees
+
+    def __compact_keys(self) -> ndarray:
+        # the distinct edge keys, the stored keys are replaced by them
+        keys = numpy.unique(numpy.concatenate(self.__keys)) if self.__keys else numpy.zeros(0, dtype=numpy.int64)
+        self.__keys = [keys]
+        self.__number_of_keys = len(keys)
+
+        return keys
+
+    def __degrees(self) -> tuple[ndarray, ndarray]:
+        if not self.__distinct:
+            return self.__line_out_degrees, self.__line_in_degrees
+
+        if self.__distinct_degrees is None:
+            keys = self.__compact_keys()
+            starts, ends = keys >> 32, keys & 0xFFFFFFFF
+            out_degrees = numpy.zeros(len(self.__present), dtype=numpy.int64)
+            in_degrees = numpy.zeros(len(self.__present), dtype=numpy.int64)
+            self.__add_degrees(out_degrees, in_degrees, starts, ends, starts == ends)
+            self.__distinct_degrees = out_degrees, in_degrees
+
+        return self.__distinct_degrees
+
+    # ----------------------- #
+
+    def __repr__(self) -> str:
+        return f"EdgeFileStatistics({self.number_of_vertices}, {self.number_of_edge_lines})"
@@ -0,0 +1,420 @@
+import numpy
+from numpy import ndarray
+
+from graph.graph_error import GraphError
+from graph.vertex import Vertex
+
+
+# first bytes of a binary graph file
+BINARY_MAGIC = b"GRAPHCSR"
+
+# version of the binary graph file format
+BINARY_VERSION = 1
+
+# every array of a binary graph file starts at a multiple of this many bytes
+BINARY_ALIGNMENT = 64
+
+# header of a binary graph file, padded to BINARY_ALIGNMENT bytes
+BINARY_HEADER = numpy.dtype({
+    "names": ["magic", "version", "flags", "number_of_vertices", "number_of_entries", "weight_type"],
+    "formats": ["S8", "<u4", "<u4", "<u8", "<u8", "S8"],
+    "offsets": [0, 8, 12, 16, 24, 32],
+    "itemsize": BINARY_ALIGNMENT,
+})
+
+# flags of the binary graph file header
+BINARY_DIRECTED = 1
+BINARY_WEIGHTED = 2
+
+
+class FrozenGraph:
+
+    """
+    An immutable compressed sparse row (CSR) snapshot of a graph, returned by the freeze() method of the graphs.
+    The vertices are numbered by their position in the snapshot, it is represented by read-only arrays:
+        - values: values[i] is the value of the vertex at position i
+        - out_indptr, out_indices: the successors of vertex i are out_indices[out_indptr[i]:out_indptr[i + 1]]
+        - in_indptr, in_indices: the predecessors of vertex i are in_indices[in_indptr[i]:in_indptr[i + 1]]
+        - out_weights, in_weights: the costs of the edges, parallel to out_indices and in_indices
+          (None for an unweighted graph)
+    A snapshot of an undirected graph stores every edge in both directions, the neighbors are the successors.
+    It supports the read-only methods of the graphs, so it can be passed to the algorithms.
+    It can be saved to a binary file and loaded back with numpy.memmap (see save_binary and load_binary).
+    """
+
+    def __init__(self, values: ndarray, out_indptr: ndarray, out_indices: ndarray, in_indptr: ndarray,
+                 in_indices: ndarray, out_weights: ndarray = None, in_weights: ndarray = None, directed: bool = True):
+        """
+        Initializes the snapshot, the arrays are made read-only.
+
+        :param values: ndarray, the values of the vertices
+        :param out_indptr: ndarray, int32 offsets of the successors of each vertex
+        :param out_indices: ndarray, int32 positions of the successors
+        :param in_indptr: ndarray, int32 offsets of the predecessors of each vertex
+        :param in_indices: ndarray, int32 positions of the predecessors
+        :param out_weights: ndarray, the costs of the outbound edges (None for an unweighted graph)
+        :param in_weights: ndarray, the costs of the inbound edges (None for an unweighted graph)
+        :param directed: bool, False for the snapshot of an undirected graph
+        """
+
+        for array in (values, out_indptr, out_indices, in_indptr, in_indices, out_weights, in_weights):
+            if array is not None:
+                array.setflags(write=False)
+
+        self.__values = values
+        self.__out_indptr, self.__out_indices, self.__out_weights = out_indptr, out_indices, out_weights
+        self.__in_indptr, self.__in_indices, self.__in_weights = in_indptr, in_indices, in_weights
+        self.__directed = directed
+
+        # the vertex objects are only created when they are needed, a memory-mapped snapshot opens in constant time
+        self.__vertex_list = None
+        self.__vertex_positions = None
+        self.__identity_values = None
+
+    @staticmethod
+    def from_adjacency(vertices: list[Vertex], successors: list, predecessors: list,
+                       successor_costs: list[list] = None, predecessor_costs: list[list] = None, directed: bool = True):
+        """
+        Builds a snapshot from adjacency lists.
+
+        :param vertices: list[Vertex], the vertices
+        :param successors: list, the successors of each vertex (an iterable of vertices per vertex)
+        :param predecessors: list, the predecessors of each vertex (an iterable of vertices per vertex)
+        :param successor_costs: list[list], the costs of the outbound edges of each vertex (None if unweighted)
+        :param predecessor_costs: list[list], the costs of the inbound edges of each vertex (None if unweighted)
+        :param directed: bool, False for the snapshot of an undirected graph
+
+        :return: FrozenGraph, the snapshot
+        """
+
+        positions = {vertex: position for position, vertex in enumerate(vertices)}
+        values = numpy.array([vertex.value for vertex in vertices], dtype=numpy.int64)
+
+        def csr(adjacency: list) -> tuple[ndarray, ndarray]:
+            indptr = numpy.zeros(len(adjacency) + 1, dtype=numpy.int32)
+            numpy.cumsum([len(neighbors) for neighbors in adjacency], out=indptr[1:])
+            indices = numpy.fromiter((positions[neighbor] for neighbors in adjacency for neighbor in neighbors),
+                                     dtype=numpy.int32, count=int(indptr[-1]))
+            return indptr, indices
+
+        def weights(costs: list[list]) -> ndarray:
+            if costs is None:
+                return None
+            return numpy.array([cost for vertex_costs in costs for cost in vertex_costs])
+
+        return FrozenGraph(values, *csr(successors), *csr(predecessors), weights(successor_costs),
+                           weights(predecessor_costs), directed)
+
+    # ----------------------- #
+
+    @property
+    def values(self) -> ndarray:
+        return self.__values
+
+    @property
+    def out_indptr(self) -> ndarray:
+        return self.__out_indptr
+
+    @property
+    def out_indices(self) -> ndarray:
+        return self.__out_indices
+
+    @property
+    def out_weights(self) -> ndarray:
+        return self.__out_weights
+
+    @property
+    def in_indptr(self) -> ndarray:
+        return self.__in_indptr
+
+    @property
+    def in_indices(self) -> ndarray:
+        return self.__in_indices
+
+    @property
+    def in_weights(self) -> ndarray:
+        return self.__in_weights
+
+    @property
+    def is_directed(self) -> bool:
+        return self.__directed
+
+    @property
+    def is_weighted(self) -> bool:
+        return self.__out_weights is not None
+
+    def position(self, vertex: Vertex) -> int:
+        """
+        Returns the position of a vertex in the snapshot arrays.
+
+        :param vertex: Vertex, the vertex
+
+        :return: int, the position of the vertex
+
+        :raises GraphError: if the vertex is not in the graph
+        """
+
+        if not self.is_vertex(vertex):
+            raise GraphError("Invalid vertex!")
+
+        if self.__identity_values:
+            return int(vertex)
+
+        return self.__positions()[vertex]
+
+    def vertex(self, position: int) -> Vertex:
+        """
+        Returns the vertex at a position of the snapshot arrays.
+
+        :param position: int, the position of the vertex
+
+        :return: Vertex, the vertex
+        """
+
+        return self.__vertices()[position]
+
+    # ----------------------- #
+
+    @property
+    def number_of_vertices(self) -> int:
+        return len(self.__values)
+
+    @property
+    def vertices(self):
+        return iter(self.__vertices())
+
+    @property
+    def number_of_edges(self) -> int:
+        if self.__directed:
+            return len(self.__out_indices)
+
+        # every edge is stored in both directions, except the loops
+        starts = numpy.repeat(numpy.arange(self.number_of_vertices), numpy.diff(self.__out_indptr))
+        loops = int(numpy.count_nonzero(starts == self.__out_indices))
+        return (len(self.__out_indices) - loops) // 2 + loops
+
+    @property
+    def edges(self):
+        vertices = self.__vertices()
+        for position, vertex in enumerate(vertices):
+            for neighbor_position in self.__out_slice(position).tolist():
+                if self.__directed or position <= neighbor_position:
+                    yield vertex, vertices[neighbor_position]
+
+    def is_vertex(self, vertex: Vertex) -> bool:
+        if self.__identity_values is None:
+            # the vertices of most graphs are 0, ..., n - 1 in order, their positions are their values
+            self.__identity_values = bool(numpy.array_equal(self.__values, numpy.arange(len(self.__values))))
+
+        if self.__identity_values:
+            return isinstance(vertex, (int, numpy.integer)) and 0 <= vertex < len(self.__values)
+
+        return vertex in self.__positions()
+
+    def is_edge(self, vertex_1: Vertex, vertex_2: Vertex) -> bool:
+        return bool(numpy.any(self.__out_slice(self.position(vertex_1)) == self.position(vertex_2)))
+
+    # ----------------------- #
+
+    def get_in_degree(self, vertex: Vertex) -> int:
+        position = self.position(vertex)
+        return int(self.__in_indptr[position + 1] - self.__in_indptr[position])
+
+    def get_out_degree(self, vertex: Vertex) -> int:
+        position = self.position(vertex)
+        return int(self.__out_indptr[position + 1] - self.__out_indptr[position])
+
+    def get_inbound_vertices(self, vertex: Vertex):
+        vertices = self.__vertices()
+        for neighbor_position in self.__in_slice(self.position(vertex)).tolist():
+            yield vertices[neighbor_position]
+
+    def get_outbound_vertices(self, vertex: Vertex):
+        vertices = self.__vertices()
+        for neighbor_position in self.__out_slice(self.position(vertex)).tolist():
+            yield vertices[neighbor_position]
+
+    def get_inbound_edges(self, vertex: Vertex):
+        for predecessor in self.get_inbound_vertices(vertex):
+            yield predecessor, vertex
+
+    def get_outbound_edges(self, vertex: Vertex):
+        for successor in self.get_outbound_vertices(vertex):
+            yield vertex, successor
+
+    # the undirected graph names of the same methods
+    get_degree = get_out_degree
+    get_neighbors = get_outbound_vertices
+    get_neighboring_edges = get_outbound_edges
+
+    # ----------------------- #
+
+    def get_edge_cost(self, vertex_1: Vertex, vertex_2: Vertex):
+        if not self.is_weighted:
+            raise GraphError("The graph is not weighted!")
+
+        position = self.position(vertex_1)
+        start = self.__out_indptr[position]
+        matches = numpy.nonzero(self.__out_slice(position) == self.position(vertex_2))[0]
+        if not len(matches):
+            raise GraphError("Invalid edge!")
+
+        return self.__out_weights[start + matches[0]].item()
+
+    def get_outbound_costs(self, vertex: Vertex):
+        position = self.position(vertex)
+        start, end = self.__out_indptr[position], self.__out_indptr[position + 1]
+        vertices = self.__vertices()
+        for neighbor_position, cost in zip(self.__out_indices[start:end].tolist(), self.__out_weights[start:end].tolist()):
+            yield vertices[neighbor_position], cost
+
+    def get_inbound_costs(self, vertex: Vertex):
+        position = self.position(vertex)
+        start, end = self.__in_indptr[position], self.__in_indptr[position + 1]
+        vertices = self.__vertices()
+        for neighbor_position, cost in zip(self.__in_indices[start:end].tolist(), self.__in_weights[start:end].tolist()):
+            yield vertices[neighbor_position], cost
+
+    def successor_lists(self) -> list[list[Vertex]]:
+        """
+        Returns the successors of every vertex (the neighbors for an undirected graph), in the order of the vertices.
+
+        :return: list[list[Vertex]], the successors of each vertex
+        """
+
+        return self.__adjacency_lists(self.__out_indptr, self.__out_indices)
+
+    def predecessor_lists(self) -> list[list[Vertex]]:
+        """
+        Returns the predecessors of every vertex (the neighbors for an undirected graph), in the order of the vertices.
+
+        :return: list[list[Vertex]], the predecessors of each vertex
+        """
+
+        return self.__adjacency_lists(self.__in_indptr, self.__in_indices)
+
+    # ----------------------- #
+
+    def save_binary(self, file_path: str):
+        """
+        Saves the snapshot to a binary file: a BINARY_HEADER followed by the arrays (values, out_indptr,
+        out_indices, in_indptr, in_indices, out_weights, in_weights), little endian, each aligned to
+        BINARY_ALIGNMENT bytes. The in arrays of an undirected graph are the out arrays, they are not repeated.
+
+        :param file_path: str, the path to the file
+        """
+
+        header = numpy.zeros(1, dtype=BINARY_HEADER)
+        header["magic"] = BINARY_MAGIC
+        header["version"] = BINARY_VERSION
+        header["flags"] = (BINARY_DIRECTED if self.__directed else 0) | (BINARY_WEIGHTED if self.is_weighted else 0)
+        header["number_of_vertices"] = len(self.__values)
+        header["number_of_entries"] = len(self.__out_indices)
+        header["weight_type"] = self.__out_weights.dtype.str.encode() if self.is_weighted else b""
+
+        with open(file_path, "wb") as file:
+            file.write(header.tobytes())
+            for array in self.__stored_arrays():
+                file.write(array.tobytes())
+                file.write(bytes(-array.nbytes % BINARY_ALIGNMENT))
+
+    @staticmethod
+    def load_binary(file_path: str, mmap: bool = True):
+        """
+        Loads a snapshot saved with save_binary.
+        With mmap the arrays are read-only numpy.memmap views of the file: nothing is read until it is used,
+        so opening takes the same time for any graph size and several processes share the same pages.
+
+        :param file_path: str, the path to the file
+        :param mmap: bool, True to memory-map the file, False to read it into memory
+
+        :return: FrozenGraph, the loaded snapshot
+
+        :raises GraphError: if the file is not a binary graph file of a supported version
+        """
+
+        header = numpy.fromfile(file_path, dtype=BINARY_HEADER, count=1)
+        if len(header) != 1 or header["magic"][0] != BINARY_MAGIC:
+            raise GraphError("Not a binary graph file!")
+
+        if header["version"][0] != BINARY_VERSION:
+            raise GraphError("Unsupported binary graph file version!")
+
+        flags = int(header["flags"][0])
+        number_of_vertices = int(header["number_of_vertices"][0])
+        number_of_entries = int(header["number_of_entries"][0])
+        weighted = bool(flags & BINARY_WEIGHTED)
+        directed = bool(flags & BINARY_DIRECTED)
+
+        layout = [("<i8", number_of_vertices), ("<i4", number_of_vertices + 1), ("<i4", number_of_entries)]
+        if directed:
+            layout += [("<i4", number_of_vertices + 1), ("<i4", number_of_entries)]
+        if weighted:
+            layout += [(header["weight_type"][0].decode(), number_of_entries)] * (2 if directed else 1)
+
+        arrays = []
+        offset = BINARY_ALIGNMENT
+        for dtype, length in layout:
+            if mmap and length:
+                arrays.append(numpy.memmap(file_path, dtype=dtype, mode="r", offset=offset, shape=(length,)))
+            else:
+                arrays.append(numpy.fromfile(file_path, dtype=dtype, count=length, offset=offset))
+
+            nbytes = numpy.dtype(dtype).itemsize * length
+            offset += nbytes + -nbytes % BINARY_ALIGNMENT
+
+        values, out_indptr, out_indices = arrays[:3]
+        in_indptr, in_indices = arrays[3:5] if directed else (out_indptr, out_indices)
+        out_weights = in_weights = None
+        if weighted:
+            out_weights = arrays[-2] if directed else arrays[-1]
+            in_weights = arrays[-1]
+
+        return FrozenGraph(values, out_indptr, out_indices, in_indptr, in_indices, out_weights, in_weights, directed)
+
+    # ----------------------- #
+
+    def __stored_arrays(self) -> list[ndarray]:
+        # the arrays in the order of the binary file
+        arrays = [self.__values.astype("<i8"), self.__out_indptr.astype("<i4"), self.__out_indices.astype("<i4")]
+        if self.__directed:
+            arrays += [self.__in_indptr.astype("<i4"), self.__in_indices.astype("<i4")]
+
+        if self.is_weighted:
+            weight_type = self.__out_weights.dtype.newbyteorder("<")
+            arrays.append(self.__out_weights.astype(weight_type))
+            if self.__directed:
+                arrays.append(self.__in_weights.astype(weight_type))
+
+        return arrays
+
+    def __adjacency_lists(self, indptr: ndarray, indices: ndarray) -> list[list[Vertex]]:
+        vertices = numpy.empty(len(self.__values), dtype=object)
+        vertices[:] = self.__vertices()
+        neighbors = vertices[indices].tolist()
+
+        bounds = indptr.tolist()
+        return list(map(neighbors.__getitem__, map(slice, bounds[:-1], bounds[1:])))
+
+    def __vertices(self) -> list[Vertex]:
+        if self.__vertex_list is None:
+            self.__vertex_list = list(map(Vertex, self.__values.tolist()))
+
+        return self.__vertex_list
+
+    def __positions(self) -> dict[Vertex, int]:
+        if self.__vertex_positions is None:
+            self.__vertex_positions = {vertex: position for position, vertex in enumerate(self.__vertices())}
+
+        return self.__vertex_positions
+
+    def __out_slice(self, position: int) -> ndarray:
+        return self.__out_indices[self.__out_indptr[position]:self.__out_indptr[position + 1]]
+
+    def __in_slice(self, position: int) -> ndarray:
+        return self.__in_indices[self.__in_indptr[position]:self.__in_indptr[position + 1]]
+
+    # ----------------------- #
+
+    def __repr__(self) -> str:
+        return f"FrozenGraph({self.number_of_vertices}, {self.number_of_edges})"
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+
+from graph.frozen_graph import FrozenGraph
+from graph.graph_error import GraphError
+
+
+# directory of the cache files, next to the graph files (like __pycache__)
+CACHE_DIRECTORY = "__graphcache__"
+
+# suffixes of the cache files: the binary snapshot and the fingerprint of the graph file it was read from
+CACHE_FILE_SUFFIX = ".bin"
+KEY_FILE_SUFFIX = ".key"
+
+# number of bytes hashed at a time
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def read_through_cache(file_path: str, tag: str, read, load, freeze):
+    """
+    Reads a graph file through its cache: if the cache file of the graph file is valid, the graph is loaded from it
+    and the text is not parsed, otherwise the graph file is read and the cache file is (re)written.
+    A cache file is valid if the graph file has the size and the modification time it was written for,
+    or the same size and content hash (a touched or copied file), its fingerprint is then updated.
+    The cache files are written to the CACHE_DIRECTORY next to the graph file, one per tag
+    (a graph file is read differently by different classes and formats). If they can not be written,
+    the graph file is only read.
+
+    :param file_path: str, the path to the graph file
+    :param tag: str, identifies the class and the format the graph file is read with
+    :param read: callable, reads the graph file into the graph
+    :param load: callable, adds the vertices and the edges of a FrozenGraph to the graph
+    :param freeze: callable, returns the FrozenGraph snapshot of the graph
+    """
+
+    cache_path, key_path = cache_file_paths(file_path, tag)
+    status = os.stat(file_path)
+    key = _read_key(key_path)
+
+    digest = None
+    if key is not None and key["size"] == status.st_size and key["mtime_ns"] != status.st_mtime_ns:
+        digest = file_digest(file_path)
+        if digest == key["digest"]:
+            key["mtime_ns"] = status.st_mtime_ns
+            _write_key(key_path, key)
+
+    if key is not None and key["size"] == status.st_size and key["mtime_ns"] == status.st_mtime_ns:
+        try:
+            frozen = FrozenGraph.load_binary(cache_path, mmap=False)
+        except (OSError, GraphError):
+            frozen = None
+
+        if frozen is not None:
+            load(frozen)
+            return
+
+    if digest is None:
+        digest = file_digest(file_path)
+
+    read(file_path)
+
+    try:
+        _write_cache(cache_path, key_path, freeze(), {
+            "size": status.st_size,
+            "mtime_ns": status.st_mtime_ns,
+            "digest": digest,
+        })
+    except OSError:
+        pass
+
+
+def cache_file_paths(file_path: str, tag: str) -> tuple[str, str]:
+    """
+    Returns the paths of the cache files of a graph file.
+
+    :param file_path: str, the path to the graph file
+    :param tag: str, identifies the class and the format the graph file is read with
+
+    :return: str, the path to the binary snapshot
+             str, the path to the fingerprint of the graph file
+    """
+
+    directory, name = os.path.split(os.path.abspath(file_path))
+    path = os.path.join(directory, CACHE_DIRECTORY, f"{name}.{tag}")
+
+    return path + CACHE_FILE_SUFFIX, path + KEY_FILE_SUFFIX
+
+
+def file_digest(file_path: str) -> str:
+    """
+    Returns the content hash of a file.
+
+    :param file_path: str, the path to the file
+
+    :return: str, the hexadecimal BLAKE2b digest of the file
+    """
+
+    digest = hashlib.blake2b()
+    with open(file_path, "rb") as file:
+        while block := file.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def _read_key(key_path: str) -> dict:
+    # the fingerprint written with a cache file, None if there is none
+    try:
+        with open(key_path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_key(key_path: str, key: dict):
+    try:
+        with open(key_path, "w") as file:
+            json.dump(key, file)
+    except OSError:
+        pass
+
+
+def _write_cache(cache_path: str, key_path: str, frozen: FrozenGraph, key: dict):
+    # the old fingerprint is removed first and the new one is written last,
+    # a fingerprint always describes a complete cache file
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    if os.path.exists(key_path):
+        os.remove(key_path)
+
+    temporary_path = cache_path + ".tmp"
+    frozen.save_binary(temporary_path)
+    os.replace(temporary_path, cache_path)
+
+    with open(key_path, "w") as file:
+        json.dump(key, file)
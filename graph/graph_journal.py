@@ -0,0 +1,263 @@
+import os
+import struct
+import threading
+
+import numpy
+
+from graph.graph_error import GraphError
+
+
+# suffixes of the journal files, next to the graph file: the journal that is appended to
+# and the journal whose changes are being written to a new graph file by a compaction
+JOURNAL_FILE_SUFFIX = ".journal"
+COMPACTING_FILE_SUFFIX = ".journal.compacting"
+
+# a record is the code of the change, the values of the (one or two) vertices and the cost (0 if unused)
+RECORD_FORMAT = struct.Struct("<Bqqq")
+
+# codes of the changes
+ADD_VERTEX = 0
+REMOVE_VERTEX = 1
+ADD_EDGE = 2
+REMOVE_EDGE = 3
+SET_EDGE_COST = 4
+
+
+class GraphJournal:
+
+    """
+    An append-only journal of the changes of a graph read from a file, so that the changes are persisted
+    without rewriting the file: each add_vertex, remove_vertex, add_edge, remove_edge and set_edge_cost of the graph
+    appends one fixed size binary record (RECORD_FORMAT) to the journal file next to the graph file.
+    Opening the journal replays the records on the graph, compacting it writes the graph file anew and empties it.
+    The records are replayed as "make it so" changes (an existing edge that is added gets the cost of the record,
+    a missing vertex or edge that is removed is skipped), so replaying changes that a graph file already contains
+    (a compaction interrupted after the file was written) leaves the graph as it is.
+    """
+
+    def __init__(self, graph, file_path: str, big: bool = False, sync: bool = False):
+        """
+        Opens the journal of a graph file for a graph that was read from it: the journal files are replayed on the graph
+        and the changes of the graph are recorded from now on.
+        The journal of an interrupted compaction is replayed first and compacted right away (in the background).
+
+        :param graph: DirectedGraph | UndirectedGraph, the graph
+        :param file_path: str, the path to the graph file
+        :param big: bool, True if the graph file is in big format (the format compactions write it in)
+        :param sync: bool, True to also fsync the journal file after each record
+
+        :raises GraphError: if the graph already has a journal
+        """
+
+        if graph._journal is not None:
+            raise GraphError("The graph already has a journal!")
+
+        self.__graph = graph
+        self.__file_path = file_path
+        self.__big = big
+        self.__sync = sync
+
+        self.__journal_path = file_path + JOURNAL_FILE_SUFFIX
+        self.__compacting_path = file_path + COMPACTING_FILE_SUFFIX
+        self.__compaction = None
+        self.__compaction_error = None
+
+        interrupted = os.path.exists(self.__compacting_path)
+        for path in [self.__compacting_path, self.__journal_path]:
+            if os.path.exists(path):
+                self.__replay(path)
+
+        self.__file = open(self.__journal_path, "ab")
+        graph._journal = self
+
+        # if it can not be compacted, the compacting journal is kept and replayed again next time
+        if interrupted:
+            try:
+                self.compact()
+            except GraphError:
+                pass
+
+    @staticmethod
+    def exists(file_path: str) -> bool:
+        """
+        Checks if a graph file has changes in a journal.
+
+        :param file_path: str, the path to the graph file
+
+        :return: True if there is a journal file next to the graph file, False otherwise
+        """
+
+        return os.path.exists(file_path + JOURNAL_FILE_SUFFIX) or os.path.exists(file_path + COMPACTING_FILE_SUFFIX)
+
+    @staticmethod
+    def can_compact(graph, big: bool) -> bool:
+        """
+        Checks if a graph can be written to its graph file by a compaction:
+        the vertices of a graph file in big format are numbered from 0 to n - 1.
+
+        :param graph: DirectedGraph | UndirectedGraph, the graph
+        :param big: bool, True if the graph file is in big format
+
+        :return: True if the graph can be compacted, False otherwise
+        """
+
+        if not big:
+            return True
+
+        values = numpy.fromiter(graph.vertices, dtype=numpy.int64, count=graph.number_of_vertices)
+        return numpy.array_equal(numpy.sort(values), numpy.arange(graph.number_of_vertices))
+
+    @property
+    def number_of_records(self) -> int:
+        """
+        Returns the number of records that are not yet in the graph file.
+
+        :return: int, the number of records
+        """
+
+        self.__file.flush()
+        size = os.path.getsize(self.__journal_path)
+
+        # the compaction in progress removes the compacting journal when it is done
+        try:
+            size += os.path.getsize(self.__compacting_path)
+        except FileNotFoundError:
+            pass
+
+        return size // RECORD_FORMAT.size
+
+    # ----------------------- #
+
+    def record(self, change: int, vertex_1: int, vertex_2: int = 0, cost: int = None):
+        """
+        Appends a change to the journal file, called by the graph after each change.
+
+        :param change: int, the code of the change (ADD_VERTEX, REMOVE_VERTEX, ADD_EDGE, REMOVE_EDGE or SET_EDGE_COST)
+        :param vertex_1: int, the vertex, or the first vertex of the edge
+        :param vertex_2: int, the second vertex of the edge (unused for a vertex)
+        :param cost: int, the cost of the edge (None in an unweighted graph)
+        """
+
+        self.__file.write(RECORD_FORMAT.pack(change, vertex_1, vertex_2, cost or 0))
+        self.__file.flush()
+
+        if self.__sync:
+            os.fsync(self.__file.fileno())
+
+    def __replay(self, path: str):
+        # applies the records of a journal file to the graph, a torn last record (a crash while appending it) is dropped
+        with open(path, "rb") as file:
+            data = file.read()
+
+        size = len(data) - len(data) % RECORD_FORMAT.size
+        if size != len(data):
+            os.truncate(path, size)
+
+        graph = self.__graph
+        for change, vertex_1, vertex_2, cost in RECORD_FORMAT.iter_unpack(data[:size]):
+            if change == ADD_VERTEX:
+                if not graph.is_vertex(vertex_1):
+                    graph.add_vertex(vertex_1)
+
+            elif change == REMOVE_VERTEX:
+                if graph.is_vertex(vertex_1):
+                    graph.remove_vertex(vertex_1)
+
+            elif not graph.is_vertex(vertex_1) or not graph.is_vertex(vertex_2):
+                continue
+
+            elif change == ADD_EDGE:
+                if not graph.is_edge(vertex_1, vertex_2):
+                    graph.add_edge(vertex_1, vertex_2, cost)
+                elif hasattr(graph, "set_edge_cost"):
+                    graph.set_edge_cost(vertex_1, vertex_2, cost)
+
+            elif change == REMOVE_EDGE:
+                if graph.is_edge(vertex_1, vertex_2):
+                    graph.remove_edge(vertex_1, vertex_2)
+
+            elif change == SET_EDGE_COST:
+                if graph.is_edge(vertex_1, vertex_2):
+                    graph.set_edge_cost(vertex_1, vertex_2, cost)
+
+            else:
+                raise GraphError("Invalid journal file!")
+
+    # ----------------------- #
+
+    def compact(self) -> threading.Thread:
+        """
+        Writes the graph to the graph file in a background thread and empties the journal.
+        The graph is frozen (see freeze) and the journal file is set aside as the compacting journal right away,
+        the changes made while the graph file is written go to a new journal file. The compacting journal is removed
+        once the new graph file has replaced the old one. A compaction that fails keeps its compacting journal,
+        the next one includes it.
+
+        :return: threading.Thread, the thread that writes the graph file (join it to wait for the compaction)
+
+        :raises GraphError: if a compaction is already in progress, if the last one failed
+                            or if the graph file is in big format and the vertices are not numbered from 0 to n - 1
+        """
+
+        if self.__compaction is not None and self.__compaction.is_alive():
+            raise GraphError("A compaction is already in progress!")
+
+        self.__raise_compaction_error()
+
+        if not GraphJournal.can_compact(self.__graph, self.__big):
+            raise GraphError("The vertices are not numbered from 0 to n - 1!")
+
+        frozen = self.__graph.freeze()
+        self.__file.close()
+        if os.path.exists(self.__compacting_path):
+            with open(self.__compacting_path, "ab") as compacting, open(self.__journal_path, "rb") as journal:
+                compacting.write(journal.read())
+            os.remove(self.__journal_path)
+        else:
+            os.replace(self.__journal_path, self.__compacting_path)
+        self.__file = open(self.__journal_path, "ab")
+
+        self.__compaction = threading.Thread(target=self.__write_graph_file, args=(frozen,))
+        self.__compaction.start()
+
+        return self.__compaction
+
+    def __write_graph_file(self, frozen):
+        # the temporary file keeps the extension of the graph file, which selects its compression
+        directory, name = os.path.split(self.__file_path)
+        temporary_path = os.path.join(directory, f"~{name}")
+
+        try:
+            graph = type(self.__graph)()
+            graph._load_frozen(frozen)
+            if self.__big:
+                graph.write_to_file_big(temporary_path)
+            else:
+                graph.write_to_file(temporary_path)
+
+            os.replace(temporary_path, self.__file_path)
+            os.remove(self.__compacting_path)
+
+        except Exception as error:
+            self.__compaction_error = error
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    def __raise_compaction_error(self):
+        if self.__compaction_error is not None:
+            error, self.__compaction_error = self.__compaction_error, None
+            raise GraphError(f"The compaction failed: {error}")
+
+    def close(self):
+        """
+        Waits for the compaction in progress and stops recording the changes of the graph.
+
+        :raises GraphError: if the last compaction failed (its changes stay in the journal)
+        """
+
+        if self.__compaction is not None:
+            self.__compaction.join()
+
+        self.__file.close()
+        self.__graph._journal = None
+        self.__raise_compaction_error()
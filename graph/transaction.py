@@ -0,0 +1,121 @@
+from graph.graph_error import GraphError
+
+
+class Transaction:
+
+    """
+    A batch of changes of a graph that can be rolled back.
+    While the transaction is in progress, the graph records the inverse of each change made by add_vertex, remove_vertex,
+    add_edge, remove_edge and set_edge_cost in the undo log of the transaction, as a (function, arguments) pair.
+    Rolling back applies the inverses in reverse order, in O(number of changes) instead of O(V + E) for a copy.
+    A savepoint is a position in the undo log, rolling back to it only undoes the changes made after it.
+    A restored vertex or edge is added back at the end of the insertion order.
+    Used as a context manager, the transaction is rolled back if the block raises an exception and committed otherwise.
+    """
+
+    def __init__(self, graph):
+        """
+        Starts a transaction on a graph.
+
+        :param graph: DirectedGraph | UndirectedGraph, the graph
+
+        :raises GraphError: if a transaction is already in progress on the graph
+        """
+
+        if graph._undo_log is not None:
+            raise GraphError("A transaction is already in progress!")
+
+        self.__graph = graph
+        self.__undo_log = []
+        self.__is_active = True
+
+        graph._undo_log = self.__undo_log
+
+    @property
+    def is_active(self) -> bool:
+        """
+        Returns whether the transaction is still in progress.
+
+        :return: True if the transaction was not committed, False otherwise
+        """
+
+        return self.__is_active
+
+    @property
+    def number_of_changes(self) -> int:
+        """
+        Returns the number of changes that would be undone by a rollback.
+
+        :return: int, the number of changes
+        """
+
+        return len(self.__undo_log)
+
+    # ----------------------- #
+
+    def savepoint(self) -> int:
+        """
+        Returns a savepoint, the changes made after it can be rolled back with rollback(savepoint).
+
+        :return: int, the savepoint
+
+        :raises GraphError: if the transaction has ended
+        """
+
+        self.__check_active()
+
+        return len(self.__undo_log)
+
+    def rollback(self, savepoint: int = 0):
+        """
+        Undoes the changes made after a savepoint (by default all of them), the transaction stays in progress.
+
+        :param savepoint: int, a savepoint returned by savepoint()
+
+        :raises GraphError: if the transaction has ended or if the savepoint was already rolled back
+        """
+
+        self.__check_active()
+
+        if not 0 <= savepoint <= len(self.__undo_log):
+            raise GraphError("Invalid savepoint!")
+
+        # the inverses are not recorded themselves
+        self.__graph._undo_log = None
+        try:
+            while len(self.__undo_log) > savepoint:
+                function, arguments = self.__undo_log.pop()
+                function(*arguments)
+        finally:
+            self.__graph._undo_log = self.__undo_log
+
+    def commit(self):
+        """
+        Ends the transaction and keeps its changes, the undo log is dropped.
+
+        :raises GraphError: if the transaction has ended
+        """
+
+        self.__check_active()
+
+        self.__graph._undo_log = None
+        self.__undo_log = []
+        self.__is_active = False
+
+    def __check_active(self):
+        if not self.__is_active:
+            raise GraphError("The transaction has ended!")
+
+    # ----------------------- #
+
+    def __enter__(self) -> "Transaction":
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        if not self.__is_active:
+            return
+
+        if exception_type is not None:
+            self.rollback()
+
+        self.commit()
@@ -1,4 +1,16 @@
-from graph.directed_graph import GraphError
+import copy
+from functools import partial
+
+import numpy
+from numpy import ndarray
+
+from graph.copy_on_write import CopyOnWriteDict, writable
+from graph.edge_files import open_graph_file, read_big_edge_array, write_edge_lines, unique_edges, add_to_adjacency
+from graph.frozen_graph import FrozenGraph
+from graph.graph_cache import read_through_cache
+from graph.graph_error import GraphError
+from graph.graph_journal import ADD_VERTEX, REMOVE_VERTEX, ADD_EDGE, REMOVE_EDGE
+from graph.transaction import Transaction
 from graph.vertex import Vertex
 
 
@@ -7,7 +19,13 @@ class UndirectedGraph:
     """
     An undirected graph is a graph where each edge is bidirectional.
     It is represented by a dictionary:
-        - _neighbors: maps each vertex to a list of its neighbors
+        - _neighbors: maps each vertex to an insertion ordered set of its neighbors (a dict with None values)
+    The number of edges is kept in _number_of_edges.
+    The undo log of the transaction in progress is kept in _undo_log (None if there is none, see Transaction).
+    The journal the changes are recorded in is kept in _journal (None if there is none, see GraphJournal).
+    The methods also accept plain vertex values, the vertices are stored as Vertex objects:
+    _vertex_pool maps each vertex to its stored Vertex object, so that every vertex is a single object
+    in the dictionaries of the graph (and it is released with the graph).
     """
 
     def __init__(self):
@@ -16,6 +34,10 @@ class UndirectedGraph:
         """
 
         self._neighbors = {}
+        self._vertex_pool = {}
+        self._number_of_edges = 0
+        self._undo_log = None
+        self._journal = None
 
     @property
     def number_of_vertices(self) -> int:
@@ -46,21 +68,21 @@ class UndirectedGraph:
         :return: int, the number of edges
         """
 
-        return len(list(self.edges))
+        return self._number_of_edges
 
     @property
     def edges(self):
         """
-        Returns a generator of the edges in the graph.
+        Returns a generator of the edges in the graph, each edge is generated once,
+        from the end that was added to the graph first.
 
         :return: generator, the edges
         """
 
-        seen_edges = []
-        for vertex in self._neighbors:
+        positions = {vertex: position for position, vertex in enumerate(self._neighbors)}
+        for vertex, position in positions.items():
             for neighbor in self._neighbors[vertex]:
-                if (seen_edge := {vertex, neighbor}) not in seen_edges:
-                    seen_edges.append(seen_edge)
+                if position <= positions[neighbor]:
                     yield vertex, neighbor
 
     # ----------------------- #
@@ -159,7 +181,14 @@ class UndirectedGraph:
         if vertex in self._neighbors:
             raise GraphError("Vertex already exists!")
 
-        self._neighbors[vertex] = []
+        vertex = Vertex(vertex)
+        if self._undo_log is not None:
+            self._undo_log.append((self.remove_vertex, (vertex,)))
+        if self._journal is not None:
+            self._journal.record(ADD_VERTEX, vertex)
+
+        self._neighbors[vertex] = {}
+        self._vertex_pool[vertex] = vertex
 
     def remove_vertex(self, vertex: Vertex):
         """
@@ -173,10 +202,18 @@ class UndirectedGraph:
         if vertex not in self._neighbors:
             raise GraphError("Invalid vertex!")
 
+        if self._undo_log is not None:
+            self._log_remove_vertex(vertex)
+        if self._journal is not None:
+            self._journal.record(REMOVE_VERTEX, vertex)
+
         for neighbor in self._neighbors[vertex]:
-            self._neighbors[neighbor].remove(vertex)
+            if neighbor != vertex:
+                del writable(self._neighbors, neighbor)[vertex]
 
+        self._number_of_edges -= len(self._neighbors[vertex])
         del self._neighbors[vertex]
+        del self._vertex_pool[vertex]
 
     def add_edge(self, vertex_1: Vertex, vertex_2: Vertex, cost: int = None):
         """
@@ -195,8 +232,15 @@ class UndirectedGraph:
         if vertex_2 in self._neighbors[vertex_1]:
             raise GraphError("Edge already exists!")
 
-        self._neighbors[vertex_1].append(vertex_2)
-        self._neighbors[vertex_2].append(vertex_1)
+        vertex_1, vertex_2 = self._vertex_pool[vertex_1], self._vertex_pool[vertex_2]
+        if self._undo_log is not None:
+            self._undo_log.append((self.remove_edge, (vertex_1, vertex_2)))
+        if self._journal is not None:
+            self._journal.record(ADD_EDGE, vertex_1, vertex_2, cost)
+
+        writable(self._neighbors, vertex_1)[vertex_2] = None
+        writable(self._neighbors, vertex_2)[vertex_1] = None
+        self._number_of_edges += 1
 
     def remove_edge(self, vertex_1: Vertex, vertex_2: Vertex):
         """
@@ -214,67 +258,236 @@ class UndirectedGraph:
         if vertex_2 not in self._neighbors[vertex_1]:
             raise GraphError("Edge does not exist!")
 
-        self._neighbors[vertex_1].remove(vertex_2)
-        self._neighbors[vertex_2].remove(vertex_1)
+        if self._undo_log is not None:
+            self._undo_log.append((self.add_edge, (vertex_1, vertex_2, self._edge_cost(vertex_1, vertex_2))))
+        if self._journal is not None:
+            self._journal.record(REMOVE_EDGE, vertex_1, vertex_2)
+
+        del writable(self._neighbors, vertex_1)[vertex_2]
+        if vertex_1 != vertex_2:
+            del writable(self._neighbors, vertex_2)[vertex_1]
+        self._number_of_edges -= 1
+
+    def transaction(self) -> Transaction:
+        """
+        Starts a transaction: the changes made until it ends can be rolled back (see Transaction).
+        Ex: with graph.transaction() as transaction: ...
+
+        :return: Transaction, the transaction
+
+        :raises GraphError: if a transaction is already in progress
+        """
+
+        return Transaction(self)
+
+    def _log_remove_vertex(self, vertex: Vertex):
+        # records the inverse of removing a vertex: adding it back with its edges and their costs
+        edges = [(vertex, neighbor, self._edge_cost(vertex, neighbor)) for neighbor in self._neighbors[vertex]]
+        self._undo_log.append((self._restore_vertex, (vertex, edges)))
+
+    def _restore_vertex(self, vertex: Vertex, edges: list[tuple]):
+        # adds a removed vertex back, with its (vertex, neighbor, cost) edges
+        self.add_vertex(vertex)
+        for vertex_1, vertex_2, cost in edges:
+            self.add_edge(vertex_1, vertex_2, cost)
+
+    def _edge_cost(self, vertex_1: Vertex, vertex_2: Vertex):
+        # the cost of an edge of the graph, None in an unweighted graph
+        return None
 
     # ----------------------- #
 
-    def read_from_file_big(self, file_path: str):
+    def add_edges_from(self, edges: ndarray):
         """
-        Reads a graph from a file.
-        The file contains the edges of the graph and the isolated vertices.
-        An edge is represented by two vertices. Ex: 1 2 means that there is an edge from 1 to 2.
-        An isolated vertex is represented by its number and -1. Ex: 1 -1 means that there is an isolated vertex with the number 1.
+        Adds many edges at once, without validating them one by one.
+        The missing vertices are added, the repeated edges and the edges already in the graph are skipped.
+        During a transaction or with a journal the edges are added one by one, so that they are recorded.
+
+        :param edges: ndarray, integer array with one row per edge: the values of its two vertices
+                      (any other columns are ignored)
+        """
+
+        self._add_edge_rows(edges)
+
+    def _add_vertices_from(self, vertices: list[Vertex]):
+        # adds the vertices that are not in the graph yet, without validating them one by one
+        if self._undo_log is not None or self._journal is not None:
+            for vertex in vertices:
+                if vertex not in self._neighbors:
+                    self.add_vertex(vertex)
+            return
+
+        for vertex in vertices:
+            if vertex not in self._neighbors:
+                self._neighbors[vertex] = {}
+                self._vertex_pool[vertex] = vertex
+
+    def _add_edge_rows(self, edges: ndarray) -> tuple[ndarray, list[Vertex], list[Vertex]]:
+        # adds the edges of the rows, returns the distinct rows and their vertices
+        edges = unique_edges(numpy.asarray(edges), directed=False)
+        values, positions = numpy.unique(edges[:, :2], return_inverse=True)
+        positions = positions.reshape(-1, 2)
+
+        # the vertices already in the graph are reused
+        values = values.tolist()
+        vertices = numpy.empty(len(values), dtype=object)
+        vertices[:] = list(map(self._vertex_pool.get, values, map(Vertex, values)))
+        self._add_vertices_from(vertices.tolist())
+
+        starts, ends = vertices[positions[:, 0]].tolist(), vertices[positions[:, 1]].tolist()
+        if self._undo_log is not None or self._journal is not None:
+            return self._add_edge_rows_one_by_one(edges, starts, ends)
+
+        new_loops = sum(1 for start, end in zip(starts, ends) if start == end and start not in self._neighbors[start])
+
+        # both directions of each edge, interleaved so that every neighbor set keeps the order of the rows
+        added = add_to_adjacency(self._neighbors, vertices, positions.ravel(), positions[:, ::-1].ravel())
+        self._number_of_edges += (added - new_loops) // 2 + new_loops
+
+        return edges, starts, ends
+
+    def _add_edge_rows_one_by_one(self, edges: ndarray, starts: list[Vertex],
+                                  ends: list[Vertex]) -> tuple[ndarray, list[Vertex], list[Vertex]]:
+        # adds the edges of the distinct rows that are not in the graph with add_edge (with the costs of the rows)
+        costs = edges[:, 2].tolist() if edges.shape[1] > 2 else [0] * len(edges)
+        for start, end, cost in zip(starts, ends, costs):
+            if not self.is_edge(start, end):
+                self.add_edge(start, end, cost)
+
+        return edges, starts, ends
+
+    def freeze(self) -> FrozenGraph:
+        """
+        Returns an immutable compressed sparse row snapshot of the graph (every edge in both directions),
+        later changes of the graph do not affect the snapshot.
+
+        :return: FrozenGraph, the snapshot
+        """
+
+        vertices = list(self._neighbors)
+        neighbors = [self._neighbors[vertex] for vertex in vertices]
+
+        return FrozenGraph.from_adjacency(vertices, neighbors, neighbors, directed=False)
+
+    def overlay(self) -> "UndirectedGraph":
+        """
+        Returns a copy of the graph in O(1): the copy shares the dictionary of the graph and records
+        its own changes in delta structures (see CopyOnWriteDict), the graph is not affected by them.
+        The graph must not be modified while the copy is in use, dropping the copy discards its changes.
+
+        :return: UndirectedGraph, the copy (of the same class as the graph)
+        """
+
+        overlay = copy.copy(self)
+        overlay._undo_log = None
+        overlay._journal = None
+        overlay._neighbors = CopyOnWriteDict(self._neighbors, nested=True)
+        overlay._vertex_pool = CopyOnWriteDict(self._vertex_pool)
+
+        return overlay
+
+    def _load_frozen(self, frozen: FrozenGraph):
+        # adds the vertices and the edges of a snapshot, in the same order
+        vertices = list(frozen.vertices)
+        for vertex in vertices:
+            if vertex in self._neighbors:
+                raise GraphError("Vertex already exists!")
+
+        if self._journal is not None:
+            self._load_frozen_one_by_one(frozen, vertices)
+            return
+
+        # the vertices are new, removing them also removes their edges
+        if self._undo_log is not None:
+            self._undo_log.extend((self.remove_vertex, (vertex,)) for vertex in vertices)
+
+        self._neighbors.update(zip(vertices, map(dict.fromkeys, frozen.successor_lists())))
+        self._vertex_pool.update(zip(vertices, vertices))
+        self._number_of_edges += frozen.number_of_edges
+
+    def _load_frozen_one_by_one(self, frozen: FrozenGraph, vertices: list[Vertex]):
+        # adds the vertices and the edges (with their costs) of a snapshot with add_vertex and add_edge
+        for vertex in vertices:
+            self.add_vertex(vertex)
+
+        costs = frozen.out_weights.tolist() if frozen.is_weighted else [0] * frozen.out_indptr[-1]
+        edges = ((vertex, neighbor) for vertex, neighbors in zip(vertices, frozen.successor_lists())
+                 for neighbor in neighbors)
+        for (vertex_1, vertex_2), cost in zip(edges, costs):
+            if not self.is_edge(vertex_1, vertex_2):
+                self.add_edge(vertex_1, vertex_2, cost)
+
+    # ----------------------- #
+
+    def read_from_file_big(self, file_path: str, use_cache: bool = True, number_of_workers: int = 1):
+        """
+        Reads a graph from a file in big format.
+        First line contains the number of vertices and the number of edges.
+        The vertices are numbered from 0 to n - 1.
+        The next lines contain the edges. Ex: 1 2 means that there is an edge between 1 and 2.
+        The edge lines are parsed at once and added with add_edges_from: a repeated edge line is skipped
+        (the first one is kept, with its cost) instead of raising like add_edge.
+        The file can be gzip, bzip2 or xz compressed (see open_graph_file).
+        An empty graph is read through the cache of the file (see read_through_cache).
 
         :param file_path: str, the path to the file
+        :param use_cache: bool, False to always parse the file
+        :param number_of_workers: int, the number of processes that parse the edge lines (see read_big_edge_array)
+
+        :raises GraphError: if an edge line can not be parsed or has a vertex that is not between 0 and n - 1
         """
 
-        with open(file_path, "r") as file:
-            for index, line in enumerate(file):
-                if index == 0:
-                    number_of_vertices = int(line.split()[0])
-                    for vertex in range(number_of_vertices):
-                        self.add_vertex(Vertex(vertex))
-                    continue
+        read = partial(self._read_big, number_of_workers=number_of_workers)
+        if use_cache and not self._neighbors:
+            read_through_cache(file_path, f"{type(self).__name__}.big", read, self._load_frozen, self.freeze)
+        else:
+            read(file_path)
 
-                line = line.strip().split()
-                vertex_1, vertex_2 = Vertex(int(line[0])), Vertex(int(line[1]))
+    def _read_big(self, file_path: str, number_of_workers: int = 1):
+        number_of_vertices, edges = read_big_edge_array(file_path, number_of_workers)
+        for vertex in range(number_of_vertices):
+            if vertex in self._neighbors:
+                raise GraphError("Vertex already exists!")
 
-                self.add_edge(vertex_1, vertex_2)
+        if len(edges) and (edges[:, :2].min() < 0 or edges[:, :2].max() >= number_of_vertices):
+            raise GraphError("Invalid vertex!")
 
-    def read_from_file_big_with_costs(self, file_path: str):
+        self._add_vertices_from(list(map(Vertex, range(number_of_vertices))))
+        self.add_edges_from(edges)
+
+    def read_from_file_big_with_costs(self, file_path: str, use_cache: bool = True, number_of_workers: int = 1):
         """
         Reads a graph from a file in big format that also contains the costs of the edges.
         The costs will be ignored.
 
         :param file_path: str, the path to the file
+        :param use_cache: bool, False to always parse the file
+        :param number_of_workers: int, the number of processes that parse the edge lines
         """
 
-        with open(file_path, "r") as file:
-            for index, line in enumerate(file):
-                if index == 0:
-                    number_of_vertices = int(line.split()[0])
-                    for vertex in range(number_of_vertices):
-                        self.add_vertex(Vertex(vertex))
-                    continue
-
-                line = line.strip().split()
-                vertex_1, vertex_2, cost = Vertex(int(line[0])), Vertex(int(line[1])), int(line[2])
+        self.read_from_file_big(file_path, use_cache, number_of_workers)
 
-                if not self.is_edge(vertex_1, vertex_2):
-                    self.add_edge(vertex_1, vertex_2, cost)
-
-    def read_from_file(self, file_path: str):
+    def read_from_file(self, file_path: str, use_cache: bool = True):
         """
         Reads a graph from a file.
         The file contains the edges of the graph and the isolated vertices.
         An edge is represented by two vertices. Ex: 1 2 means that there is an edge from 1 to 2.
         An isolated vertex is represented by its number and -1. Ex: 1 -1 means that there is an isolated vertex with the number 1.
+        The file can be gzip, bzip2 or xz compressed (see open_graph_file).
+        An empty graph is read through the cache of the file (see read_through_cache).
 
         :param file_path: str, the path to the file
+        :param use_cache: bool, False to always parse the file
         """
 
-        with open(file_path, "r") as file:
+        if use_cache and not self._neighbors:
+            read_through_cache(file_path, f"{type(self).__name__}.small", self._read_small, self._load_frozen,
+                               self.freeze)
+        else:
+            self._read_small(file_path)
+
+    def _read_small(self, file_path: str):
+        with open_graph_file(file_path, "r") as file:
             for line in file:
                 line = line.split()
 
@@ -292,27 +505,68 @@ class UndirectedGraph:
 
     def write_to_file(self, file_path: str):
         """
-        Writes the graph to a file.
+        Writes the graph to a file, in the format read by read_from_file (see write_edge_lines).
+
+        :param file_path: str, the path to the file (ending in .gz, .bz2 or .xz to compress it)
+        """
+
+        write_edge_lines(file_path, self.__file_lines(True))
+
+    def write_to_file_big(self, file_path: str):
+        """
+        Writes the graph to a file in big format, the format read by read_from_file_big (see write_edge_lines).
+        First line contains the number of vertices and the number of edges, the next lines contain the edges.
+
+        :param file_path: str, the path to the file (ending in .gz, .bz2 or .xz to compress it)
+
+        :raises GraphError: if the vertices are not numbered from 0 to n - 1
+        """
+
+        if self._neighbors and (min(self._neighbors) != 0 or max(self._neighbors) != len(self._neighbors) - 1):
+            raise GraphError("The vertices are not numbered from 0 to n - 1!")
+
+        write_edge_lines(file_path, self.__file_lines(False), f"{self.number_of_vertices} {self.number_of_edges}")
+
+    def _edge_line(self, vertex_1: Vertex, vertex_2: Vertex) -> str:
+        # the line of an edge in a file
+        return f"{vertex_1} {vertex_2}"
+
+    def __file_lines(self, isolated_vertices: bool):
+        # every edge is written once, by the first of its vertices
+        positions = {vertex: position for position, vertex in enumerate(self._neighbors)}
+        for vertex, position in positions.items():
+            if isolated_vertices and not self._neighbors[vertex]:
+                yield f"{vertex} -1"
+
+            for neighbor in self._neighbors[vertex]:
+                if position <= positions[neighbor]:
+                    yield self._edge_line(vertex, neighbor)
+
+    def save_binary(self, file_path: str):
+        """
+        Writes the graph to a binary file, the compressed sparse row arrays of its snapshot
+        (see FrozenGraph.save_binary).
 
         :param file_path: str, the path to the file
         """
 
-        with open(file_path, "w") as file:
-            seen_edges = []
-            for vertex in self._neighbors:
-                if not self._neighbors[vertex]:
-                    file.write(f"{vertex} -1")
-                    if vertex != list(self._neighbors.keys())[-1]:
-                        file.write("\n")
-                    continue
+        self.freeze().save_binary(file_path)
+
+    def load_binary(self, file_path: str):
+        """
+        Reads a graph from a binary file written by save_binary, the vertices and the neighbors keep their order.
+        To only query the graph, FrozenGraph.load_binary opens the file without building the dictionaries.
 
-                for neighbor in self._neighbors[vertex]:
-                    if (seen_edge := {vertex, neighbor}) not in seen_edges:
-                        seen_edges.append(seen_edge)
-                        file.write(f"{vertex} {neighbor}")
+        :param file_path: str, the path to the file
+
+        :raises GraphError: if the file is not a binary file of an undirected graph or if a vertex already exists
+        """
 
-                        if vertex != list(self._neighbors.keys())[-1] or neighbor != self._neighbors[vertex][-1]:
-                            file.write("\n")
+        frozen = FrozenGraph.load_binary(file_path)
+        if frozen.is_directed:
+            raise GraphError("Not an undirected graph file!")
+
+        self._load_frozen(frozen)
 
     # ----------------------- #
 
@@ -325,16 +579,14 @@ class UndirectedGraph:
 
         string = f"{self.number_of_vertices} {self.number_of_edges}"
 
-        seen_edges = []
-        for vertex in self._neighbors:
+        positions = {vertex: position for position, vertex in enumerate(self._neighbors)}
+        for vertex, position in positions.items():
             if not self._neighbors[vertex]:
                 string += f"\n{vertex} -1"
                 continue
 
             for neighbor in self._neighbors[vertex]:
-                seen_edge = {vertex, neighbor}
-                if (seen_edge := {vertex, neighbor}) not in seen_edges:
-                    seen_edges.append(seen_edge)
+                if position <= positions[neighbor]:
                     string += f"\n{vertex} -- {neighbor}"
 
         return string
@@ -1,45 +1,41 @@
-class Vertex:
+class Vertex(int):
 
     """
-    Class that represents a vertex in a graph.
+    Class that represents a vertex in a graph, the value of a vertex is an integer.
+    A vertex is an int subclass, so it hashes and compares like its value (at C speed, which matters for the
+    dictionaries of the graphs), and the graphs can be queried with plain values as well.
+    The graphs intern their vertices (see _vertex_pool), so every value is represented by a single object in a
+    graph, and the vertices of a graph are released with it.
     """
 
-    def __init__(self, value):
-        self.__value = value
+    __slots__ = ()
 
-    @property
-    def value(self):
-        return self.__value
-
-    # ----------------------- #
+    def __new__(cls, value):
+        if type(value) is Vertex:
+            return value
 
-    def __eq__(self, other):
-        return self.value == other.value
+        return super().__new__(cls, int(value))
 
-    def __ne__(self, other):
-        return not self.__eq__(other)
+    @property
+    def value(self) -> int:
+        return int(self)
 
     # ----------------------- #
 
-    def __lt__(self, other):
-        return self.value < other.value
-
-    def __le__(self, other):
-        return self.value <= other.value
-
-    def __gt__(self, other):
-        return self.value > other.value
+    def __str__(self):
+        return str(int(self))
 
-    def __ge__(self, other):
-        return self.value >= other.value
+    def __repr__(self):
+        return str(int(self))
 
     # ----------------------- #
 
-    def __hash__(self):
-        return hash(self.__value)
+    def __reduce__(self):
+        # a vertex is pickled as its value
+        return Vertex, (int(self),)
 
-    def __str__(self):
-        return str(self.__value)
+    def __copy__(self):
+        return self
 
-    def __repr__(self):
-        return str(self.__value)
+    def __deepcopy__(self, memo):
+        return self
@@ -1,4 +1,10 @@
+from numpy import ndarray
+
+from graph.copy_on_write import CopyOnWriteDict, writable
 from graph.directed_graph import DirectedGraph, GraphError
+from graph.edge_files import open_graph_file
+from graph.frozen_graph import FrozenGraph
+from graph.graph_journal import REMOVE_VERTEX, SET_EDGE_COST
 from graph.vertex import Vertex
 
 
@@ -7,8 +13,8 @@ class WeightedDirectedGraph(DirectedGraph):
     """
     A weighted directed graph is a directed graph where each edge has a cost.
     It is represented by three dictionaries:
-        - _predecessors: maps each vertex to a list of its predecessors
-        - _successors: maps each vertex to a list of its successors
+        - _predecessors: maps each vertex to an insertion ordered set of its predecessors (a dict with None values)
+        - _successors: maps each vertex to an insertion ordered set of its successors (a dict with None values)
         - _weights: maps each edge to its cost
     """
 
@@ -59,8 +65,47 @@ class WeightedDirectedGraph(DirectedGraph):
         if vertex_2 not in self._successors[vertex_1]:
             raise GraphError("Invalid edge!")
 
+        if self._undo_log is not None:
+            self._undo_log.append((self.set_edge_cost, (vertex_1, vertex_2, self._weights[(vertex_1, vertex_2)])))
+        if self._journal is not None:
+            self._journal.record(SET_EDGE_COST, vertex_1, vertex_2, cost)
+
         self._weights[(vertex_1, vertex_2)] = cost
 
+    def get_outbound_costs(self, vertex: Vertex):
+        """
+        Returns a generator of the outbound vertices of a vertex, together with the costs of the edges.
+
+        :param vertex: Vertex, the vertex
+
+        :return: generator, (successor, cost) pairs
+
+        :raises GraphError: if the vertex is not in the graph
+        """
+
+        if vertex not in self._predecessors:
+            raise GraphError("Invalid vertex!")
+
+        for successor in self._successors[vertex]:
+            yield successor, self._weights[(vertex, successor)]
+
+    def get_inbound_costs(self, vertex: Vertex):
+        """
+        Returns a generator of the inbound vertices of a vertex, together with the costs of the edges.
+
+        :param vertex: Vertex, the vertex
+
+        :return: generator, (predecessor, cost) pairs
+
+        :raises GraphError: if the vertex is not in the graph
+        """
+
+        if vertex not in self._predecessors:
+            raise GraphError("Invalid vertex!")
+
+        for predecessor in self._predecessors[vertex]:
+            yield predecessor, self._weights[(predecessor, vertex)]
+
     # ----------------------- #
 
     def remove_vertex(self, vertex: Vertex):
@@ -74,16 +119,30 @@ class WeightedDirectedGraph(DirectedGraph):
         if vertex not in self._predecessors:
             raise GraphError("Invalid vertex!")
 
+        if self._undo_log is not None:
+            self._log_remove_vertex(vertex)
+        if self._journal is not None:
+            self._journal.record(REMOVE_VERTEX, vertex)
+
+        # a loop is both a predecessor and a successor of the vertex
+        self._number_of_edges -= len(self._predecessors[vertex]) + len(self._successors[vertex]) - \
+            (vertex in self._successors[vertex])
+
         for predecessor in self._predecessors[vertex]:
-            self._successors[predecessor].remove(vertex)
+            del writable(self._successors, predecessor)[vertex]
             self._weights.pop((predecessor, vertex))
 
         for successor in self._successors[vertex]:
-            self._predecessors[successor].remove(vertex)
+            del writable(self._predecessors, successor)[vertex]
             self._weights.pop((vertex, successor))
 
         del self._predecessors[vertex]
         del self._successors[vertex]
+        del self._vertex_pool[vertex]
+
+    def _edge_cost(self, vertex_1: Vertex, vertex_2: Vertex) -> int:
+        # the cost of an edge of the graph
+        return self._weights[(vertex_1, vertex_2)]
 
     def add_edge(self, vertex_1: Vertex, vertex_2: Vertex, cost: int = 0):
         """
@@ -96,8 +155,8 @@ class WeightedDirectedGraph(DirectedGraph):
         :raises GraphError: if vertex_1 or vertex_2 are not in the graph or if the edge already exists
         """
 
-        super().add_edge(vertex_1, vertex_2)
-        self._weights[(vertex_1, vertex_2)] = cost
+        super().add_edge(vertex_1, vertex_2, cost)
+        self._weights[(self._vertex_pool[vertex_1], self._vertex_pool[vertex_2])] = cost
 
     def remove_edge(self, vertex_1: Vertex, vertex_2: Vertex):
         """
@@ -112,42 +171,72 @@ class WeightedDirectedGraph(DirectedGraph):
         super().remove_edge(vertex_1, vertex_2)
         del self._weights[(vertex_1, vertex_2)]
 
-    # ----------------------- #
+    def add_edges_from(self, edges: ndarray):
+        """
+        Adds many edges at once, without validating them one by one.
+        The missing vertices are added, the repeated edges and the edges already in the graph
+        (with their costs) are skipped.
 
-    def read_from_file_big(self, file_path: str):
+        :param edges: ndarray, integer array with one row per edge: start and end vertex values and cost
+                      (the cost is 0 if there is no third column)
         """
-        Reads a graph from a file in big format.
-        First line contains the number of vertices and the number of edges.
-        The vertices are numbered from 0 to n - 1.
-        The next lines contain the edges. Ex: 1 2 means that there is an edge from 1 to 2.
 
-        :param file_path: str, the path to the file
+        edges, starts, ends = self._add_edge_rows(edges)
+        costs = edges[:, 2].tolist() if edges.shape[1] > 2 else [0] * len(edges)
+
+        weights = dict(zip(zip(starts, ends), costs))
+        for edge in self._weights.keys() & weights.keys():
+            del weights[edge]
+
+        self._weights.update(weights)
+
+    def freeze(self) -> FrozenGraph:
         """
+        Returns an immutable compressed sparse row snapshot of the graph,
+        later changes of the graph do not affect the snapshot.
 
-        with open(file_path, "r") as file:
-            for index, line in enumerate(file):
-                if index == 0:
-                    number_of_vertices = int(line.split()[0])
-                    for vertex in range(number_of_vertices):
-                        self.add_vertex(Vertex(vertex))
-                    continue
+        :return: FrozenGraph, the snapshot
+        """
 
-                line = line.split()
-                vertex_1, vertex_2, cost = Vertex(int(line[0])), Vertex(int(line[1])), int(line[2])
+        vertices = list(self._predecessors)
+        successors = [self._successors[vertex] for vertex in vertices]
+        predecessors = [self._predecessors[vertex] for vertex in vertices]
 
-                self.add_edge(vertex_1, vertex_2, cost)
+        return FrozenGraph.from_adjacency(vertices, successors, predecessors,
+                                          [[self._weights[(vertex, successor)] for successor in self._successors[vertex]]
+                                           for vertex in vertices],
+                                          [[self._weights[(predecessor, vertex)] for predecessor in self._predecessors[vertex]]
+                                           for vertex in vertices])
 
-    def read_from_file(self, file_path: str):
+    def overlay(self) -> "WeightedDirectedGraph":
         """
-        Reads a graph from a file.
-        The file contains the edges of the graph and the isolated vertices.
-        An edge is represented by two vertices. Ex: 1 2 means that there is an edge from 1 to 2.
-        An isolated vertex is represented by its number and -1. Ex: 1 -1 means that there is an isolated vertex with the number 1.
+        Returns a copy of the graph in O(1), the costs are shared and changed copy-on-write as well
+        (see DirectedGraph.overlay).
 
-        :param file_path: str, the path to the file
+        :return: WeightedDirectedGraph, the copy
         """
 
-        with open(file_path, "r") as file:
+        overlay = super().overlay()
+        overlay._weights = CopyOnWriteDict(self._weights)
+
+        return overlay
+
+    def _load_frozen(self, frozen: FrozenGraph):
+        # adds the vertices, the edges and the costs of a snapshot, an unweighted snapshot has costs of 0
+        super()._load_frozen(frozen)
+
+        edges = ((vertex, successor) for vertex, successors in zip(frozen.vertices, frozen.successor_lists())
+                 for successor in successors)
+        if frozen.is_weighted:
+            self._weights.update(zip(edges, frozen.out_weights.tolist()))
+        else:
+            self._weights.update(dict.fromkeys(edges, 0))
+
+    # ----------------------- #
+
+    def _read_small(self, file_path: str):
+        # the edge lines also contain the costs of the edges. Ex: 1 2 5 means that the edge from 1 to 2 costs 5
+        with open_graph_file(file_path, "r") as file:
             for line in file:
                 line = line.strip().split()
 
@@ -163,25 +252,26 @@ class WeightedDirectedGraph(DirectedGraph):
 
                 self.add_edge(vertex_1, vertex_2, cost)
 
-    def write_to_file(self, file_path: str):
+    def _edge_line(self, vertex_1: Vertex, vertex_2: Vertex) -> str:
+        # the line of an edge in a file, with its cost
+        return f"{vertex_1} {vertex_2} {self._weights[(vertex_1, vertex_2)]}"
+
+    def load_binary(self, file_path: str):
         """
-        Writes the graph to a file.
+        Reads a graph from a binary file written by save_binary, with the costs of its edges
+        (see DirectedGraph.load_binary).
 
         :param file_path: str, the path to the file
+
+        :raises GraphError: if the file is not a binary file of a weighted directed graph or if a vertex already exists
         """
 
-        with open(file_path, "w") as file:
-            for vertex, predecessors in self._predecessors.items():
-                if not predecessors and not self._successors[vertex]:
-                    file.write(f"{vertex} -1")
-                    if vertex != list(self._predecessors.keys())[-1]:
-                        file.write("\n")
-                    continue
+        # the file of an unweighted graph has no costs, its edges would silently cost 0
+        frozen = FrozenGraph.load_binary(file_path)
+        if not frozen.is_directed or not frozen.is_weighted:
+            raise GraphError("Not a weighted directed graph file!")
 
-                for predecessor in predecessors:
-                    file.write(f"{predecessor} {vertex} {self._weights[(predecessor, vertex)]}")
-                    if predecessor != predecessors[-1] or vertex != list(self._predecessors.keys())[-1]:
-                        file.write("\n")
+        self._load_frozen(frozen)
 
     # ----------------------- #
 
@@ -1,4 +1,10 @@
+from numpy import ndarray
+
+from graph.copy_on_write import CopyOnWriteDict, writable
 from graph.directed_graph import GraphError
+from graph.edge_files import open_graph_file
+from graph.frozen_graph import FrozenGraph
+from graph.graph_journal import REMOVE_VERTEX, SET_EDGE_COST
 from graph.undirected_graph import UndirectedGraph
 from graph.vertex import Vertex
 
@@ -8,7 +14,7 @@ class WeightedUndirectedGraph(UndirectedGraph):
     """
     A weighted undirected graph is an undirected graph where each edge has a cost.
     It is represented by two dictionaries:
-        - _neighbors: maps each vertex to a list of its neighbors
+        - _neighbors: maps each vertex to an insertion ordered set of its neighbors (a dict with None values)
         - _weights: maps each edge to its cost
     """
 
@@ -40,7 +46,7 @@ class WeightedUndirectedGraph(UndirectedGraph):
         if vertex_2 not in self._neighbors[vertex_1]:
             raise GraphError("Invalid edge!")
 
-        return self._weights[{vertex_1, vertex_2}]
+        return self._weights[frozenset((vertex_1, vertex_2))]
 
     def set_edge_cost(self, vertex_1: Vertex, vertex_2: Vertex, cost: int):
         """
@@ -59,7 +65,12 @@ class WeightedUndirectedGraph(UndirectedGraph):
         if vertex_2 not in self._neighbors[vertex_1]:
             raise GraphError("Invalid edge!")
 
-        self._weights[{vertex_1, vertex_2}] = cost
+        if self._undo_log is not None:
+            self._undo_log.append((self.set_edge_cost, (vertex_1, vertex_2, self._weights[frozenset((vertex_1, vertex_2))])))
+        if self._journal is not None:
+            self._journal.record(SET_EDGE_COST, vertex_1, vertex_2, cost)
+
+        self._weights[frozenset((vertex_1, vertex_2))] = cost
 
     # ----------------------- #
 
@@ -74,11 +85,23 @@ class WeightedUndirectedGraph(UndirectedGraph):
         if vertex not in self._neighbors:
             raise GraphError("Invalid vertex!")
 
+        if self._undo_log is not None:
+            self._log_remove_vertex(vertex)
+        if self._journal is not None:
+            self._journal.record(REMOVE_VERTEX, vertex)
+
         for neighbor in self._neighbors[vertex]:
-            self._neighbors[neighbor].remove(vertex)
-            self._weights.pop({vertex, neighbor})
+            if neighbor != vertex:
+                del writable(self._neighbors, neighbor)[vertex]
+            self._weights.pop(frozenset((vertex, neighbor)))
 
+        self._number_of_edges -= len(self._neighbors[vertex])
         del self._neighbors[vertex]
+        del self._vertex_pool[vertex]
+
+    def _edge_cost(self, vertex_1: Vertex, vertex_2: Vertex) -> int:
+        # the cost of an edge of the graph
+        return self._weights[frozenset((vertex_1, vertex_2))]
 
     def add_edge(self, vertex_1: Vertex, vertex_2: Vertex, cost: int = 0):
         """
@@ -91,8 +114,8 @@ class WeightedUndirectedGraph(UndirectedGraph):
         :raises GraphError: if vertex_1 or vertex_2 are not in the graph or if the edge already exists
         """
 
-        super().add_edge(vertex_1, vertex_2)
-        self._weights[{vertex_1, vertex_2}] = cost
+        super().add_edge(vertex_1, vertex_2, cost)
+        self._weights[frozenset((self._vertex_pool[vertex_1], self._vertex_pool[vertex_2]))] = cost
 
     def remove_edge(self, vertex_1: Vertex, vertex_2: Vertex):
         """
@@ -105,44 +128,72 @@ class WeightedUndirectedGraph(UndirectedGraph):
         """
 
         super().remove_edge(vertex_1, vertex_2)
-        self._weights.pop({vertex_1, vertex_2})
+        self._weights.pop(frozenset((vertex_1, vertex_2)))
 
-    # ----------------------- #
+    def add_edges_from(self, edges: ndarray):
+        """
+        Adds many edges at once, without validating them one by one.
+        The missing vertices are added, the repeated edges and the edges already in the graph
+        (with their costs) are skipped.
 
-    def read_from_file_big(self, file_path: str):
+        :param edges: ndarray, integer array with one row per edge: the values of its two vertices and its cost
+                      (the cost is 0 if there is no third column)
         """
-        Reads a graph from a file in big format.
-        First line contains the number of vertices and the number of edges.
-        The vertices are numbered from 0 to n - 1.
-        The next lines contain the edges. Ex: 1 2 means that there is an edge from 1 to 2.
 
-        :param file_path: str, the path to the file
+        edges, starts, ends = self._add_edge_rows(edges)
+        costs = edges[:, 2].tolist() if edges.shape[1] > 2 else [0] * len(edges)
+
+        weights = dict(zip(map(frozenset, zip(starts, ends)), costs))
+        for edge in self._weights.keys() & weights.keys():
+            del weights[edge]
+
+        self._weights.update(weights)
+
+    def freeze(self) -> FrozenGraph:
         """
+        Returns an immutable compressed sparse row snapshot of the graph (every edge in both directions),
+        later changes of the graph do not affect the snapshot.
 
-        with open(file_path, "r") as file:
-            for index, line in enumerate(file):
-                if index == 0:
-                    number_of_vertices = int(line.split()[0])
-                    for vertex in range(number_of_vertices):
-                        self.add_vertex(Vertex(vertex))
-                    continue
+        :return: FrozenGraph, the snapshot
+        """
 
-                line = line.split()
-                vertex_1, vertex_2, cost = Vertex(int(line[0])), Vertex(int(line[1])), int(line[2])
+        vertices = list(self._neighbors)
+        neighbors = [self._neighbors[vertex] for vertex in vertices]
+        costs = [[self._weights[frozenset((vertex, neighbor))] for neighbor in self._neighbors[vertex]]
+                 for vertex in vertices]
 
-                self.add_edge(vertex_1, vertex_2, cost)
+        return FrozenGraph.from_adjacency(vertices, neighbors, neighbors, costs, costs, directed=False)
 
-    def read_from_file(self, file_path: str):
+    def overlay(self) -> "WeightedUndirectedGraph":
         """
-        Reads a graph from a file.
-        The file contains the edges of the graph and the isolated vertices.
-        An edge is represented by two vertices. Ex: 1 2 means that there is an edge from 1 to 2.
-        An isolated vertex is represented by its number and -1. Ex: 1 -1 means that there is an isolated vertex with the number 1.
+        Returns a copy of the graph in O(1), the costs are shared and changed copy-on-write as well
+        (see UndirectedGraph.overlay).
 
-        :param file_path: str, the path to the file
+        :return: WeightedUndirectedGraph, the copy
         """
 
-        with open(file_path, "r") as file:
+        overlay = super().overlay()
+        overlay._weights = CopyOnWriteDict(self._weights)
+
+        return overlay
+
+    def _load_frozen(self, frozen: FrozenGraph):
+        # adds the vertices, the edges and the costs of a snapshot, an unweighted snapshot has costs of 0
+        super()._load_frozen(frozen)
+
+        # every edge is stored in both directions, both have the same cost
+        edges = (frozenset((vertex, neighbor)) for vertex, neighbors in zip(frozen.vertices, frozen.successor_lists())
+                 for neighbor in neighbors)
+        if frozen.is_weighted:
+            self._weights.update(zip(edges, frozen.out_weights.tolist()))
+        else:
+            self._weights.update(dict.fromkeys(edges, 0))
+
+    # ----------------------- #
+
+    def _read_small(self, file_path: str):
+        # the edge lines also contain the costs of the edges. Ex: 1 2 5 means that the edge from 1 to 2 costs 5
+        with open_graph_file(file_path, "r") as file:
             for line in file:
                 line = line.split()
 
@@ -158,28 +209,26 @@ class WeightedUndirectedGraph(UndirectedGraph):
 
                 self.add_edge(vertex_1, vertex_2, cost)
 
-    def write_to_file(self, file_path: str):
+    def _edge_line(self, vertex_1: Vertex, vertex_2: Vertex) -> str:
+        # the line of an edge in a file, with its cost
+        return f"{vertex_1} {vertex_2} {self._weights[frozenset((vertex_1, vertex_2))]}"
+
+    def load_binary(self, file_path: str):
         """
-        Writes the graph to a file.
+        Reads a graph from a binary file written by save_binary, with the costs of its edges
+        (see UndirectedGraph.load_binary).
 
         :param file_path: str, the path to the file
+
+        :raises GraphError: if the file is not a binary file of a weighted undirected graph or if a vertex already exists
         """
 
-        with open(file_path, "w") as file:
-            seen_edges = []
-            for vertex in self._neighbors:
-                if not self._neighbors[vertex]:
-                    file.write(f"{vertex} -1")
-                    if vertex != list(self._neighbors.keys())[-1]:
-                        file.write("\n")
-                    continue
+        # the file of an unweighted graph has no costs, its edges would silently cost 0
+        frozen = FrozenGraph.load_binary(file_path)
+        if frozen.is_directed or not frozen.is_weighted:
+            raise GraphError("Not a weighted undirected graph file!")
 
-                for neighbor in self._neighbors[vertex]:
-                    if (seen_edge := {vertex, neighbor}) not in seen_edges:
-                        seen_edges.append(seen_edge)
-                        file.write(f"{vertex} {neighbor} {self._weights[{vertex, neighbor}]}")
-                        if vertex != list(self._neighbors.keys())[-1] or neighbor != self._neighbors[vertex][-1]:
-                            file.write("\n")
+        self._load_frozen(frozen)
 
     # ----------------------- #
 
@@ -198,7 +247,7 @@ class WeightedUndirectedGraph(UndirectedGraph):
                 continue
 
             for neighbor in self._neighbors[vertex]:
-                string += f"\n{vertex} -- {neighbor} : {self._weights[{vertex, neighbor}]}"
+                string += f"\n{vertex} -- {neighbor} : {self._weights[frozenset((vertex, neighbor))]}"
 
         return string
 
@@ -1,13 +1,22 @@
-import copy
 from texttable import Texttable
 
 from graph.directed_graph import GraphError
+from graph.edge_statistics import EdgeFileStatistics
+from graph.graph_journal import GraphJournal
 from graph.vertex import Vertex
 from graph.weighted_directed_graph import WeightedDirectedGraph
+from algorithms.spilled_matrices import SpilledMatrixList
 from algorithms.directed_weighted_extra import generate_rand_weighted_directed_graph, \
     strongly_connected_tarjan_weighted_directed, accessible_vertices_weighted_directed, shortest_path_weighted_directed, \
     lowest_cost_path_matrix_weighted_directed, number_of_distinct_minimum_cost_walks_weighted_directed, \
-    number_of_distinct_walks_weighted_directed, get_path_from_matrix
+    number_of_distinct_walks_weighted_directed, get_path_from_matrix, \
+    lowest_cost_matrices_floyd_warshall_weighted_directed, get_path_from_next_hop_matrix, \
+    lowest_cost_path_bidirectional_weighted_directed
+from algorithms.landmarks import LandmarkIndex, lowest_cost_path_alt_weighted_directed
+
+
+# graphs with more vertices than this do not get their intermediate matrices printed
+MAX_PRINTED_MATRIX_SIZE = 20
 
 
 class UiError(Exception):
@@ -22,6 +31,14 @@ class DirectedWeightedUi:
         self.__original_graph = None
         self.__is_copy = False
 
+        # the landmark index is saved next to the file the graph was read from, as long as it is not modified
+        self.__graph_file_path = None
+        self.__landmark_index = None
+
+        # the changes are recorded in the journal of the file the graph was read from, once it is started
+        self.__journal_file = None
+        self.__journal = None
+
     def run_ui(self):
         DirectedWeightedUi.__print_title()
 
@@ -49,6 +66,12 @@ class DirectedWeightedUi:
             "21": self.__lowest_cost_path_matrix_multiplication,
             "22": self.__number_of_distinct_minimum_cost_walks,
             "23": self.__number_of_distinct_walks,
+            "24": self.__lowest_cost_paths_floyd_warshall,
+            "25": self.__lowest_cost_path_bidirectional_dijkstra,
+            "26": self.__lowest_cost_path_alt,
+            "27": DirectedWeightedUi.__file_statistics,
+            "28": self.__start_the_journal,
+            "29": self.__compact_the_journal,
             "c": self.__create_a_copy_of_the_graph,
             "u": self.__restore_the_original_graph,
             "r": self.__create_a_random_graph,
@@ -131,6 +154,13 @@ class DirectedWeightedUi:
         print("21: Get lowest cost walk between two vertices (Matrix multiplication)")
         print("22: Get the number of distinct minimum cost walks between two vertices")
         print("23: Get the number of distinct walks between two vertices")
+        print("24: Get lowest cost walks between pairs of vertices (Floyd-Warshall)")
+        print("25: Get lowest cost walk between two vertices (Bidirectional Dijkstra)")
+        print("26: Get lowest cost walk between two vertices (A* with landmarks)")
+        print("27: Get the isolated vertices and the degrees of a file (without reading the graph)")
+        print(" ---------------------------------- ")
+        print("28: Record the changes in a journal next to the graph file")
+        print("29: Compact the journal (rewrite the graph file in the background)")
         print(" ---------------------------------- ")
         print("c: Create a copy of the graph and operate on it")
         print("u: Restore to the original graph")
@@ -235,6 +265,7 @@ class DirectedWeightedUi:
 
         try:
             self.__graph.set_edge_cost(start_vertex, end_vertex, cost)
+            self.__graph_modified()
         except GraphError as error:
             print(DirectedWeightedUi.__make_red(str(error)))
 
@@ -246,6 +277,7 @@ class DirectedWeightedUi:
 
         try:
             self.__graph.add_edge(start_vertex, end_vertex, cost)
+            self.__graph_modified()
         except GraphError as error:
             print(DirectedWeightedUi.__make_red(str(error)))
 
@@ -254,6 +286,7 @@ class DirectedWeightedUi:
 
         try:
             self.__graph.remove_edge(start_vertex, end_vertex)
+            self.__graph_modified()
         except GraphError as error:
             print(DirectedWeightedUi.__make_red(str(error)))
 
@@ -262,6 +295,7 @@ class DirectedWeightedUi:
 
         try:
             self.__graph.add_vertex(vertex)
+            self.__graph_modified()
         except GraphError as error:
             print(DirectedWeightedUi.__make_red(str(error)))
 
@@ -270,6 +304,7 @@ class DirectedWeightedUi:
 
         try:
             self.__graph.remove_vertex(vertex)
+            self.__graph_modified()
         except GraphError as error:
             print(DirectedWeightedUi.__make_red(str(error)))
 
@@ -282,6 +317,9 @@ class DirectedWeightedUi:
         file_name = input("\nEnter the file name: ")
         file_path = f"data/data_weighted_directed/{file_name}"
         self.__graph.read_from_file_big(file_path)
+        self.__graph_file_path = file_path
+        self.__journal_file = (file_path, True)
+        self.__replay_the_journal()
 
         print("\nThe graph was successfully loaded from the file!")
 
@@ -292,6 +330,9 @@ class DirectedWeightedUi:
         file_name = input("\nEnter the file name: ")
         file_path = f"data/data_weighted_directed/{file_name}"
         self.__graph.read_from_file(file_path)
+        self.__graph_file_path = file_path
+        self.__journal_file = (file_path, False)
+        self.__replay_the_journal()
 
         print("\nThe graph was successfully loaded from the file!")
 
@@ -302,6 +343,52 @@ class DirectedWeightedUi:
 
         print("\nThe graph was successfully written to the file!")
 
+    def __replay_the_journal(self):
+        # a file with a journal is only up to date with its journal, which then keeps recording the changes
+        file_path, big = self.__journal_file
+        if GraphJournal.exists(file_path):
+            self.__journal = GraphJournal(self.__graph, file_path, big)
+            self.__graph_modified()
+
+            print("\nThe changes in the journal of the file were replayed!")
+
+    def __start_the_journal(self):
+        if self.__journal is not None:
+            raise UiError("The journal is already started!")
+
+        if self.__journal_file is None:
+            raise UiError("The graph was not read from a file!")
+
+        if self.__is_copy:
+            raise UiError("The changes of a copy are not recorded!")
+
+        # the changes made since the graph was read are not in the file yet, they are written by a compaction
+        file_path, big = self.__journal_file
+        if self.__graph_file_path is None and not GraphJournal.can_compact(self.__graph, big):
+            raise UiError("The graph file is in big format and its vertices are no longer numbered from 0 to n - 1 "
+                          "(a vertex was removed), add the missing vertices back first!")
+
+        self.__journal = GraphJournal(self.__graph, file_path, big)
+        if self.__graph_file_path is None:
+            self.__journal.compact()
+
+        print(f"\nThe changes are recorded in {file_path}.journal!")
+
+    def __compact_the_journal(self):
+        if self.__journal is None:
+            raise UiError("There is no journal!")
+
+        # the journal keeps growing until the graph can be written to the file again
+        _, big = self.__journal_file
+        if not GraphJournal.can_compact(self.__graph, big):
+            raise UiError("The graph file is in big format and its vertices are no longer numbered from 0 to n - 1 "
+                          "(a vertex was removed), add the missing vertices back first!")
+
+        number_of_records = self.__journal.number_of_records
+        self.__journal.compact()
+
+        print(f"\nThe {number_of_records} changes are being written to the graph file!")
+
     # ----------------------- #
 
     def __create_a_random_graph(self):
@@ -319,6 +406,9 @@ class DirectedWeightedUi:
             raise UiError("Graph already exists!")
 
         self.__graph.read_from_file_big("data/data_weighted_directed/small.txt")
+        self.__graph_file_path = "data/data_weighted_directed/small.txt"
+        self.__journal_file = (self.__graph_file_path, True)
+        self.__replay_the_journal()
 
         print("\nGraph loaded!")
 
@@ -332,7 +422,7 @@ class DirectedWeightedUi:
             raise UiError("Graph is empty!")
 
         self.__original_graph = self.__graph
-        self.__graph = copy.deepcopy(self.__graph)
+        self.__graph = self.__graph.overlay()
         self.__is_copy = True
 
         print("\nGraph copy created!")
@@ -344,9 +434,14 @@ class DirectedWeightedUi:
         self.__graph = self.__original_graph
         self.__original_graph = None
         self.__is_copy = False
+        self.__graph_modified()
 
         print("\nGraph restored!")
 
+    def __graph_modified(self):
+        self.__graph_file_path = None
+        self.__landmark_index = None
+
     # ----------------------- #
 
     def __print_the_graph(self):
@@ -405,17 +500,52 @@ class DirectedWeightedUi:
         start_vertex = Vertex(int(input("\nEnter the start vertex: ")))
         end_vertex = Vertex(int(input("Enter the end vertex: ")))
 
-        path, matrices = lowest_cost_path_matrix_weighted_directed(self.__graph, start_vertex, end_vertex)
+        # the intermediate matrices are only kept (spilled to disk) when they are going to be printed
+        if self.__graph.number_of_vertices <= MAX_PRINTED_MATRIX_SIZE:
+            with SpilledMatrixList() as matrices:
+                lowest_cost_path_matrix_weighted_directed(self.__graph, start_vertex, end_vertex, matrices)
+                self.__print_intermediate_matrices(matrices)
+                cost_matrix = matrices[-1]
+
+        else:
+            _, matrices = lowest_cost_path_matrix_weighted_directed(self.__graph, start_vertex, end_vertex)
+            cost_matrix = matrices[-1]
+            print("\nThe intermediate matrices are too large to print.")
+
+        while True:
+            start_vertex = Vertex(int(input("\nEnter the start vertex: ")))
+            end_vertex = Vertex(int(input("Enter the end vertex: ")))
+
+            if start_vertex.value == -1 or end_vertex.value == -1:
+                break
+
+            path = get_path_from_matrix(self.__graph, cost_matrix, start_vertex, end_vertex)
 
+            if not path:
+                print("\nThere is no path between the vertices!")
+
+            else:
+                path_length = cost_matrix[start_vertex.value][end_vertex.value]
+                print(f"\nThe lowest cost path between the vertices {start_vertex} and {end_vertex} "
+                        f"has the length {path_length} and is:")
+                for vertex in path:
+                    print(f"-> {vertex}")
+
+    @staticmethod
+    def __print_intermediate_matrices(matrices):
         print("\nIntermediate matrices:")
         for index, matrix in enumerate(matrices):
-            print(f"Matrix {index + 1}:")
+            print(f"Matrix {index + 1} (walks of at most {2 ** index} edges):")
             table = Texttable()
             table.set_cols_align(["c"] * len(matrix))
             for row in matrix:
                 table.add_row(row)
             print(table.draw() + "\n")
 
+    def __lowest_cost_paths_floyd_warshall(self):
+        cost_matrix, next_hop = lowest_cost_matrices_floyd_warshall_weighted_directed(self.__graph)
+
+        print("\nThe lowest costs were computed, enter -1 to stop.")
         while True:
             start_vertex = Vertex(int(input("\nEnter the start vertex: ")))
             end_vertex = Vertex(int(input("Enter the end vertex: ")))
@@ -423,18 +553,55 @@ class DirectedWeightedUi:
             if start_vertex.value == -1 or end_vertex.value == -1:
                 break
 
-            path = get_path_from_matrix(self.__graph, matrices[-1], start_vertex, end_vertex)
+            path = get_path_from_next_hop_matrix(self.__graph, next_hop, start_vertex, end_vertex)
 
             if not path:
                 print("\nThere is no path between the vertices!")
 
             else:
-                path_length = matrices[-1][start_vertex.value][end_vertex.value]
+                path_length = cost_matrix[start_vertex.value][end_vertex.value]
                 print(f"\nThe lowest cost path between the vertices {start_vertex} and {end_vertex} "
-                        f"has the length {path_length} and is:")
+                      f"has the length {path_length} and is:")
                 for vertex in path:
                     print(f"-> {vertex}")
 
+    def __lowest_cost_path_bidirectional_dijkstra(self):
+        start_vertex = Vertex(int(input("\nEnter the start vertex: ")))
+        end_vertex = Vertex(int(input("Enter the end vertex: ")))
+
+        path_length, path = lowest_cost_path_bidirectional_weighted_directed(self.__graph, start_vertex, end_vertex)
+
+        if not path:
+            print("\nThere is no path between the vertices!")
+            return
+
+        print(f"\nThe lowest cost path between the vertices {start_vertex} and {end_vertex} "
+              f"has the length {path_length} and is:")
+        for vertex in path:
+            print(f"-> {vertex}")
+
+    def __lowest_cost_path_alt(self):
+        start_vertex = Vertex(int(input("\nEnter the start vertex: ")))
+        end_vertex = Vertex(int(input("Enter the end vertex: ")))
+
+        if self.__landmark_index is None:
+            if self.__graph_file_path is not None:
+                self.__landmark_index = LandmarkIndex.load_or_build(self.__graph, self.__graph_file_path)
+            else:
+                self.__landmark_index = LandmarkIndex.build(self.__graph)
+
+        path_length, path = lowest_cost_path_alt_weighted_directed(self.__graph, self.__landmark_index,
+                                                                   start_vertex, end_vertex)
+
+        if not path:
+            print("\nThere is no path between the vertices!")
+            return
+
+        print(f"\nThe lowest cost path between the vertices {start_vertex} and {end_vertex} "
+              f"has the length {path_length} and is:")
+        for vertex in path:
+            print(f"-> {vertex}")
+
     def __number_of_distinct_minimum_cost_walks(self):
         start_vertex = Vertex(int(input("\nEnter the start vertex: ")))
         end_vertex = Vertex(int(input("Enter the end vertex: ")))
@@ -457,6 +624,32 @@ class DirectedWeightedUi:
         else:
             print(f"\nThere are {number} distinct walks between the vertices {start_vertex} and {end_vertex}.")
 
+    @staticmethod
+    def __file_statistics():
+        file_name = input("\nEnter the file name: ")
+        big = input("Is the file in big format? (y/n): ") == "y"
+        distinct = input("Count the repeated edges (keeps every edge in memory)? (y/n): ") == "y"
+        statistics = EdgeFileStatistics.from_file(f"data/data_weighted_directed/{file_name}", big, distinct=distinct)
+
+        print(f"\nThe file has {statistics.number_of_vertices} vertices and {statistics.number_of_edges} "
+              f"{'edges' if distinct else 'edge lines'}.")
+        print(f"There are {statistics.number_of_isolated_vertices} isolated vertices.")
+        if distinct:
+            print(f"There are {statistics.number_of_self_loops} self-loops and {statistics.number_of_duplicates} repeated edges.")
+        else:
+            print(f"There are {statistics.number_of_self_loops} self-loop lines.")
+        if statistics.mean_cost is not None:
+            print(f"The costs are between {statistics.min_cost} and {statistics.max_cost}, "
+                  f"with a mean of {statistics.mean_cost:.2f}.")
+
+        if vertex := input("\nEnter a vertex to get its degrees (or nothing): "):
+            vertex = Vertex(int(vertex))
+            if not statistics.is_vertex(vertex):
+                raise UiError("Invalid vertex!")
+
+            print(f"The in degree of the vertex is: {statistics.in_degrees[vertex]}")
+            print(f"The out degree of the vertex is: {statistics.out_degrees[vertex]}")
+
     @staticmethod
     def __exit():
         print("\nGoodbye!")
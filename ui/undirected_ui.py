@@ -1,6 +1,6 @@
-import copy
-
 from graph.directed_graph import GraphError
+from graph.edge_statistics import EdgeFileStatistics
+from graph.graph_journal import GraphJournal
 from graph.undirected_graph import UndirectedGraph
 from graph.vertex import Vertex
 from algorithms.undirected_extra import generate_rand_undirected_graph, connected_components_kosaraju_undirected
@@ -15,6 +15,13 @@ class UndirectedUi:
         self.__original_graph = None
         self.__is_copy = False
 
+        # the file the graph was read from, as long as it is not modified
+        self.__graph_file_path = None
+
+        # the changes are recorded in the journal of the file the graph was read from, once it is started
+        self.__journal_file = None
+        self.__journal = None
+
     def run_ui(self):
         UndirectedUi.__print_title()
 
@@ -33,6 +40,9 @@ class UndirectedUi:
             "12": self.__read_the_graph_from_a_file_big_with_weights,
             "13": self.__write_the_graph_to_a_file,
             "14": self.__get_connected_components,
+            "15": UndirectedUi.__file_statistics,
+            "16": self.__start_the_journal,
+            "17": self.__compact_the_journal,
             "c": self.__create_a_copy_of_the_graph,
             "u": self.__restore_the_original_graph,
             "r": self.__create_a_random_graph,
@@ -105,6 +115,10 @@ class UndirectedUi:
         print("13: Write the graph to a file")
         print(" ---------------------------------- ")
         print("14: Get the connected components (Kosaraju)")
+        print("15: Get the isolated vertices and the degrees of a file (without reading the graph)")
+        print(" ---------------------------------- ")
+        print("16: Record the changes in a journal next to the graph file")
+        print("17: Compact the journal (rewrite the graph file in the background)")
         print(" ---------------------------------- ")
         print("c: Create a copy of the graph and operate on it")
         print("u: Restore to the original graph")
@@ -176,6 +190,7 @@ class UndirectedUi:
 
         try:
             self.__graph.add_edge(vertex_1, vertex_2)
+            self.__graph_modified()
         except GraphError as error:
             print(UndirectedUi.__make_red(str(error)))
 
@@ -184,6 +199,7 @@ class UndirectedUi:
 
         try:
             self.__graph.remove_edge(vertex_1, vertex_2)
+            self.__graph_modified()
         except GraphError as error:
             print(UndirectedUi.__make_red(str(error)))
 
@@ -192,6 +208,7 @@ class UndirectedUi:
 
         try:
             self.__graph.add_vertex(vertex)
+            self.__graph_modified()
         except GraphError as error:
             print(UndirectedUi.__make_red(str(error)))
 
@@ -200,6 +217,7 @@ class UndirectedUi:
 
         try:
             self.__graph.remove_vertex(vertex)
+            self.__graph_modified()
         except GraphError as error:
             print(UndirectedUi.__make_red(str(error)))
 
@@ -212,6 +230,9 @@ class UndirectedUi:
         file_name = input("\nEnter the file name: ")
         file_path = f"data/data_undirected/{file_name}"
         self.__graph.read_from_file_big(file_path)
+        self.__graph_file_path = file_path
+        self.__journal_file = (file_path, True)
+        self.__replay_the_journal()
 
         print("\nThe graph was successfully loaded from the file!")
 
@@ -232,6 +253,9 @@ class UndirectedUi:
         file_name = input("\nEnter the file name: ")
         file_path = f"data/data_undirected/{file_name}"
         self.__graph.read_from_file(file_path)
+        self.__graph_file_path = file_path
+        self.__journal_file = (file_path, False)
+        self.__replay_the_journal()
 
         print("\nThe graph was successfully loaded from the file!")
 
@@ -242,6 +266,53 @@ class UndirectedUi:
 
         print("\nThe graph was successfully written to the file!")
 
+    def __replay_the_journal(self):
+        # a file with a journal is only up to date with its journal, which then keeps recording the changes
+        file_path, big = self.__journal_file
+        if GraphJournal.exists(file_path):
+            self.__journal = GraphJournal(self.__graph, file_path, big)
+            self.__graph_modified()
+
+            print("\nThe changes in the journal of the file were replayed!")
+
+    def __start_the_journal(self):
+        if self.__journal is not None:
+            raise UiError("The journal is already started!")
+
+        # the costs of a file read with its weights would be lost when it is compacted
+        if self.__journal_file is None:
+            raise UiError("The graph was not read from a file (without weights)!")
+
+        if self.__is_copy:
+            raise UiError("The changes of a copy are not recorded!")
+
+        # the changes made since the graph was read are not in the file yet, they are written by a compaction
+        file_path, big = self.__journal_file
+        if self.__graph_file_path is None and not GraphJournal.can_compact(self.__graph, big):
+            raise UiError("The graph file is in big format and its vertices are no longer numbered from 0 to n - 1 "
+                          "(a vertex was removed), add the missing vertices back first!")
+
+        self.__journal = GraphJournal(self.__graph, file_path, big)
+        if self.__graph_file_path is None:
+            self.__journal.compact()
+
+        print(f"\nThe changes are recorded in {file_path}.journal!")
+
+    def __compact_the_journal(self):
+        if self.__journal is None:
+            raise UiError("There is no journal!")
+
+        # the journal keeps growing until the graph can be written to the file again
+        _, big = self.__journal_file
+        if not GraphJournal.can_compact(self.__graph, big):
+            raise UiError("The graph file is in big format and its vertices are no longer numbered from 0 to n - 1 "
+                          "(a vertex was removed), add the missing vertices back first!")
+
+        number_of_records = self.__journal.number_of_records
+        self.__journal.compact()
+
+        print(f"\nThe {number_of_records} changes are being written to the graph file!")
+
     # ----------------------- #
 
     def __create_a_random_graph(self):
@@ -259,6 +330,9 @@ class UndirectedUi:
             raise UiError("Graph already exists!")
 
         self.__graph.read_from_file_big("data/data_undirected/small.txt")
+        self.__graph_file_path = "data/data_undirected/small.txt"
+        self.__journal_file = (self.__graph_file_path, True)
+        self.__replay_the_journal()
 
         print("\nGraph loaded!")
 
@@ -274,6 +348,28 @@ class UndirectedUi:
         for index, connected_component in enumerate(connected_components):
             print(f"Component {index + 1}: \n{connected_component}")
 
+    @staticmethod
+    def __file_statistics():
+        file_name = input("\nEnter the file name: ")
+        big = input("Is the file in big format? (y/n): ") == "y"
+        distinct = input("Count the repeated edges (keeps every edge in memory)? (y/n): ") == "y"
+        statistics = EdgeFileStatistics.from_file(f"data/data_undirected/{file_name}", big, directed=False, distinct=distinct)
+
+        print(f"\nThe file has {statistics.number_of_vertices} vertices and {statistics.number_of_edges} "
+              f"{'edges' if distinct else 'edge lines'}.")
+        print(f"There are {statistics.number_of_isolated_vertices} isolated vertices.")
+        if distinct:
+            print(f"There are {statistics.number_of_self_loops} self-loops and {statistics.number_of_duplicates} repeated edges.")
+        else:
+            print(f"There are {statistics.number_of_self_loops} self-loop lines.")
+
+        if vertex := input("\nEnter a vertex to get its degree (or nothing): "):
+            vertex = Vertex(int(vertex))
+            if not statistics.is_vertex(vertex):
+                raise UiError("Invalid vertex!")
+
+            print(f"The degree of the vertex is: {statistics.out_degrees[vertex]}")
+
     # ----------------------- #
 
     def __create_a_copy_of_the_graph(self):
@@ -284,7 +380,7 @@ class UndirectedUi:
             raise UiError("Graph is empty!")
 
         self.__original_graph = self.__graph
-        self.__graph = copy.deepcopy(self.__graph)
+        self.__graph = self.__graph.overlay()
         self.__is_copy = True
 
         print("\nGraph copy created!")
@@ -299,6 +395,9 @@ class UndirectedUi:
 
         print("\nGraph restored!")
 
+    def __graph_modified(self):
+        self.__graph_file_path = None
+
     # ----------------------- #
 
     def __print_the_graph(self):